@@ -7,6 +7,7 @@ from pydantic import BaseModel, Field
 from app.db.session import get_db
 from app.models.ad_spend import AdSpend
 from app.models.user import User
+from app.repositories.ad_spend_repository import AdSpendRepository
 
 router = APIRouter(prefix="/ad_spends", tags=["ad_spends"])
 
@@ -82,29 +83,17 @@ def bulk_create_ad_spend(
     if not payload.items:
         return []
 
-    created_items: List[AdSpend] = []
-    for item in payload.items:
-        sub_id_val = item.sub_id
-        if sub_id_val == "__all__" or sub_id_val == "":
-            sub_id_val = None
-        
-        ad_spend = AdSpend(
-            user_id=user.id,
-            date=item.date,
-            sub_id=sub_id_val,
-            amount=item.amount
-        )
-        db.add(ad_spend)
-        db.flush()  # Para obter o ID sem fazer commit
-        created_items.append(ad_spend)
-    
-    db.commit()
-    
-    # Refresh todos os itens para garantir dados atualizados
-    for item in created_items:
-        db.refresh(item)
-    
-    return created_items
+    mappings = [
+        {
+            "user_id": user.id,
+            "date": item.date,
+            "sub_id": None if item.sub_id in ("", "__all__") else item.sub_id,
+            "amount": item.amount,
+        }
+        for item in payload.items
+    ]
+    # Um INSERT ... RETURNING para o lote: sem flush nem refresh (SELECT) por item
+    return AdSpendRepository(db).bulk_create(mappings)
 
 @router.get("", response_model=List[AdSpendResponse])
 def list_ad_spends(
@@ -76,13 +76,7 @@ def _extract_product_id(payload: Dict[str, Any]) -> Optional[str]:
 
 
 def _product_allowed(product_id: Optional[str]) -> bool:
-    raw = settings.CAKTO_SUBSCRIPTION_PRODUCT_IDS or ""
-    allowed = {item.strip() for item in raw.split(",") if item.strip()}
-    if not allowed:
-        return True
-    if not product_id:
-        return False
-    return product_id in allowed
+    return settings.is_cakto_subscription_product(product_id)
 
 
 def _infer_action(payload: Dict[str, Any], event: str) -> Optional[str]:
@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from typing import Optional
 import logging
 from fastapi import Depends, HTTPException, status
@@ -7,9 +8,16 @@ from sqlalchemy import text
 from supabase import create_client, Client
 
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import ReadSessionLocal, SessionLocal, get_db
+from app.repositories.click_row_repository import ClickRowRepository
+from app.repositories.dataset_repository import DatasetRepository
+from app.repositories.dataset_row_repository import DatasetRowRepository
+from app.repositories.job_repository import JobRepository
 from app.repositories.user_repository import UserRepository
 from app.repositories.subscription_repository import SubscriptionRepository
+from app.services.click_service import ClickService
+from app.services.dataset_service import DatasetService
+from app.services.job_service import JobService
 from app.services.subscription_service import SubscriptionService
 from app.models.user import User
 
@@ -63,6 +71,16 @@ def get_supabase_service_client() -> Client:
     return _supabase_service
 
 
+def _set_rls_context(db: Session, user_id: int) -> None:
+    """Injeta o ID do usuário na sessão do PostgreSQL para ativar o RLS."""
+    try:
+        db.execute(text(f"SET LOCAL app.current_user_id = '{int(user_id)}';"))
+    except Exception as e:
+        logger.error(f"Falha ao configurar contexto RLS para o usuário {user_id}: {e}")
+        # Se falhar a configuração do RLS, bloqueamos o request por segurança
+        raise HTTPException(status_code=500, detail="Erro interno de segurança")
+
+
 def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: Session = Depends(get_db),
@@ -104,13 +122,7 @@ def get_current_user(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Usuário inativo")
 
     # --- CRÍTICO PARA SEGURANÇA ---
-    # Injetar o ID do usuário na sessão do PostgreSQL para ativar o RLS
-    try:
-        db.execute(text(f"SET LOCAL app.current_user_id = '{user.id}';"))
-    except Exception as e:
-        logger.error(f"Falha ao configurar contexto RLS para o usuário {user.id}: {e}")
-        # Se falhar a configuração do RLS, bloqueamos o request por segurança
-        raise HTTPException(status_code=500, detail="Erro interno de segurança")
+    _set_rls_context(db, user.id)
 
     logger.info(f"Autenticação Supabase OK: {user.email} (ID: {user.id})")
     
@@ -133,6 +145,58 @@ def get_current_user_optional(
         return None
 
 
+def get_read_db(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Sessão para endpoints somente leitura (listagens, dashboard).
+    Com DATABASE_READ_URL usa a réplica, com o mesmo contexto RLS do usuário;
+    sem réplica, reaproveita a sessão principal da requisição.
+    """
+    if ReadSessionLocal is None:
+        yield db
+        return
+    with read_session_for(current_user.id) as read_db:
+        yield read_db
+
+
+@contextmanager
+def read_session_for(user_id: int):
+    """
+    Sessão própria de leitura (réplica se configurada) com o contexto RLS do usuário.
+    Para StreamingResponse: o corpo é gerado depois que as dependências da requisição encerraram.
+    """
+    db = (ReadSessionLocal or SessionLocal)()
+    try:
+        _set_rls_context(db, user_id)
+        yield db
+    finally:
+        db.close()
+
+
+def get_dataset_service(db: Session = Depends(get_db)) -> DatasetService:
+    return DatasetService(DatasetRepository(db), DatasetRowRepository(db))
+
+
+def get_read_dataset_service(db: Session = Depends(get_read_db)) -> DatasetService:
+    """DatasetService sobre a sessão de leitura (ver get_read_db)."""
+    return DatasetService(DatasetRepository(db), DatasetRowRepository(db))
+
+
+def get_click_service(db: Session = Depends(get_db)) -> ClickService:
+    return ClickService(DatasetRepository(db), ClickRowRepository(db))
+
+
+def get_read_click_service(db: Session = Depends(get_read_db)) -> ClickService:
+    """ClickService sobre a sessão de leitura (ver get_read_db)."""
+    return ClickService(DatasetRepository(db), ClickRowRepository(db))
+
+
+def get_job_service(db: Session = Depends(get_db)) -> JobService:
+    return JobService(JobRepository(db), DatasetRepository(db))
+
+
 def require_admin(current_user: User = Depends(get_current_user)) -> User:
     """Dependency admin. Retorna 404 (não 403) para não revelar a existência do painel."""
     if not getattr(current_user, "is_admin", False):
@@ -160,6 +224,11 @@ def require_active_subscription(
         logger.debug(f"Subscription check bypassed in {env} environment for user {current_user.id}")
         return current_user
 
+    # Resultado positivo recente (TTL curto, invalidado por webhooks/cancelamento):
+    # evita SELECT de subscription a cada poll do dashboard.
+    if SubscriptionService.has_cached_access(current_user.id):
+        return current_user
+
     subscription_service = SubscriptionService(SubscriptionRepository(db))
 
     # Verificar se precisa validar (passou mais de 30 dias)
@@ -189,6 +258,7 @@ def require_active_subscription(
                 detail="Assinatura não está ativa. Por favor, renove sua assinatura.",
             )
     
+    SubscriptionService.cache_access(current_user.id)
     return current_user
 
 
@@ -0,0 +1,19 @@
+"""
+Parâmetros de query compartilhados pelas listagens (período e paginação).
+
+Cada alias carrega um único Query(...) reutilizado por todas as rotas; o default fica na
+assinatura da rota (ex.: `start_date: StartDate = None`, `offset: Offset = 0`).
+"""
+from datetime import date
+from typing import Annotated, Optional
+
+from fastapi import Query
+
+StartDate = Annotated[Optional[date], Query(description="Data inicial (opcional)")]
+EndDate = Annotated[Optional[date], Query(description="Data final (opcional)")]
+Limit = Annotated[Optional[int], Query(ge=1, description="Quantidade máxima de registros (opcional)")]
+Offset = Annotated[int, Query(ge=0, description="Deslocamento para paginação")]
+AfterId = Annotated[
+    Optional[int],
+    Query(ge=1, description="Cursor (X-Next-Cursor da página anterior); substitui offset"),
+]
@@ -2,7 +2,7 @@ from datetime import date as DateType, datetime
 from typing import List, Optional, Union
 import io
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import Response
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
@@ -10,6 +10,7 @@ import openpyxl
 from openpyxl import Workbook
 
 from app.api.v1.dependencies import get_current_user, require_active_subscription
+from app.api.v1.params import EndDate, Limit, Offset, StartDate
 from app.db.session import get_db
 from app.models.user import User
 from app.repositories.ad_spend_repository import AdSpendRepository
@@ -69,10 +70,10 @@ def bulk_create_ad_spend(
 
 @router.get("", response_model=List[AdSpendResponse])
 def list_ad_spends(
-    start_date: DateType | None = Query(None, description="Data inicial (opcional)"),
-    end_date: DateType | None = Query(None, description="Data final (opcional)"),
-    limit: int | None = Query(None, ge=1),
-    offset: int = Query(0, ge=0),
+    start_date: StartDate = None,
+    end_date: EndDate = None,
+    limit: Limit = None,
+    offset: Offset = 0,
     current_user: User = Depends(require_active_subscription),
     db: Session = Depends(get_db),
 ):
@@ -1,12 +1,18 @@
-from typing import Any, Dict, Optional, Set, List
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Set
 from datetime import datetime, timedelta, timezone
+import hmac
 import logging
 import traceback
+
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Request, Query, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.http_cache import cached_response, make_etag
 from app.core.security import get_password_hash
 from app.db.session import get_db
 from app.models.user import User
@@ -14,6 +20,7 @@ from app.repositories.subscription_repository import SubscriptionRepository
 from app.repositories.user_repository import UserRepository
 from app.services.subscription_service import SubscriptionService
 from app.services.auth_service import AuthService
+from app.services.affiliate_service import AffiliateService
 from app.services.cakto_service import create_checkout_url
 from app.services.webhook_helpers import find_or_create_user, send_subscription_email, calculate_expires_at
 from app.schemas.subscription import PlansResponse, PlanInfo
@@ -111,7 +118,23 @@ def _parse_datetime(value: Any) -> Optional[datetime]:
     return None
 
 
-def _extract_transaction_data(payload: Dict[str, Any]) -> Dict[str, Any]:
+# Fallback imutável de _extract_transaction_data (compartilhado entre chamadas).
+_EMPTY_TRANSACTION_DATA: Mapping[str, Any] = MappingProxyType({
+    "transaction_id": None,
+    "amount": 0,
+    "status": None,
+    "subscription_status": None,
+    "payment_status": None,
+    "payment_method": None,
+    "due_date": None,
+    "due_date_present": False,
+    "recurrence_period": None,
+    "paid_at": None,
+    "offer_name": None,
+})
+
+
+def _extract_transaction_data(payload: Dict[str, Any]) -> Mapping[str, Any]:
     """Extrai dados da transação do payload do webhook."""
     try:
         data = payload.get("data") if isinstance(payload.get("data"), dict) else payload
@@ -129,23 +152,19 @@ def _extract_transaction_data(payload: Dict[str, Any]) -> Dict[str, Any]:
 
         # Extrair recurrence_period e paidAt para cálculo correto da próxima data
         recurrence_period = None
-        if isinstance(subscription, dict):
-            rp = subscription.get("recurrence_period")
-            if rp is not None:
-                try:
-                    recurrence_period = int(rp)
-                except (ValueError, TypeError):
-                    recurrence_period = None
-
-        offer_name = None
-        if isinstance(offer, dict):
-            offer_name = offer.get("name")
-        if not offer_name and isinstance(product, dict):
-            offer_name = product.get("name")
+        rp = subscription.get("recurrence_period")
+        if rp is not None:
+            try:
+                recurrence_period = int(rp)
+            except (ValueError, TypeError):
+                recurrence_period = None
+
+        # offer/product/subscription já normalizados para dict acima
+        offer_name = offer.get("name") or product.get("name")
 
         status = data.get("status")
-        subscription_status = subscription.get("status") if isinstance(subscription, dict) else None
-        payment_status = data.get("payment_status") or subscription.get("payment_status") if isinstance(subscription, dict) else None
+        subscription_status = subscription.get("status")
+        payment_status = data.get("payment_status") or subscription.get("payment_status")
 
         return {
             "transaction_id": data.get("id") or data.get("transaction_id"),
@@ -162,19 +181,7 @@ def _extract_transaction_data(payload: Dict[str, Any]) -> Dict[str, Any]:
         }
     except Exception as e:
         logger.error(f"Erro ao extrair transaction_data: {str(e)}")
-        return {
-            "transaction_id": None,
-            "amount": 0,
-            "status": None,
-            "subscription_status": None,
-            "payment_status": None,
-            "payment_method": None,
-            "due_date": None,
-            "due_date_present": False,
-            "recurrence_period": None,
-            "paid_at": None,
-            "offer_name": None,
-        }
+        return _EMPTY_TRANSACTION_DATA
 
 
 def _sanitize_document(value: Any) -> Optional[str]:
@@ -184,17 +191,11 @@ def _sanitize_document(value: Any) -> Optional[str]:
     return digits or None
 
 
-def _get_allowed_products() -> Set[str]:
-    raw = settings.CAKTO_SUBSCRIPTION_PRODUCT_IDS or ""
-    if not raw:
-        return set()
-    normalized = raw.replace("[", "").replace("]", "")
-    allowed = set()
-    for piece in normalized.split(","):
-        cleaned = piece.strip().strip("'\"")
-        if cleaned:
-            allowed.add(cleaned)
-    return allowed
+def _secret_matches(received: Any, expected: str) -> bool:
+    """Compara o secret recebido com o esperado em tempo constante."""
+    if not isinstance(received, str) or not received:
+        return False
+    return hmac.compare_digest(received.encode("utf-8"), expected.encode("utf-8"))
 
 
 def _extract_product_id(payload: Dict[str, Any]) -> Optional[str]:
@@ -239,7 +240,7 @@ def _extract_product_id(payload: Dict[str, Any]) -> Optional[str]:
             seen.add(candidate)
             deduped.append(candidate)
 
-    allowed = _get_allowed_products()
+    allowed = settings.cakto_product_ids
     if allowed:
         for candidate in deduped:
             for allowed_id in allowed:
@@ -256,12 +257,15 @@ def _extract_product_id(payload: Dict[str, Any]) -> Optional[str]:
 
 
 def _product_allowed(product_id: Optional[str]) -> bool:
-    allowed = _get_allowed_products()
+    allowed = settings.cakto_product_ids
     if not allowed:
         return True
     if not product_id:
         return False
-        
+    if product_id in allowed:
+        return True
+
+    # Match parcial (prefixo): IDs de oferta como 8e9qxyg_742442 vs produto 8e9qxyg
     for allowed_id in allowed:
         if (
             product_id == allowed_id
@@ -291,6 +295,115 @@ def _infer_action(payload: Dict[str, Any], event: str) -> Optional[str]:
     return None
 
 
+def _apply_webhook_action(
+    db: Session,
+    email: str,
+    action: str,
+    customer_data: Dict[str, Any],
+    transaction_data: Mapping[str, Any],
+) -> Dict[str, Any]:
+    """
+    Parte bloqueante do webhook (SQLAlchemy síncrono + SMTP).
+
+    Executada no threadpool para não travar o event loop do worker.
+    """
+    # Buscar ou criar usuário (usando helper compartilhado)
+    try:
+        user, user_created, user_has_password = find_or_create_user(email, customer_data, db)
+        if user_created:
+            logger.info(f"Usuário {email} criado com ID {user.id}")
+    except Exception as reg_err:
+        logger.error(f"Erro ao registrar usuário via webhook: {str(reg_err)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao criar usuário")
+
+    # Atualizar assinatura
+    subscription_service = SubscriptionService(SubscriptionRepository(db))
+    
+    # Calcular expiração correta
+    expires_at = transaction_data.get("due_date")
+    recurrence_period = transaction_data.get("recurrence_period")
+    paid_at = transaction_data.get("paid_at")
+
+    if action == "activate":
+        expires_at = calculate_expires_at(expires_at, recurrence_period, paid_at)
+
+    try:
+        logger.info(f"Atualizando assinatura para usuário {user.id} (ação: {action})")
+        subscription = subscription_service.set_active(
+            user_id=user.id,
+            plan="marketdash" if action == "activate" else "free",
+            is_active=(action == "activate"),
+            cakto_customer_id=customer_data.get("customer_id"),
+            cakto_transaction_id=transaction_data.get("transaction_id"),
+            expires_at=expires_at,
+            cakto_status=transaction_data.get("subscription_status") or transaction_data.get("status"),
+            cakto_offer_name=transaction_data.get("offer_name"),
+            cakto_due_date=transaction_data.get("due_date"),
+            cakto_subscription_status=transaction_data.get("subscription_status"),
+            cakto_payment_status=transaction_data.get("payment_status"),
+            cakto_payment_method=transaction_data.get("payment_method"),
+            # Dual-write: provider_* fields
+            provider="cakto",
+            provider_customer_id=customer_data.get("customer_id"),
+            provider_transaction_id=transaction_data.get("transaction_id"),
+            provider_status=transaction_data.get("subscription_status") or transaction_data.get("status"),
+            provider_offer_name=transaction_data.get("offer_name"),
+            provider_due_date=transaction_data.get("due_date"),
+            provider_subscription_status=transaction_data.get("subscription_status"),
+            provider_payment_status=transaction_data.get("payment_status"),
+            provider_payment_method=transaction_data.get("payment_method"),
+            email=user.email,
+        )
+        
+        # Commit final do status da assinatura
+        if action == "activate":
+            subscription.last_validation_at = datetime.now(timezone.utc)
+
+            # Programa de afiliados: se o usuário foi indicado, cria comissão
+            # idempotente (unique index em cakto_transaction_id evita duplicação).
+            try:
+                AffiliateService(db).create_commission_from_payment(
+                    referred_user=user,
+                    subscription=subscription,
+                    amount=transaction_data.get("amount"),
+                    cakto_transaction_id=transaction_data.get("transaction_id"),
+                )
+            except Exception as aff_err:
+                # Falha de comissão não deve quebrar o webhook — só logar.
+                logger.error("Erro ao criar comissão de afiliado: %s", aff_err)
+
+            db.commit()
+            db.refresh(subscription)
+            # last_validation_at gravado depois do set_active: descarta status cacheado no intervalo
+            SubscriptionService.invalidate_access_cache(user.id, user.email)
+            
+            # Enviar email via helper compartilhado
+            send_subscription_email(
+                user=user,
+                email=email,
+                user_created=user_created,
+                user_has_password=user_has_password,
+                customer_name=customer_data.get("name"),
+                db=db,
+            )
+
+        logger.info(f"Webhook processado com sucesso para {email}")
+        return {
+            "status": "ok",
+            "action": action,
+            "user_id": user.id,
+            "subscription_active": subscription.is_active,
+            "next_payment_date": subscription.cakto_due_date.isoformat() if subscription.cakto_due_date else None,
+            "user_created": user_created
+        }
+
+    except Exception as sub_err:
+        logger.error(f"Erro no processamento da assinatura: {str(sub_err)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(sub_err))
+
+
 @router.post("/webhook")
 async def cakto_webhook(request: Request, db: Session = Depends(get_db)):
     """Webhook do Cakto para processar eventos de assinatura."""
@@ -300,23 +413,26 @@ async def cakto_webhook(request: Request, db: Session = Depends(get_db)):
         # Obter payload bruto primeiro para log em caso de erro de JSON
         body = await request.body()
         try:
-            payload = await request.json()
-        except Exception as json_err:
+            payload = orjson.loads(body)
+        except orjson.JSONDecodeError as json_err:
             logger.error(f"Erro ao decodificar JSON do webhook: {str(json_err)}")
             logger.error(f"Corpo recebido: {body.decode('utf-8', errors='replace')}")
             return {"status": "error", "reason": "invalid_json"}
 
         # Validação do secret
         if settings.CAKTO_WEBHOOK_SECRET:
+            expected_secret = settings.CAKTO_WEBHOOK_SECRET
             secret = (
                 request.headers.get("x-cakto-secret")
                 or request.headers.get("x-webhook-secret")
                 or request.headers.get("x-cakto-signature")
             )
-            
-            payload_secret = payload.get("secret")
-            if secret != settings.CAKTO_WEBHOOK_SECRET and payload_secret != settings.CAKTO_WEBHOOK_SECRET:
-                logger.warning(f"Webhook não autorizado. Secret esperado: {settings.CAKTO_WEBHOOK_SECRET[:10]}...")
+
+            if not (
+                _secret_matches(secret, expected_secret)
+                or _secret_matches(payload.get("secret"), expected_secret)
+            ):
+                logger.warning("Webhook Cakto não autorizado (secret ausente ou inválido)")
                 raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Webhook não autorizado")
 
         event = _extract_event(payload)
@@ -347,99 +463,10 @@ async def cakto_webhook(request: Request, db: Session = Depends(get_db)):
             logger.error(traceback.format_exc())
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Erro na extração de dados")
 
-        # Buscar ou criar usuário (usando helper compartilhado)
-        try:
-            user, user_created, user_has_password = find_or_create_user(email, customer_data, db)
-            if user_created:
-                logger.info(f"Usuário {email} criado com ID {user.id}")
-        except Exception as reg_err:
-            logger.error(f"Erro ao registrar usuário via webhook: {str(reg_err)}")
-            logger.error(traceback.format_exc())
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao criar usuário")
-
-        # Atualizar assinatura
-        subscription_service = SubscriptionService(SubscriptionRepository(db))
-        
-        # Calcular expiração correta
-        expires_at = transaction_data.get("due_date")
-        recurrence_period = transaction_data.get("recurrence_period")
-        paid_at = transaction_data.get("paid_at")
-
-        if action == "activate":
-            expires_at = calculate_expires_at(expires_at, recurrence_period, paid_at)
-
-        try:
-            logger.info(f"Atualizando assinatura para usuário {user.id} (ação: {action})")
-            subscription = subscription_service.set_active(
-                user_id=user.id,
-                plan="marketdash" if action == "activate" else "free",
-                is_active=(action == "activate"),
-                cakto_customer_id=customer_data.get("customer_id"),
-                cakto_transaction_id=transaction_data.get("transaction_id"),
-                expires_at=expires_at,
-                cakto_status=transaction_data.get("subscription_status") or transaction_data.get("status"),
-                cakto_offer_name=transaction_data.get("offer_name"),
-                cakto_due_date=transaction_data.get("due_date"),
-                cakto_subscription_status=transaction_data.get("subscription_status"),
-                cakto_payment_status=transaction_data.get("payment_status"),
-                cakto_payment_method=transaction_data.get("payment_method"),
-                # Dual-write: provider_* fields
-                provider="cakto",
-                provider_customer_id=customer_data.get("customer_id"),
-                provider_transaction_id=transaction_data.get("transaction_id"),
-                provider_status=transaction_data.get("subscription_status") or transaction_data.get("status"),
-                provider_offer_name=transaction_data.get("offer_name"),
-                provider_due_date=transaction_data.get("due_date"),
-                provider_subscription_status=transaction_data.get("subscription_status"),
-                provider_payment_status=transaction_data.get("payment_status"),
-                provider_payment_method=transaction_data.get("payment_method"),
-            )
-            
-            # Commit final do status da assinatura
-            if action == "activate":
-                subscription.last_validation_at = datetime.now(timezone.utc)
-
-                # Programa de afiliados: se o usuário foi indicado, cria comissão
-                # idempotente (unique index em cakto_transaction_id evita duplicação).
-                try:
-                    from app.services.affiliate_service import AffiliateService
-                    AffiliateService(db).create_commission_from_payment(
-                        referred_user=user,
-                        subscription=subscription,
-                        amount=transaction_data.get("amount"),
-                        cakto_transaction_id=transaction_data.get("transaction_id"),
-                    )
-                except Exception as aff_err:
-                    # Falha de comissão não deve quebrar o webhook — só logar.
-                    logger.error("Erro ao criar comissão de afiliado: %s", aff_err)
-
-                db.commit()
-                db.refresh(subscription)
-                
-                # Enviar email via helper compartilhado
-                send_subscription_email(
-                    user=user,
-                    email=email,
-                    user_created=user_created,
-                    user_has_password=user_has_password,
-                    customer_name=customer_data.get("name"),
-                    db=db,
-                )
-
-            logger.info(f"Webhook processado com sucesso para {email}")
-            return {
-                "status": "ok",
-                "action": action,
-                "user_id": user.id,
-                "subscription_active": subscription.is_active,
-                "next_payment_date": subscription.cakto_due_date.isoformat() if subscription.cakto_due_date else None,
-                "user_created": user_created
-            }
-
-        except Exception as sub_err:
-            logger.error(f"Erro no processamento da assinatura: {str(sub_err)}")
-            logger.error(traceback.format_exc())
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(sub_err))
+        # DB e envio de e-mail são síncronos: rodar fora do event loop
+        return await run_in_threadpool(
+            _apply_webhook_action, db, email, action, customer_data, transaction_data
+        )
 
     except HTTPException:
         raise
@@ -452,15 +479,12 @@ async def cakto_webhook(request: Request, db: Session = Depends(get_db)):
         )
 
 
-@router.get("/plans", response_model=PlansResponse)
-def get_plans():
-    """
-    Retorna lista de todos os planos de assinatura disponíveis.
-    
-    Permite que o frontend exiba as opções de planos para o usuário escolher.
-    """
+PLANS_CACHE_CONTROL = "public, max-age=3600"
+
+
+def _build_plans_body() -> bytes:
     all_plans = settings.get_all_cakto_plans()
-    
+
     plans_list = [
         PlanInfo(
             id=plan_id,
@@ -470,8 +494,24 @@ def get_plans():
         )
         for plan_id, plan_data in all_plans.items()
     ]
+
+    return PlansResponse(plans=plans_list).model_dump_json().encode("utf-8")
+
+
+# CAKTO_PLANS é fixo por processo: serializa e calcula o ETag uma única vez.
+_PLANS_BODY = _build_plans_body()
+_PLANS_ETAG = make_etag(_PLANS_BODY)
+
+
+@router.get("/plans", response_model=PlansResponse)
+def get_plans(request: Request):
+    """
+    Retorna lista de todos os planos de assinatura disponíveis.
     
-    return PlansResponse(plans=plans_list)
+    Permite que o frontend exiba as opções de planos para o usuário escolher.
+    Resposta com ETag/Cache-Control: clientes com If-None-Match recebem 304.
+    """
+    return cached_response(request, _PLANS_BODY, _PLANS_ETAG, PLANS_CACHE_CONTROL)
 
 
 @router.get("/checkout-url")
@@ -1,23 +1,22 @@
-import base64
-from datetime import date
-from pathlib import Path
-from typing import List, Optional
-from uuid import uuid4
-
-import redis.exceptions
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi import APIRouter, Depends, File, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.api.v1.dependencies import require_active_subscription
+from app.api.v1.dependencies import get_click_service, get_read_click_service, require_active_subscription
+from app.api.v1.params import EndDate, Limit, Offset, StartDate
 from app.core.config import settings
 from app.db.session import get_db
 from app.models.dataset import Dataset
 from app.models.user import User
-from app.repositories.dataset_repository import DatasetRepository
-from app.repositories.click_row_repository import ClickRowRepository
 from app.schemas.click import ClickListResponse, ClickTaskResponse
 from app.services.click_service import ClickService
-from app.services.storage import upload_file_obj, is_storage_configured
+from app.services.upload_service import (
+    broker_errors_as_http,
+    check_csv_upload,
+    discard_upload,
+    enqueue_csv_task,
+    spool_upload,
+)
 from app.tasks.csv_tasks import process_click_csv_task
 
 router = APIRouter(tags=["clicks"])
@@ -28,141 +27,83 @@ async def upload_click_csv(
     file: UploadFile = File(...),
     current_user: User = Depends(require_active_subscription),
     db: Session = Depends(get_db),
+    click_service: ClickService = Depends(get_click_service),
 ):
     """Processa CSV de cliques. Se PROCESS_CSV_SYNC=true, processa na requisição e retorna status completed; senão enfileira via Celery (pending)."""
-    if not file.filename.endswith(".csv"):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Apenas arquivos CSV são permitidos")
+    check_csv_upload(file)
 
-    dataset_repo = DatasetRepository(db)
-    dataset = dataset_repo.create(
-        Dataset(user_id=current_user.id, filename=file.filename, type="click", status="pending")
-    )
-    db.commit()
-    db.refresh(dataset)
+    # Arquivo recebido antes de qualquer escrita no banco: upload recusado ou interrompido não cria dataset.
+    source = await spool_upload(file, current_user.id)
+    try:
+        dataset = click_service.dataset_repo.create(
+            Dataset(user_id=current_user.id, filename=file.filename, type="click", status="pending")
+        )
+        # id lido antes do commit: o flush (INSERT ... RETURNING) já o trouxe; após o commit o objeto expira.
+        dataset_id = dataset.id
+        db.commit()
+    except Exception:
+        await run_in_threadpool(discard_upload, source)
+        raise
 
     if settings.PROCESS_CSV_SYNC:
-        if settings.UPLOAD_TEMP_DIR:
-            path = Path(settings.UPLOAD_TEMP_DIR) / f"{dataset.id}_{uuid4().hex}.csv"
-            path.parent.mkdir(parents=True, exist_ok=True)
-            with open(path, "wb") as f:
-                while chunk := await file.read(1024 * 1024):
-                    f.write(chunk)
-            file_content = path.read_bytes()
-            try:
-                path.unlink(missing_ok=True)
-            except OSError:
-                pass
-        else:
-            file_content = await file.read()
-        click_service = ClickService(dataset_repo, ClickRowRepository(db))
-        click_service.process_click_csv(dataset.id, current_user.id, file_content, file.filename)
-        db.refresh(dataset)
+        try:
+            # Parse + upsert bloqueantes: fora do event loop para não travar as demais requisições.
+            await run_in_threadpool(click_service.process_click_csv, dataset_id, current_user.id, source, file.filename)
+        finally:
+            await run_in_threadpool(discard_upload, source)
         return {
-            "task_id": f"sync-{dataset.id}",
-            "dataset_id": dataset.id,
+            "task_id": f"sync-{dataset_id}",
+            "dataset_id": dataset_id,
             "status": "completed",
         }
 
+    # Upload ao storage e publicação no broker também são I/O bloqueante.
     try:
-        if settings.UPLOAD_TEMP_DIR:
-            path = Path(settings.UPLOAD_TEMP_DIR) / f"{dataset.id}_{uuid4().hex}.csv"
-            path.parent.mkdir(parents=True, exist_ok=True)
-            with open(path, "wb") as f:
-                while chunk := await file.read(1024 * 1024):
-                    f.write(chunk)
-            size = path.stat().st_size
-            if size <= settings.UPLOAD_INLINE_MAX_BYTES:
-                file_content = path.read_bytes()
-                try:
-                    path.unlink(missing_ok=True)
-                except OSError:
-                    pass
-                task = process_click_csv_task.delay(
-                    dataset.id, current_user.id, file.filename,
-                    file_path=None, file_content_b64=base64.b64encode(file_content).decode("utf-8"),
-                )
-            elif is_storage_configured():
-                # Large file: upload to S3 so worker can download (no shared disk needed)
-                from io import BytesIO
-                storage_key = f"uploads/temp/{dataset.id}_{uuid4().hex}.csv"
-                buf = BytesIO(path.read_bytes())
-                try:
-                    path.unlink(missing_ok=True)
-                except OSError:
-                    pass
-                if not upload_file_obj(settings.S3_BUCKET, storage_key, buf, content_type="text/csv"):
-                    raise HTTPException(
-                        status_code=status.HTTP_502_BAD_GATEWAY,
-                        detail="Failed to upload file to storage.",
-                    )
-                task = process_click_csv_task.delay(
-                    dataset.id, current_user.id, file.filename,
-                    file_path=None, file_content_b64=None, storage_key=storage_key,
-                )
-            else:
-                task = process_click_csv_task.delay(
-                    dataset.id, current_user.id, file.filename,
-                    file_path=str(path), file_content_b64=None,
-                )
-        else:
-            file_content = await file.read()
-            task = process_click_csv_task.delay(
-                dataset.id, current_user.id, file.filename,
-                file_path=None, file_content_b64=base64.b64encode(file_content).decode("utf-8"),
-            )
-    except redis.exceptions.AuthenticationError:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Redis: autenticação inválida. Configure REDIS_PASSWORD no ambiente com a senha do Redis, ou use REDIS_URL no formato redis://:SENHA@host:6379/0.",
-        )
-    except RuntimeError as e:
-        if "reconnect" in str(e).lower() and "redis" in str(e).lower():
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Redis: falha de conexão/autenticação. Verifique REDIS_URL e REDIS_PASSWORD no ambiente e reinicie a aplicação.",
-            )
+        with broker_errors_as_http():
+            task = await run_in_threadpool(enqueue_csv_task, process_click_csv_task, dataset_id, current_user.id, file.filename, source)
+    except Exception:
+        # Sem task o dataset nunca sairia de "pending": remove-o junto com o arquivo temporário.
+        await run_in_threadpool(discard_upload, source)
+        await run_in_threadpool(click_service.dataset_repo.delete_by_id, dataset_id, current_user.id)
         raise
 
     return {
         "task_id": task.id,
-        "dataset_id": dataset.id,
+        "dataset_id": dataset_id,
         "status": "pending",
     }
 
 
 @router.get("/latest/rows", response_model=ClickListResponse)
 def list_latest_clicks(
-    start_date: Optional[date] = Query(None, description="Data inicial"),
-    end_date: Optional[date] = Query(None, description="Data final"),
-    limit: Optional[int] = Query(None, ge=1, description="Limite de registros"),
-    offset: int = Query(0, ge=0, description="Ponto de partida"),
+    start_date: StartDate = None,
+    end_date: EndDate = None,
+    limit: Limit = None,
+    offset: Offset = 0,
     current_user: User = Depends(require_active_subscription),
-    db: Session = Depends(get_db),
+    service: ClickService = Depends(get_read_click_service),
 ):
     """Lista as linhas do último upload de cliques. Resposta inclui total_clicks (soma) e rows."""
-    service = ClickService(DatasetRepository(db), ClickRowRepository(db))
     return service.list_latest_clicks(current_user.id, start_date, end_date, limit, offset)
 
 
 @router.get("/all/rows", response_model=ClickListResponse)
 def list_all_clicks(
-    start_date: Optional[date] = Query(None, description="Data inicial"),
-    end_date: Optional[date] = Query(None, description="Data final"),
-    limit: Optional[int] = Query(None, ge=1, description="Limite de registros"),
-    offset: int = Query(0, ge=0, description="Ponto de partida"),
+    start_date: StartDate = None,
+    end_date: EndDate = None,
+    limit: Limit = None,
+    offset: Offset = 0,
     current_user: User = Depends(require_active_subscription),
-    db: Session = Depends(get_db),
+    service: ClickService = Depends(get_read_click_service),
 ):
     """Lista todo o histórico de cliques. Resposta inclui total_clicks (soma) e rows."""
-    service = ClickService(DatasetRepository(db), ClickRowRepository(db))
     return service.list_all_clicks(current_user.id, start_date, end_date, limit, offset)
 
 
 @router.delete("/all", status_code=status.HTTP_200_OK)
 def delete_all_clicks(
     current_user: User = Depends(require_active_subscription),
-    db: Session = Depends(get_db),
+    service: ClickService = Depends(get_click_service),
 ):
     """Remove permanentemente todos os dados de cliques do usuário."""
-    service = ClickService(DatasetRepository(db), ClickRowRepository(db))
     return service.delete_all_clicks(current_user.id)
@@ -4,8 +4,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
-from app.api.v1.dependencies import get_current_user, require_active_subscription
-from app.db.session import get_db
+from app.api.v1.dependencies import get_current_user, get_read_db, require_active_subscription
 from app.schemas.dashboard import DashboardFilters, DashboardResponse
 from app.services.dashboard_service import DashboardService
 
@@ -20,7 +19,7 @@ def get_dashboard(
     min_value: Optional[float] = Query(None, description="Valor mínimo"),
     max_value: Optional[float] = Query(None, description="Valor máximo"),
     current_user=Depends(require_active_subscription),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     filters = DashboardFilters(
         start_date=start_date,
@@ -1,31 +1,53 @@
-import base64
 from datetime import date
-from pathlib import Path
 from typing import List, Optional
-from uuid import uuid4
 
-import redis.exceptions
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
-from pydantic import BaseModel, Field
+import orjson
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.api.v1.dependencies import get_current_user, require_active_subscription
+from app.api.v1.dependencies import (
+    get_current_user,
+    get_dataset_service,
+    get_read_dataset_service,
+    read_session_for,
+    require_active_subscription,
+)
+from app.api.v1.params import AfterId, EndDate, Limit, Offset, StartDate
 from app.core.config import settings
 from app.db.session import get_db
 from app.models.user import User
 from app.repositories.dataset_repository import DatasetRepository
 from app.repositories.dataset_row_repository import DatasetRowRepository
-from app.schemas.dataset import DatasetResponse, DatasetRowResponse, AdSpendResponse, DatasetTaskResponse
+from app.schemas.dataset import AdSpendPayload, AdSpendResponse, DatasetResponse, DatasetRowResponse, DatasetTaskResponse
 from app.services.dataset_service import DatasetService
-from app.services.storage import upload_file_obj, is_storage_configured
+from app.services.upload_service import (
+    broker_errors_as_http,
+    check_csv_upload,
+    discard_upload,
+    enqueue_csv_task,
+    spool_upload,
+)
 from app.tasks.csv_tasks import process_csv_task
 
 router = APIRouter(tags=["datasets"])
 
 
-class AdSpendPayload(BaseModel):
-    amount: float = Field(..., gt=0, description="Valor investido em anúncios")
-    sub_id1: str | None = Field(None, description="Sub_id1 opcional para associar o gasto")
+def _set_next_cursor(response: Response, rows: List[dict], limit: Optional[int]) -> None:
+    """Página cheia: expõe o id da última linha em X-Next-Cursor (usar como after_id)."""
+    if limit and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = str(rows[-1]["id"])
+
+
+def _rows_response(rows: List[dict], limit: Optional[int]) -> Response:
+    """
+    Linhas já no formato de DatasetRowResponse (serialize_row_for_api), codificadas direto com
+    orjson: evita validar e serializar cada item pelo pydantic nas listagens grandes.
+    """
+    response = Response(content=orjson.dumps(rows), media_type="application/json")
+    _set_next_cursor(response, rows, limit)
+    return response
 
 
 @router.post("/upload", response_model=DatasetTaskResponse, status_code=status.HTTP_201_CREATED)
@@ -33,102 +55,48 @@ async def upload_csv(
     file: UploadFile = File(...),
     current_user: User = Depends(require_active_subscription),
     db: Session = Depends(get_db),
+    service: DatasetService = Depends(get_dataset_service),
 ):
     """Processa CSV de comissão/vendas. Se PROCESS_CSV_SYNC=true, processa na requisição e retorna status completed; senão enfileira via Celery (pending)."""
-    if not file.filename.endswith(".csv"):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Apenas arquivos CSV são permitidos")
+    check_csv_upload(file)
 
-    service = DatasetService(DatasetRepository(db), DatasetRowRepository(db))
-    dataset = service.create_dataset(current_user.id, file.filename)
-    db.commit()
-    db.refresh(dataset)
+    # Arquivo recebido antes de qualquer escrita no banco: upload recusado ou interrompido não cria dataset.
+    source = await spool_upload(file, current_user.id)
+    try:
+        dataset = service.create_dataset(current_user.id, file.filename)
+        # id lido antes do commit: o flush (INSERT ... RETURNING) já o trouxe; após o commit o objeto expira.
+        dataset_id = dataset.id
+        db.commit()
+    except Exception:
+        await run_in_threadpool(discard_upload, source)
+        raise
 
     if settings.PROCESS_CSV_SYNC:
         # Processamento síncrono: sem Celery; dados disponíveis logo após o upload (útil quando não há worker).
-        if settings.UPLOAD_TEMP_DIR:
-            path = Path(settings.UPLOAD_TEMP_DIR) / f"{dataset.id}_{uuid4().hex}.csv"
-            path.parent.mkdir(parents=True, exist_ok=True)
-            with open(path, "wb") as f:
-                while chunk := await file.read(1024 * 1024):
-                    f.write(chunk)
-            file_content = path.read_bytes()
-            try:
-                path.unlink(missing_ok=True)
-            except OSError:
-                pass
-        else:
-            file_content = await file.read()
-        service.process_commission_csv(dataset.id, current_user.id, file_content, file.filename)
-        db.refresh(dataset)
+        try:
+            # Parse + upsert bloqueantes: fora do event loop para não travar as demais requisições.
+            await run_in_threadpool(service.process_commission_csv, dataset_id, current_user.id, source, file.filename)
+        finally:
+            await run_in_threadpool(discard_upload, source)
         return {
-            "task_id": f"sync-{dataset.id}",
-            "dataset_id": dataset.id,
+            "task_id": f"sync-{dataset_id}",
+            "dataset_id": dataset_id,
             "status": "completed",
         }
 
+    # Upload ao storage e publicação no broker também são I/O bloqueante.
     try:
-        if settings.UPLOAD_TEMP_DIR:
-            path = Path(settings.UPLOAD_TEMP_DIR) / f"{dataset.id}_{uuid4().hex}.csv"
-            path.parent.mkdir(parents=True, exist_ok=True)
-            with open(path, "wb") as f:
-                while chunk := await file.read(1024 * 1024):
-                    f.write(chunk)
-            size = path.stat().st_size
-            if size <= settings.UPLOAD_INLINE_MAX_BYTES:
-                file_content = path.read_bytes()
-                try:
-                    path.unlink(missing_ok=True)
-                except OSError:
-                    pass
-                task = process_csv_task.delay(
-                    dataset.id, current_user.id, file.filename,
-                    file_path=None, file_content_b64=base64.b64encode(file_content).decode("utf-8"),
-                )
-            elif is_storage_configured():
-                # Large file: upload to S3 so worker can download (no shared disk needed)
-                from io import BytesIO
-                storage_key = f"uploads/temp/{dataset.id}_{uuid4().hex}.csv"
-                buf = BytesIO(path.read_bytes())
-                try:
-                    path.unlink(missing_ok=True)
-                except OSError:
-                    pass
-                if not upload_file_obj(settings.S3_BUCKET, storage_key, buf, content_type="text/csv"):
-                    raise HTTPException(
-                        status_code=status.HTTP_502_BAD_GATEWAY,
-                        detail="Failed to upload file to storage.",
-                    )
-                task = process_csv_task.delay(
-                    dataset.id, current_user.id, file.filename,
-                    file_path=None, file_content_b64=None, storage_key=storage_key,
-                )
-            else:
-                task = process_csv_task.delay(
-                    dataset.id, current_user.id, file.filename,
-                    file_path=str(path), file_content_b64=None,
-                )
-        else:
-            file_content = await file.read()
-            task = process_csv_task.delay(
-                dataset.id, current_user.id, file.filename,
-                file_path=None, file_content_b64=base64.b64encode(file_content).decode("utf-8"),
-            )
-    except redis.exceptions.AuthenticationError:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Redis: autenticação inválida. Configure REDIS_PASSWORD no ambiente com a senha do Redis, ou use REDIS_URL no formato redis://:SENHA@host:6379/0.",
-        )
-    except RuntimeError as e:
-        if "reconnect" in str(e).lower() and "redis" in str(e).lower():
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Redis: falha de conexão/autenticação. Verifique REDIS_URL e REDIS_PASSWORD no ambiente e reinicie a aplicação.",
-            )
+        with broker_errors_as_http():
+            task = await run_in_threadpool(enqueue_csv_task, process_csv_task, dataset_id, current_user.id, file.filename, source)
+    except Exception:
+        # Sem task o dataset nunca sairia de "pending": remove-o junto com o arquivo temporário.
+        await run_in_threadpool(discard_upload, source)
+        await run_in_threadpool(service.dataset_repo.delete_by_id, dataset_id, current_user.id)
         raise
 
     return {
         "task_id": task.id,
-        "dataset_id": dataset.id,
+        "dataset_id": dataset_id,
         "status": "pending",
     }
 
@@ -137,9 +105,8 @@ async def upload_csv(
 def get_dataset_status(
     dataset_id: int,
     current_user: User = Depends(require_active_subscription),
-    db: Session = Depends(get_db),
+    service: DatasetService = Depends(get_dataset_service),
 ):
-    service = DatasetService(DatasetRepository(db), DatasetRowRepository(db))
     return service.get_dataset(dataset_id, current_user.id)
 
 
@@ -148,86 +115,132 @@ def set_ad_spend(
     payload: AdSpendPayload,
     current_user: User = Depends(require_active_subscription),
     db: Session = Depends(get_db),
+    service: DatasetService = Depends(get_dataset_service),
 ):
-    service = DatasetService(DatasetRepository(db), DatasetRowRepository(db))
     return service.apply_ad_spend(current_user.id, payload.amount, payload.sub_id1, db)
 
 
-@router.get("/latest/rows", response_model=List[DatasetRowResponse])
+@router.get("/latest/rows", response_model=None, responses={200: {"model": List[DatasetRowResponse]}})
 def list_latest_rows(
-    start_date: date | None = Query(None, description="Data inicial (opcional)"),
-    end_date: date | None = Query(None, description="Data final (opcional)"),
-    limit: int | None = Query(None, ge=1, description="Quantidade máxima de linhas (opcional)"),
-    offset: int = Query(0, ge=0, description="Deslocamento para paginação"),
+    start_date: StartDate = None,
+    end_date: EndDate = None,
+    limit: Limit = None,
+    offset: Offset = 0,
+    after_id: AfterId = None,
     current_user: User = Depends(require_active_subscription),
-    db: Session = Depends(get_db),
+    service: DatasetService = Depends(get_read_dataset_service),
 ):
-    service = DatasetService(DatasetRepository(db), DatasetRowRepository(db))
-    return service.list_latest_rows(current_user.id, start_date, end_date, limit, offset)
+    rows = service.list_latest_rows(current_user.id, start_date, end_date, limit, offset, after_id)
+    return _rows_response(rows, limit)
 
 
-@router.get("/all/rows", response_model=List[DatasetRowResponse])
+@router.get("/all/rows", response_model=None, responses={200: {"model": List[DatasetRowResponse]}})
 def list_all_rows(
-    start_date: date | None = Query(None, description="Data inicial (opcional)"),
-    end_date: date | None = Query(None, description="Data final (opcional)"),
-    limit: int | None = Query(None, ge=1, description="Quantidade máxima de linhas (opcional)"),
-    offset: int = Query(0, ge=0, description="Deslocamento para paginação"),
+    start_date: StartDate = None,
+    end_date: EndDate = None,
+    limit: Limit = None,
+    offset: Offset = 0,
+    after_id: AfterId = None,
+    current_user: User = Depends(require_active_subscription),
+    service: DatasetService = Depends(get_read_dataset_service),
+):
+    rows = service.list_all_rows(current_user.id, start_date, end_date, limit, offset, after_id)
+    return _rows_response(rows, limit)
+
+
+def _ndjson_response(user_id: int, start_date: Optional[date], end_date: Optional[date], rows_for) -> StreamingResponse:
+    """
+    Streaming NDJSON: o gerador abre a própria sessão (a do Depends já foi fechada quando o corpo
+    é enviado) e `rows_for(service)` produz as linhas em lotes (yield_per).
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Data inicial não pode ser maior que a data final.")
+
+    def body():
+        with read_session_for(user_id) as db:
+            service = DatasetService(DatasetRepository(db), DatasetRowRepository(db))
+            yield from rows_for(service)
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+@router.get("/latest/rows.ndjson")
+def stream_latest_rows(
+    start_date: StartDate = None,
+    end_date: EndDate = None,
+    current_user: User = Depends(require_active_subscription),
+):
+    """Mesmo conteúdo de /latest/rows (sem paginação), em NDJSON e em streaming."""
+    user_id = current_user.id
+    return _ndjson_response(
+        user_id, start_date, end_date,
+        lambda service: service.iter_latest_rows_ndjson(user_id, start_date, end_date),
+    )
+
+
+@router.get("/all/rows.ndjson")
+def stream_all_rows(
+    start_date: StartDate = None,
+    end_date: EndDate = None,
     current_user: User = Depends(require_active_subscription),
-    db: Session = Depends(get_db),
 ):
-    service = DatasetService(DatasetRepository(db), DatasetRowRepository(db))
-    return service.list_all_rows(current_user.id, start_date, end_date, limit, offset)
+    """Mesmo conteúdo de /all/rows, em NDJSON e em streaming (histórico completo sem montar a lista em memória)."""
+    user_id = current_user.id
+    return _ndjson_response(
+        user_id, start_date, end_date,
+        lambda service: service.iter_all_rows_ndjson(user_id, start_date, end_date),
+    )
 
 
 @router.get("", response_model=List[DatasetResponse])
 def list_datasets(
     current_user: User = Depends(require_active_subscription),
-    db: Session = Depends(get_db),
+    service: DatasetService = Depends(get_read_dataset_service),
 ):
-    service = DatasetService(DatasetRepository(db), DatasetRowRepository(db))
     return service.list_datasets(current_user.id)
 
 
 @router.delete("/all", status_code=status.HTTP_200_OK)
 def delete_all_datasets(
     current_user: User = Depends(require_active_subscription),
-    db: Session = Depends(get_db),
+    service: DatasetService = Depends(get_dataset_service),
 ):
     """Deleta todos os datasets do usuário autenticado."""
-    service = DatasetService(DatasetRepository(db), DatasetRowRepository(db))
     return service.delete_all(current_user.id)
 
 
-@router.get("/{dataset_id}/rows", response_model=List[DatasetRowResponse])
+@router.get("/{dataset_id}/rows", response_model=None, responses={200: {"model": List[DatasetRowResponse]}})
 def list_dataset_rows(
     dataset_id: int,
     start_date: date = Query(..., description="Data inicial (obrigatória)"),
     end_date: date = Query(..., description="Data final (obrigatória)"),
+    limit: Limit = None,
+    after_id: AfterId = None,
     current_user: User = Depends(require_active_subscription),
-    db: Session = Depends(get_db),
+    service: DatasetService = Depends(get_read_dataset_service),
 ):
-    service = DatasetService(DatasetRepository(db), DatasetRowRepository(db))
     # O service já valida se o dataset pertence ao usuário (filtra por user_id primeiro)
-    return service.list_dataset_rows(dataset_id, current_user.id, start_date, end_date)
+    rows = service.list_dataset_rows(dataset_id, current_user.id, start_date, end_date, limit, after_id)
+    return _rows_response(rows, limit)
 
 
 @router.get("/{dataset_id}", response_model=DatasetResponse)
 def get_dataset(
     dataset_id: int,
     current_user: User = Depends(require_active_subscription),
-    db: Session = Depends(get_db),
+    service: DatasetService = Depends(get_dataset_service),
 ):
-    service = DatasetService(DatasetRepository(db), DatasetRowRepository(db))
     # O service já valida se o dataset pertence ao usuário (filtra por user_id primeiro)
     return service.get_dataset(dataset_id, current_user.id)
 
 
 @router.post("/{dataset_id}/refresh", response_model=DatasetResponse)
-async def refresh_dataset(
+def refresh_dataset(
     dataset_id: int,
     current_user: User = Depends(require_active_subscription),
-    db: Session = Depends(get_db),
+    service: DatasetService = Depends(get_dataset_service),
 ):
-    service = DatasetService(DatasetRepository(db), DatasetRowRepository(db))
+    # Reservado para integração futura com API externa (ver README); por ora devolve o dataset.
+    # `def` (não async): a consulta síncrona roda no threadpool, sem bloquear o event loop.
     # O service já valida se o dataset pertence ao usuário (filtra por user_id primeiro)
     return service.get_dataset(dataset_id, current_user.id)
@@ -5,7 +5,7 @@ Substitui o uso de FormSubmit.co para garantir que o feedback chegue ao email co
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, BackgroundTasks, Depends, status
 
 from app.api.v1.dependencies import get_current_user_optional
 from app.models.user import User
@@ -27,11 +27,13 @@ router = APIRouter(tags=["feedback"])
 )
 def send_feedback(
     body: FeedbackRequest,
+    background_tasks: BackgroundTasks,
     current_user: Optional[User] = Depends(get_current_user_optional),
 ) -> FeedbackResponse:
     """
     Recebe a mensagem de feedback (e opcionalmente nome/email no body).
     Se o usuário estiver logado (Bearer token), enriquece o email com user_id, email e nome do usuário.
+    O email é enviado em background: a resposta não espera o SMTP.
     """
     user_id: Optional[int] = None
     user_email: Optional[str] = body.email
@@ -42,15 +44,18 @@ def send_feedback(
         user_name = user_name or current_user.name or current_user.email
 
     email_service = EmailService()
-    success = email_service.send_feedback_email(
+    if not email_service.is_configured():
+        logger.error("Feedback não enviado: credenciais SMTP não configuradas")
+        return FeedbackResponse(
+            success=False,
+            message="Não foi possível enviar o feedback no momento. Tente novamente mais tarde.",
+        )
+    # SMTP é bloqueante (centenas de ms): o envio roda depois da resposta, no threadpool.
+    background_tasks.add_task(
+        email_service.send_feedback_email,
         data=body.data,
         user_name=user_name,
         user_email=user_email,
         user_id=user_id,
     )
-    if success:
-        return FeedbackResponse(success=True, message="Feedback enviado com sucesso.")
-    return FeedbackResponse(
-        success=False,
-        message="Não foi possível enviar o feedback no momento. Tente novamente mais tarde.",
-    )
+    return FeedbackResponse(success=True, message="Feedback enviado com sucesso.")
@@ -2,25 +2,21 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 
-from app.api.v1.dependencies import require_active_subscription
+from app.api.v1.dependencies import get_job_service, require_active_subscription
 from app.core.config import settings
-from app.db.session import get_db
-from app.models.dataset import Dataset
-from app.models.job import Job
 from app.models.user import User
-from app.repositories.dataset_repository import DatasetRepository
-from app.repositories.job_repository import JobRepository
-from app.services.job_service import JobService
+from app.services.csv_service import is_csv_filename
+from app.services.job_service import JobService, enqueue_job
 from app.services.storage import upload_file_obj, is_storage_configured
-from app.tasks.job_tasks import process_job_from_storage
 from pydantic import BaseModel, Field
 
 router = APIRouter(tags=["jobs"])
 
 
 class JobCreateBody(BaseModel):
-    filename: str = Field(..., min_length=1, description="CSV filename (e.g. data.csv)")
+    filename: str = Field(..., min_length=1, description="CSV filename (e.g. data.csv or data.csv.gz)")
     type: str = Field("transaction", description="transaction or click")
 
 
@@ -60,13 +56,12 @@ class JobListItem(BaseModel):
 def create_job(
     body: JobCreateBody,
     current_user: User = Depends(require_active_subscription),
-    db=Depends(get_db),
+    service: JobService = Depends(get_job_service),
 ):
     """
     Create a job and dataset; returns a presigned PUT URL.
     Client must upload the CSV file to upload_url (PUT with body = file content), then call POST /jobs/{job_id}/commit.
     """
-    service = JobService(JobRepository(db), DatasetRepository(db))
     result = service.create_job(current_user.id, body.filename, body.type)
     return result
 
@@ -82,72 +77,51 @@ async def upload_job_file(
     file: UploadFile = File(...),
     type: str = "transaction",
     current_user: User = Depends(require_active_subscription),
-    db=Depends(get_db),
+    service: JobService = Depends(get_job_service),
 ):
     """
     Fallback: upload CSV in request body (streaming). File is written to storage in chunks (1–4 MB),
-    then job + dataset are created and split_and_enqueue_chunks is enqueued. Use when client cannot use presigned PUT.
+    then job + dataset are created and process_job_from_storage is enqueued. Use when client cannot use presigned PUT.
     """
     if not is_storage_configured():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Armazenamento de arquivos não configurado. Entre em contato com o suporte.",
         )
-    if not file.filename or not file.filename.endswith(".csv"):
+    if not is_csv_filename(file.filename):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Envie um arquivo no formato CSV.")
     if type not in ("transaction", "click"):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tipo de arquivo inválido. Use 'transaction' para comissões ou 'click' para cliques.")
 
-    from io import BytesIO
     from uuid import uuid4
 
     job_id = uuid4()
     storage_key = f"uploads/{job_id}/{file.filename}"
     bucket = settings.S3_BUCKET
-    buf = BytesIO()
-    chunk_size = 4 * 1024 * 1024  # 4 MB
-    while chunk := await file.read(chunk_size):
-        buf.write(chunk)
-    buf.seek(0)
-    if not upload_file_obj(bucket, storage_key, buf, content_type="text/csv"):
+    # O corpo já está no SpooledTemporaryFile do UploadFile: envia direto (multipart em partes),
+    # sem copiar o arquivo inteiro para um BytesIO. boto3 é bloqueante, então roda no threadpool.
+    await file.seek(0)
+    if not await run_in_threadpool(upload_file_obj, bucket, storage_key, file.file, "text/csv"):
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Não foi possível armazenar o arquivo. Tente novamente em instantes.")
 
-    dataset = Dataset(
-        user_id=current_user.id,
-        filename=file.filename,
-        type=type,
-        status="pending",
+    dataset_id = service.create_dataset_with_job(
+        current_user.id, file.filename, type, job_id, storage_key, "processing"
     )
-    dataset_repo = DatasetRepository(db)
-    job_repo = JobRepository(db)
-    dataset_repo.create(dataset)
-    job_repo.db.flush()
-    job = Job(
-        job_id=job_id,
-        dataset_id=dataset.id,
-        user_id=current_user.id,
-        type=type,
-        storage_key=storage_key,
-        status="processing",
-    )
-    job_repo.create(job)
-    job_repo.db.commit()
 
-    process_job_from_storage.delay(str(job_id))
-    return {"job_id": str(job_id), "dataset_id": dataset.id, "status": "processing"}
+    enqueue_job(job_id)
+    return {"job_id": str(job_id), "dataset_id": dataset_id, "status": "processing"}
 
 
 @router.post("/{job_id}/commit", response_model=JobCommitResponse, status_code=status.HTTP_202_ACCEPTED)
 def commit_job(
     job_id: UUID,
     current_user: User = Depends(require_active_subscription),
-    db=Depends(get_db),
+    service: JobService = Depends(get_job_service),
 ):
     """
     Confirm upload and start processing. File must already be uploaded to the presigned URL.
     Returns 202 Accepted; poll GET /jobs/{job_id} for progress.
     """
-    service = JobService(JobRepository(db), DatasetRepository(db))
     result = service.commit_job(job_id, current_user.id)
     return result
 
@@ -156,24 +130,25 @@ def commit_job(
 def get_job(
     job_id: UUID,
     current_user: User = Depends(require_active_subscription),
-    db=Depends(get_db),
+    service: JobService = Depends(get_job_service),
 ):
     """Get job status and progress (total_chunks, chunks_done, errors)."""
-    service = JobService(JobRepository(db), DatasetRepository(db))
     return service.get_job(job_id, current_user.id)
 
 
 @router.get("", response_model=list[JobListItem])
 def list_jobs(
     current_user: User = Depends(require_active_subscription),
-    db=Depends(get_db),
+    service: JobService = Depends(get_job_service),
     limit: int = 50,
 ):
     """List jobs for the current user, most recent first."""
-    service = JobService(JobRepository(db), DatasetRepository(db))
     return service.list_jobs(current_user.id, limit=limit)
 
 
+MULTIPART_MAX_PARTS = 10000
+
+
 class MultipartUploadInitResponse(BaseModel):
     job_id: str
     dataset_id: int
@@ -182,7 +157,7 @@ class MultipartUploadInitResponse(BaseModel):
 
 
 class MultipartUploadPartRequest(BaseModel):
-    part_number: int = Field(..., ge=1, le=10000, description="Part number (1-10000)")
+    part_number: int = Field(..., ge=1, le=MULTIPART_MAX_PARTS, description="Part number (1-10000)")
 
 
 class MultipartUploadPartResponse(BaseModel):
@@ -191,6 +166,11 @@ class MultipartUploadPartResponse(BaseModel):
     expires_in: int
 
 
+class MultipartUploadPartsRequest(BaseModel):
+    first_part: int = Field(1, ge=1, le=MULTIPART_MAX_PARTS, description="First part number of the batch")
+    count: int = Field(..., ge=1, le=1000, description="How many consecutive part URLs to sign (1-1000)")
+
+
 class MultipartUploadCompleteRequest(BaseModel):
     parts: list[dict] = Field(..., description='List of {"PartNumber": int, "ETag": str}')
 
@@ -199,12 +179,12 @@ class MultipartUploadCompleteRequest(BaseModel):
 def init_multipart_upload(
     body: JobCreateBody,
     current_user: User = Depends(require_active_subscription),
-    db=Depends(get_db),
+    service: JobService = Depends(get_job_service),
 ):
     """
     Initiate multipart upload for large files (>20MB recommended).
     Returns upload_id and storage_key. Client should:
-    1. Call POST /jobs/multipart/{job_id}/part for each chunk (5MB-5GB per part)
+    1. Call POST /jobs/multipart/{job_id}/parts for a batch of part URLs (or .../part per chunk; 5MB-5GB per part)
     2. Upload each part to the presigned URL (PUT with body = chunk)
     3. Collect ETags from response headers
     4. Call POST /jobs/multipart/{job_id}/complete with parts list
@@ -228,31 +208,13 @@ def init_multipart_upload(
             detail="Failed to initiate multipart upload.",
         )
 
-    dataset = Dataset(
-        user_id=current_user.id,
-        filename=body.filename,
-        type=body.type,
-        status="pending",
-    )
-    dataset_repo = DatasetRepository(db)
-    job_repo = JobRepository(db)
-    dataset_repo.create(dataset)
-    job_repo.db.flush()
-
-    job = Job(
-        job_id=job_id,
-        dataset_id=dataset.id,
-        user_id=current_user.id,
-        type=body.type,
-        storage_key=storage_key,
-        status="queued",
+    dataset_id = service.create_dataset_with_job(
+        current_user.id, body.filename, body.type, job_id, storage_key, "queued"
     )
-    job_repo.create(job)
-    job_repo.db.commit()
 
     return {
         "job_id": str(job_id),
-        "dataset_id": dataset.id,
+        "dataset_id": dataset_id,
         "upload_id": upload_id,
         "storage_key": storage_key,
     }
@@ -264,7 +226,7 @@ def get_multipart_part_url(
     body: MultipartUploadPartRequest,
     upload_id: str,
     current_user: User = Depends(require_active_subscription),
-    db=Depends(get_db),
+    service: JobService = Depends(get_job_service),
 ):
     """
     Generate presigned URL for uploading a single part.
@@ -272,10 +234,7 @@ def get_multipart_part_url(
     """
     from app.services.storage import create_presigned_upload_part
 
-    job_repo = JobRepository(db)
-    job = job_repo.get_by_id(job_id, user_id=current_user.id)
-    if not job:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Processamento não encontrado.")
+    job = service.get_owned_job(job_id, current_user.id)
 
     url = create_presigned_upload_part(
         settings.S3_BUCKET,
@@ -297,13 +256,56 @@ def get_multipart_part_url(
     }
 
 
+@router.post("/multipart/{job_id}/parts", response_model=list[MultipartUploadPartResponse])
+def get_multipart_part_urls(
+    job_id: UUID,
+    body: MultipartUploadPartsRequest,
+    upload_id: str,
+    current_user: User = Depends(require_active_subscription),
+    service: JobService = Depends(get_job_service),
+):
+    """
+    Generate presigned URLs for `count` consecutive parts starting at `first_part`.
+    One API call per batch instead of one per part: the client can PUT the parts in parallel.
+    """
+    from app.services.storage import create_presigned_upload_parts
+
+    last_part = body.first_part + body.count - 1
+    if last_part > MULTIPART_MAX_PARTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Part numbers must be between 1 and {MULTIPART_MAX_PARTS}.",
+        )
+
+    job = service.get_owned_job(job_id, current_user.id)
+
+    part_numbers = range(body.first_part, last_part + 1)
+    urls = create_presigned_upload_parts(
+        settings.S3_BUCKET,
+        job.storage_key,
+        upload_id,
+        part_numbers,
+        expires_in=3600,
+    )
+    if not urls:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Failed to generate presigned URLs for parts.",
+        )
+
+    return [
+        {"part_number": part_number, "upload_url": url, "expires_in": 3600}
+        for part_number, url in zip(part_numbers, urls)
+    ]
+
+
 @router.post("/multipart/{job_id}/complete", response_model=JobCommitResponse, status_code=status.HTTP_202_ACCEPTED)
 def complete_multipart_upload_endpoint(
     job_id: UUID,
     upload_id: str,
     body: MultipartUploadCompleteRequest,
     current_user: User = Depends(require_active_subscription),
-    db=Depends(get_db),
+    service: JobService = Depends(get_job_service),
 ):
     """
     Complete multipart upload and start processing.
@@ -311,10 +313,7 @@ def complete_multipart_upload_endpoint(
     """
     from app.services.storage import complete_multipart_upload
 
-    job_repo = JobRepository(db)
-    job = job_repo.get_by_id(job_id, user_id=current_user.id)
-    if not job:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Processamento não encontrado.")
+    job = service.get_owned_job(job_id, current_user.id)
 
     if not complete_multipart_upload(settings.S3_BUCKET, job.storage_key, upload_id, body.parts):
         raise HTTPException(
@@ -322,10 +321,7 @@ def complete_multipart_upload_endpoint(
             detail="Failed to complete multipart upload.",
         )
 
-    job.status = "processing"
-    job_repo.db.commit()
-
-    process_job_from_storage.delay(str(job_id))
+    service.start_processing(job)
 
     return {
         "job_id": str(job_id),
@@ -339,36 +335,29 @@ def abort_multipart_upload_endpoint(
     job_id: UUID,
     upload_id: str,
     current_user: User = Depends(require_active_subscription),
-    db=Depends(get_db),
+    service: JobService = Depends(get_job_service),
 ):
     """Abort multipart upload (cleanup). Call this if upload fails or is cancelled."""
     from app.services.storage import abort_multipart_upload
 
-    job_repo = JobRepository(db)
-    job = job_repo.get_by_id(job_id, user_id=current_user.id)
-    if not job:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Processamento não encontrado.")
+    job = service.get_owned_job(job_id, current_user.id)
 
     abort_multipart_upload(settings.S3_BUCKET, job.storage_key, upload_id)
 
-    job.status = "cancelled"
-    job_repo.db.commit()
+    service.cancel_job(job)
 
 
 @router.post("/{job_id}/retry", response_model=JobCommitResponse, status_code=status.HTTP_202_ACCEPTED)
 def retry_job(
     job_id: UUID,
     current_user: User = Depends(require_active_subscription),
-    db=Depends(get_db),
+    service: JobService = Depends(get_job_service),
 ):
     """
     Retry a stuck or failed job. Resets chunks_done and re-enqueues the task.
     Only works for jobs in 'pending', 'error', or 'cancelled' status.
     """
-    job_repo = JobRepository(db)
-    job = job_repo.get_by_id(job_id, user_id=current_user.id)
-    if not job:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Processamento não encontrado.")
+    job = service.get_owned_job(job_id, current_user.id)
 
     if job.status not in ("pending", "error", "cancelled", "queued"):
         raise HTTPException(
@@ -384,11 +373,7 @@ def retry_job(
             detail="File not found in storage. Cannot retry job without uploaded file.",
         )
 
-    job.status = "processing"
-    job.chunks_done = 0
-    job_repo.db.commit()
-
-    process_job_from_storage.delay(str(job_id))
+    service.start_processing(job, reset_progress=True)
 
     return {
         "job_id": str(job_id),
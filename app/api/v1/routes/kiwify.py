@@ -239,15 +239,8 @@ def _extract_transaction_data(order: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _get_allowed_products() -> Set[str]:
-    raw = settings.KIWIFY_SUBSCRIPTION_PRODUCT_IDS or ""
-    if not raw:
-        return set()
-    return {p.strip() for p in raw.split(",") if p.strip()}
-
-
 def _product_allowed(product_id: Optional[str]) -> bool:
-    allowed = _get_allowed_products()
+    allowed = settings.kiwify_product_ids
     if not allowed:
         return True  # Se não há filtro, aceita todos
     if not product_id:
@@ -406,6 +399,8 @@ async def kiwify_webhook(
                     current.assinatura_status = "inadimplente"
                     db.commit()
                     db.refresh(current)
+                    # assinatura_status faz parte do /subscription/status cacheado
+                    SubscriptionService.invalidate_access_cache(user.id, user.email)
                 logger.info(f"Kiwify late payment marcado para {email}")
                 return {
                     "status": "ok",
@@ -446,6 +441,7 @@ async def kiwify_webhook(
                 provider_payment_status=transaction_data.get("payment_status"),
                 provider_payment_method=transaction_data.get("payment_method"),
                 provider_order_id=transaction_data.get("transaction_id"),
+                email=user.email,
             )
 
             if action == "activate":
@@ -453,6 +449,8 @@ async def kiwify_webhook(
                 db.commit()
                 db.refresh(subscription)
                 db.refresh(user)
+                # last_validation_at gravado depois do set_active: descarta status cacheado no intervalo
+                SubscriptionService.invalidate_access_cache(user.id, user.email)
 
                 background_tasks.add_task(
                     _send_email_background,
@@ -7,9 +7,13 @@ registrados separadamente pois são URLs fixas para os providers externos.
 """
 
 import logging
+from functools import lru_cache
+from typing import Tuple
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
 
+from app.core.feature_flags import get_payment_provider
+from app.core.http_cache import cached_response, make_etag
 from app.schemas.subscription import PlansResponse
 from app.services.payment_provider_service import get_plans, get_checkout_url
 
@@ -18,11 +22,21 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["payment"])
 
 
+PLANS_CACHE_CONTROL = "public, max-age=3600"
+
+
+@lru_cache(maxsize=None)
+def _plans_payload(provider: str) -> Tuple[bytes, str]:
+    """Corpo serializado + ETag dos planos do provider (planos são fixos por processo)."""
+    body = PlansResponse(plans=get_plans()).model_dump_json().encode("utf-8")
+    return body, make_etag(body)
+
+
 @router.get("/plans", response_model=PlansResponse)
-def payment_plans():
+def payment_plans(request: Request):
     """Retorna planos do provider ativo (Cakto ou Kiwify)."""
-    plans = get_plans()
-    return PlansResponse(plans=plans)
+    body, etag = _plans_payload(get_payment_provider())
+    return cached_response(request, body, etag, PLANS_CACHE_CONTROL)
 
 
 @router.get("/checkout-url")
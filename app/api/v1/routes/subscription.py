@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, status, HTTPException, Query
+import orjson
+from fastapi import APIRouter, Depends, status, Query, Request, Response
 from sqlalchemy.orm import Session
-from datetime import datetime, timezone, timedelta
-from typing import Optional
 
 from app.api.v1.dependencies import get_current_user, get_user_plan_context
+from app.core.http_cache import cached_response, make_etag
 from app.db.session import get_db
 from app.models.user import User
 from app.repositories.subscription_repository import SubscriptionRepository
@@ -12,16 +12,41 @@ from app.schemas.subscription import CancelSubscriptionResponse
 
 router = APIRouter(tags=["subscription"])
 
+# Status é por usuário e muda sem aviso: o cliente guarda a resposta mas revalida sempre (If-None-Match)
+STATUS_CACHE_CONTROL = "private, no-cache"
+
+# Respostas constantes serializadas uma vez no import; cada requisição só embrulha os bytes num Response
+# (o objeto Response não é reaproveitado: middlewares como o CORS alteram a lista de headers enviada).
+_ALREADY_CANCELLED_BODY = CancelSubscriptionResponse(
+    message="Assinatura já está cancelada ou não existe",
+    subscription_cancelled=False,
+    note="Sua assinatura já estava inativa."
+).model_dump_json().encode("utf-8")
+_CANCELLED_BODY = CancelSubscriptionResponse(
+    message="Assinatura cancelada com sucesso",
+    subscription_cancelled=True,
+    note="Para cancelar completamente na Cakto, acesse sua conta na plataforma Cakto. O cancelamento será processado automaticamente via webhook."
+).model_dump_json().encode("utf-8")
+
+
+def _json(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
 
 @router.get("/status")
 def get_subscription_status(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Retorna o status da assinatura do usuário atual."""
+    """
+    Retorna o status da assinatura do usuário atual.
+    Resposta com ETag: polling com If-None-Match recebe 304 sem corpo enquanto o status não muda.
+    """
     subscription_service = SubscriptionService(SubscriptionRepository(db))
     status_data = subscription_service.get_subscription_status(current_user.id)
-    return status_data
+    body = orjson.dumps(status_data, default=str)
+    return cached_response(request, body, make_etag(body), STATUS_CACHE_CONTROL)
 
 
 @router.get("/plan")
@@ -44,43 +69,8 @@ def check_subscription_status(
     **Nota**: Este endpoint é público (não requer autenticação) para permitir verificação
     após o checkout da Cakto, antes do usuário fazer login.
     """
-    from app.models.user import User
-    from app.repositories.subscription_repository import SubscriptionRepository
-    
-    # Buscar usuário por email
-    user = db.query(User).filter(User.email.ilike(email)).first()
-    if not user:
-        return {
-            "subscription_activated": False,
-            "message": "Usuário não encontrado"
-        }
-    
-    # Buscar subscription
-    subscription_repo = SubscriptionRepository(db)
-    subscription = subscription_repo.get_by_user_id(user.id)
-    
-    if not subscription:
-        return {
-            "subscription_activated": False,
-            "message": "Assinatura não encontrada"
-        }
-    
-    # Verificar se foi ativada recentemente (últimos 5 minutos)
-    now = datetime.now(timezone.utc)
-    recently_activated = False
-    
-    if subscription.is_active and subscription.last_validation_at:
-        time_diff = now - subscription.last_validation_at
-        # Considerar ativada se foi validada nos últimos 5 minutos
-        recently_activated = time_diff.total_seconds() <= 300  # 5 minutos
-    
-    return {
-        "subscription_activated": recently_activated,
-        "is_active": subscription.is_active,
-        "last_validation_at": subscription.last_validation_at.isoformat() if subscription.last_validation_at else None,
-        "next_payment_date": subscription.cakto_due_date.isoformat() if subscription.cakto_due_date else None,
-        "message": "Assinatura ativada recentemente" if recently_activated else "Assinatura não foi ativada recentemente"
-    }
+    # Polling do frontend: repetições dentro do TTL são servidas pelo Redis
+    return SubscriptionService(SubscriptionRepository(db)).check_activation_status(email)
 
 
 @router.post("/cancel", response_model=CancelSubscriptionResponse, status_code=status.HTTP_200_OK)
@@ -101,22 +91,11 @@ def cancel_subscription(
     no nosso sistema enquanto o cancelamento na Cakto é processado.
     """
     subscription_service = SubscriptionService(SubscriptionRepository(db))
-    subscription_repo = SubscriptionRepository(db)
     
+    # False = não havia assinatura ativa (inexistente ou já cancelada): sem reconsultar o banco
     cancelled = subscription_service.cancel_subscription(current_user.id)
     
     if not cancelled:
-        # Verificar se já estava cancelada ou não existe
-        subscription = subscription_repo.get_by_user_id(current_user.id)
-        if not subscription or not subscription.is_active:
-            return CancelSubscriptionResponse(
-                message="Assinatura já está cancelada ou não existe",
-                subscription_cancelled=False,
-                note="Sua assinatura já estava inativa."
-            )
+        return _json(_ALREADY_CANCELLED_BODY)
     
-    return CancelSubscriptionResponse(
-        message="Assinatura cancelada com sucesso",
-        subscription_cancelled=True,
-        note="Para cancelar completamente na Cakto, acesse sua conta na plataforma Cakto. O cancelamento será processado automaticamente via webhook."
-    )
+    return _json(_CANCELLED_BODY)
@@ -1,24 +1,110 @@
-import json
+import logging
+import zlib
 from typing import Any, Optional
 
+import orjson
 import redis
+from redis.backoff import ExponentialBackoff
+from redis.retry import Retry
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Verifica com PING a conexão ociosa há mais que isso antes de reutilizá-la (socket morto
+# pelo balanceador/NAT vira reconexão transparente, não erro na requisição).
+HEALTH_CHECK_INTERVAL_SECONDS = 30
+
+# orjson: datas/datetimes/UUID nativos e chaves não-str (como o json.dumps fazia); o resto que o
+# json tratava com default=str (ex.: Decimal) continua virando string.
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+# Valores JSON acima disso vão comprimidos (zlib nível 1, rápido; JSON repetitivo cai 3-5x).
+# O prefixo marca o formato: JSON válido nunca começa com "z", então valores antigos seguem legíveis.
+COMPRESS_MIN_BYTES = 1024
+_COMPRESSED_PREFIX = b"z:"
+
+
+def _dumps(value: Any) -> bytes:
+    payload = orjson.dumps(value, default=str, option=_ORJSON_OPTIONS)
+    if len(payload) > COMPRESS_MIN_BYTES:
+        return _COMPRESSED_PREFIX + zlib.compress(payload, 1)
+    return payload
+
+
+def _loads(data: bytes) -> Any:
+    """Inverso de _dumps. ValueError (JSON ou zlib inválido) quando o valor não pode ser lido."""
+    if data[:2] == _COMPRESSED_PREFIX:
+        try:
+            data = zlib.decompress(data[2:])
+        except zlib.error as e:
+            raise ValueError(e) from e
+    return orjson.loads(data)
+
 
 _client: Optional[redis.Redis] = None
 
 
+def _build_client() -> redis.Redis:
+    """
+    Cliente sobre um BlockingConnectionPool limitado (REDIS_MAX_CONNECTIONS): sob pico as threads
+    esperam uma conexão livre em vez de abrir conexões novas. Keepalive, timeouts curtos e
+    retentativa com backoff exponencial em erros de conexão/timeout.
+    """
+    pool = redis.BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_keepalive=True,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        health_check_interval=HEALTH_CHECK_INTERVAL_SECONDS,
+        retry=Retry(ExponentialBackoff(), 3),
+        retry_on_timeout=True,
+    )
+    return redis.Redis(connection_pool=pool)
+
+
 def get_client() -> Optional[redis.Redis]:
     global _client
     if _client is not None:
         return _client
     if not settings.REDIS_URL:
         return None
-    _client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    _client = _build_client()
     return _client
 
 
+def get_blob_client() -> Optional[redis.Redis]:
+    """Valores binários (ex.: conteúdo de uploads): o cliente já trabalha em bytes, mesmo pool."""
+    return get_client()
+
+
+def warm_up(connections: int = 4) -> None:
+    """
+    Abre `connections` conexões do pool no startup (connect + AUTH + PING) para as primeiras
+    requisições não pagarem o handshake. Sem Redis, ou se ele não responder, apenas registra.
+    """
+    client = get_client()
+    if client is None:
+        return
+    pool = client.connection_pool
+    acquired = []
+    try:
+        for _ in range(connections):
+            # Sem argumentos: assinatura do redis-py >= 5.3 (command_name foi descontinuado)
+            conn = pool.get_connection()
+            acquired.append(conn)
+            conn.send_command("PING")
+            conn.read_response()
+    except redis.exceptions.RedisError as e:
+        logger.warning(f"Redis indisponível no aquecimento do pool: {e}")
+    finally:
+        for conn in acquired:
+            pool.release(conn)
+
+
 def cache_get(key: str) -> Optional[Any]:
     client = get_client()
     if client is None:
@@ -27,13 +113,11 @@ def cache_get(key: str) -> Optional[Any]:
         data = client.get(key)
         if data is None:
             return None
-        return json.loads(data)
-    except json.JSONDecodeError:
+        return _loads(data)
+    except ValueError:
         return None
     except Exception as e:
         # Tratar erros de autenticação do Redis graciosamente
-        import logging
-        logger = logging.getLogger(__name__)
         if "Authentication" in str(e) or "AuthenticationError" in str(type(e).__name__):
             # Erro de autenticação - apenas retornar None (cache não disponível)
             return None
@@ -46,36 +130,106 @@ def cache_set(key: str, value: Any, ttl: Optional[int] = None) -> None:
     if client is None:
         return
     try:
-        payload = json.dumps(value, ensure_ascii=False, default=str)
+        payload = _dumps(value)
         client.setex(key, ttl or settings.CACHE_TTL_SECONDS, payload)
     except Exception as e:
         # Tratar erros de autenticação do Redis graciosamente
-        import logging
-        logger = logging.getLogger(__name__)
         if "Authentication" in str(e) or "AuthenticationError" in str(type(e).__name__):
             # Erro de autenticação - apenas ignorar (cache não disponível)
             return
         logger.warning(f"Erro ao salvar cache: {e}")
 
 
+def cache_delete(*keys: str) -> None:
+    """Remove uma ou mais chaves num único DEL."""
+    client = get_client()
+    if client is None or not keys:
+        return
+    try:
+        client.delete(*keys)
+    except Exception as e:
+        # Tratar erros de autenticação do Redis graciosamente
+        if "Authentication" in str(e) or "AuthenticationError" in str(type(e).__name__):
+            # Erro de autenticação - apenas ignorar (cache não disponível)
+            return
+        logger.warning(f"Erro ao deletar cache: {e}")
+
+
+# Chaves por execute() em cache_delete_prefix: limita o que a pipeline acumula em memória.
+DELETE_PREFIX_BATCH = 1000
+
+
 def cache_delete_prefix(prefix: str) -> None:
+    """
+    Remove as chaves com o prefixo. Os UNLINK vão numa pipeline (sem transação) enviada a cada
+    DELETE_PREFIX_BATCH chaves: só os SCAN custam round-trip. UNLINK libera a memória fora da
+    thread principal do Redis.
+    """
     client = get_client()
     if client is None:
         return
     try:
-        cursor = 0
-        pattern = f"{prefix}*"
-        while True:
-            cursor, keys = client.scan(cursor=cursor, match=pattern, count=500)
-            if keys:
-                client.delete(*keys)
-            if cursor == 0:
-                break
+        with client.pipeline(transaction=False) as pipe:
+            pending = 0
+            for key in client.scan_iter(match=f"{prefix}*", count=500):
+                pipe.unlink(key)
+                pending += 1
+                if pending >= DELETE_PREFIX_BATCH:
+                    pipe.execute()
+                    pending = 0
+            if pending:
+                pipe.execute()
     except Exception as e:
         # Tratar erros de autenticação do Redis graciosamente
-        import logging
-        logger = logging.getLogger(__name__)
         if "Authentication" in str(e) or "AuthenticationError" in str(type(e).__name__):
             # Erro de autenticação - apenas ignorar (cache não disponível)
             return
         logger.warning(f"Erro ao deletar cache: {e}")
+
+
+def cache_lock(key: str, ttl: int) -> bool:
+    """
+    Tenta adquirir um lock curto (SET NX EX). True se adquiriu — ou se o Redis não está
+    disponível (fail-open: sem cache, cada requisição calcula por conta própria).
+    """
+    client = get_client()
+    if client is None:
+        return True
+    try:
+        return bool(client.set(key, "1", nx=True, ex=ttl))
+    except Exception as e:
+        # Tratar erros de autenticação do Redis graciosamente
+        if "Authentication" in str(e) or "AuthenticationError" in str(type(e).__name__):
+            return True
+        logger.warning(f"Erro ao adquirir lock de cache: {e}")
+        return True
+
+
+def blob_set(key: str, data: bytes, ttl: int) -> bool:
+    """Grava bytes crus (sem JSON/base64). False se o Redis não estiver disponível."""
+    client = get_blob_client()
+    if client is None:
+        return False
+    try:
+        client.setex(key, ttl, data)
+        return True
+    except Exception as e:
+        # Tratar erros de autenticação do Redis graciosamente
+        if "Authentication" in str(e) or "AuthenticationError" in str(type(e).__name__):
+            return False
+        logger.warning(f"Erro ao salvar blob: {e}")
+        return False
+
+
+def blob_get(key: str) -> Optional[bytes]:
+    client = get_blob_client()
+    if client is None:
+        return None
+    try:
+        return client.get(key)
+    except Exception as e:
+        # Tratar erros de autenticação do Redis graciosamente
+        if "Authentication" in str(e) or "AuthenticationError" in str(type(e).__name__):
+            return None
+        logger.warning(f"Erro ao buscar blob: {e}")
+        return None
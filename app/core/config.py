@@ -1,13 +1,49 @@
 import os
-from typing import Optional, Dict
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+from typing import Optional, Dict, Mapping
+from urllib.parse import quote_plus, urlsplit, urlunsplit
 
 from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 
+def _parse_id_list(raw: Optional[str]) -> frozenset:
+    """IDs separados por vírgula (aceita também o formato de lista: ["a", 'b'])."""
+    if not raw:
+        return frozenset()
+    normalized = raw.replace("[", "").replace("]", "")
+    return frozenset(
+        cleaned for cleaned in (piece.strip().strip("'\"") for piece in normalized.split(",")) if cleaned
+    )
+
+
 class Settings(BaseSettings):
     # Database (Supabase PostgreSQL)
     DATABASE_URL: str
+    # Réplica de leitura opcional (listagens e dashboard). Vazio = tudo no DATABASE_URL.
+    # Réplicas têm atraso de replicação: não usar para leituras logo após escrita (ex.: status de upload).
+    DATABASE_READ_URL: Optional[str] = None
+    # Pool de conexões por processo (API e cada worker Celery; vale também para a réplica).
+    # pool_size + max_overflow = 40 acompanha o threadpool padrão do FastAPI (40 threads): uma
+    # rota síncrona não fica parada esperando conexão. Conexões de overflow são fechadas ao
+    # voltar ao pool. Ajuste ao max_connections do Postgres/PgBouncer: processos × (size + overflow).
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 30
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    # Limite por consulta (ms), enviado como opção de startup (-c statement_timeout). Vazio = sem limite.
+    # PgBouncer/Supavisor em modo transaction recusam parâmetros de startup: lá configure no role
+    # (ALTER ROLE ... SET statement_timeout) em vez desta variável.
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None
+    # PgBouncer/Supavisor em modo transaction ao lado da API (sidecar): o pooler externo reaproveita
+    # as conexões do Postgres e o engine passa a usar NullPool (sem pool duplicado no processo).
+    # Compatível com RLS (SET LOCAL) e psycopg2 (sem prepared statements no servidor).
+    # Com o pooler remoto do Supabase (porta 6543) mantenha False: o pool local evita handshake TLS por requisição.
+    DB_EXTERNAL_POOLER: bool = False
+    # create_all no startup (tabelas ausentes). Sempre ativo em development; nos demais ambientes o
+    # schema vem dos scripts em migrations/, aplicados uma vez no deploy.
+    AUTO_CREATE_SCHEMA: bool = False
     
     # Supabase Configuration
     SUPABASE_URL: Optional[str] = None
@@ -28,6 +64,10 @@ class Settings(BaseSettings):
     REDIS_URL: Optional[str] = None
     REDIS_PASSWORD: Optional[str] = None
     CACHE_TTL_SECONDS: int = 300
+    # Pool de conexões Redis por processo (cache/blobs). Requisições esperam até REDIS_SOCKET_TIMEOUT
+    # por uma conexão livre em vez de abrir conexões sem limite.
+    REDIS_MAX_CONNECTIONS: int = 64
+    REDIS_SOCKET_TIMEOUT: float = 2.0
 
     # Upload de arquivos grandes (ex.: CSV 500k+ linhas)
     # Se definido, o arquivo é gravado em disco e apenas o caminho é enviado ao Celery (evita Redis com payload gigante).
@@ -39,6 +79,12 @@ class Settings(BaseSettings):
     # Arquivos maiores que este limite exigem volume compartilhado entre API e worker. Default: 5 MB.
     UPLOAD_INLINE_MAX_BYTES: int = 5 * 1024 * 1024
 
+    # Tamanho máximo de um upload de CSV (bytes). Acima disso a API responde 413 sem gravar o arquivo. Default: 200 MB.
+    MAX_UPLOAD_BYTES: int = 200 * 1024 * 1024
+    # Tamanho máximo do CSV depois de descomprimir um .csv.gz (o limite acima vale para o corpo comprimido).
+    # Protege o worker de "gzip bombs" (poucos MB que viram GBs). Default: 512 MB.
+    MAX_DECOMPRESSED_BYTES: int = 512 * 1024 * 1024
+
     # Processar CSV na própria requisição (síncrono), sem Celery. Use quando não houver worker (ex.: Coolify sem worker).
     # Os dados ficam disponíveis logo após o upload. Para arquivos muito grandes prefira Celery + worker.
     PROCESS_CSV_SYNC: bool = False
@@ -84,17 +130,14 @@ class Settings(BaseSettings):
     @model_validator(mode='after')
     def assemble_redis_url(self) -> 'Settings':
         if self.REDIS_PASSWORD and self.REDIS_URL:
-            # Se a URL já contiver senha (ex: :password@...), não fazemos nada
-            if "@" in self.REDIS_URL:
+            parts = urlsplit(self.REDIS_URL)
+            # Se a URL já contiver credenciais (ex: :password@...), não fazemos nada
+            if parts.scheme not in ("redis", "rediss") or "@" in parts.netloc:
                 return self
-                
-            import urllib.parse
-            # Se a URL não tem senha mas temos REDIS_PASSWORD, injetamos
-            if "redis://" in self.REDIS_URL:
-                # URL Encode a senha para garantir que caracteres especiais não quebrem a URL
-                encoded_pwd = urllib.parse.quote_plus(self.REDIS_PASSWORD)
-                # Formato: redis://:PASSWORD@HOST:PORT/DB
-                self.REDIS_URL = self.REDIS_URL.replace("redis://", f"redis://:{encoded_pwd}@", 1)
+            # URL Encode a senha para garantir que caracteres especiais não quebrem a URL
+            # Formato: redis[s]://:PASSWORD@HOST:PORT/DB
+            netloc = f":{quote_plus(self.REDIS_PASSWORD)}@{parts.netloc}"
+            self.REDIS_URL = urlunsplit(parts._replace(netloc=netloc))
         return self
 
     # Subscription enforcement (generic, replaces CAKTO_ENFORCE_SUBSCRIPTION)
@@ -159,13 +202,28 @@ class Settings(BaseSettings):
         }
     }
     
+    # Conjuntos de IDs de produto: parse uma vez por processo; checagem por pertinência O(1)
+    @cached_property
+    def cakto_product_ids(self) -> frozenset:
+        return _parse_id_list(self.CAKTO_SUBSCRIPTION_PRODUCT_IDS)
+
+    @cached_property
+    def kiwify_product_ids(self) -> frozenset:
+        return _parse_id_list(self.KIWIFY_SUBSCRIPTION_PRODUCT_IDS)
+
+    def is_cakto_subscription_product(self, product_id: Optional[str]) -> bool:
+        """Produto Cakto aceito como assinatura (sem IDs configurados, aceita todos)."""
+        if not self.cakto_product_ids:
+            return True
+        return bool(product_id) and product_id in self.cakto_product_ids
+
     def get_cakto_plan(self, plan_id: str) -> Optional[Dict[str, str]]:
         """Retorna informações de um plano específico ou None se não existir."""
         return self.CAKTO_PLANS.get(plan_id)
     
-    def get_all_cakto_plans(self) -> Dict[str, Dict[str, str]]:
-        """Retorna todos os planos disponíveis."""
-        return self.CAKTO_PLANS.copy()
+    def get_all_cakto_plans(self) -> Mapping[str, Dict[str, str]]:
+        """Retorna todos os planos disponíveis (visão somente leitura, sem cópia)."""
+        return MappingProxyType(self.CAKTO_PLANS)
     
     # Email / SMTP Configuration
     SMTP_HOST: str = "smtp.hostinger.com"
@@ -216,6 +274,12 @@ class Settings(BaseSettings):
         Se FORCE_HTTP_FALLBACK estiver ativo, adiciona URLs HTTP de produção/homologação.
         ATENÇÃO: Use apenas em emergências críticas. Deve ser removido assim que SSL for corrigido.
         """
+        # Lista nova a cada chamada: quem a recebe pode alterá-la sem afetar o valor memoizado
+        return list(self.cors_origins)
+
+    # Calculado uma vez por processo (settings não muda em execução; FORCE_HTTP_FALLBACK vem do ambiente)
+    @cached_property
+    def cors_origins(self) -> tuple[str, ...]:
         origins = self.CORS_ORIGINS.copy()
         
         if self.FORCE_HTTP_FALLBACK:
@@ -235,12 +299,19 @@ class Settings(BaseSettings):
                 "http://api.marketdash.hml.com.br",
             ])
         
-        return origins
+        # Sem duplicatas (o fallback repete URLs HTTP já presentes em CORS_ORIGINS)
+        return tuple(dict.fromkeys(origins))
     
     class Config:
         env_file = ".env"
         case_sensitive = True
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settings do processo: .env e validadores rodam uma única vez."""
+    return Settings()
+
+
+settings = get_settings()
 
@@ -0,0 +1,46 @@
+"""
+Helpers de cache HTTP (ETag / Cache-Control).
+
+Para respostas estáticas ou quase estáticas: o corpo é serializado uma vez,
+o ETag é derivado do conteúdo e requisições com If-None-Match igual recebem
+304 sem corpo.
+"""
+
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def make_etag(body: bytes) -> str:
+    """ETag forte derivado do conteúdo (sha1 do corpo)."""
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True se o If-None-Match do cliente contém o ETag atual (comparação fraca, RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cached_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    cache_control: str,
+    media_type: str = "application/json",
+) -> Response:
+    """Retorna 304 se o cliente já tem a versão atual; senão o corpo pré-serializado."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -1,5 +1,29 @@
+import atexit
 import logging
+import queue
 from logging.config import dictConfig
+from logging.handlers import QueueHandler, QueueListener
+
+# Registros aguardando a thread de escrita; acima disso novos registros são descartados
+LOG_QUEUE_SIZE = 10_000
+
+_listener = None
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Enfileira o LogRecord sem formatar: mensagem e traceback (exc_info) são formatados
+    na thread do QueueListener, fora do event loop e da thread da requisição.
+    """
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
 
 
 def configure_logging():
@@ -24,6 +48,7 @@ def configure_logging():
             },
         }
     )
+    _start_queue_listener()
 
     logging.getLogger("uvicorn").setLevel(logging.INFO)
 
@@ -33,3 +58,26 @@ def configure_logging():
     # some o log de request (com o token); os logs da própria app (INFO) continuam.
     logging.getLogger("httpx").setLevel(logging.WARNING)
     logging.getLogger("httpcore").setLevel(logging.WARNING)
+
+
+def _start_queue_listener():
+    """Troca os handlers do root por um QueueHandler; a escrita no console roda numa thread própria."""
+    global _listener
+    _stop_queue_listener()
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+@atexit.register
+def _stop_queue_listener():
+    """Esvazia a fila e encerra a thread de escrita (também no desligamento do processo)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
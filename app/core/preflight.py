@@ -0,0 +1,48 @@
+"""
+Resposta direta para preflight CORS (OPTIONS com Origin + Access-Control-Request-Method).
+
+Registrado como middleware mais externo: preflights válidos são respondidos com 204 sem
+passar pelos demais middlewares (limite de upload, GZip, CORS, tratamento de erros).
+Os headers fixos são montados uma vez; por requisição só entram a origem e os headers pedidos.
+Qualquer caso fora do caminho feliz (origem/método não permitidos, Private Network Access)
+segue para o CORSMiddleware, que monta a resposta de erro.
+"""
+from typing import Iterable
+
+
+class PreflightMiddleware:
+    """Responde 204 a preflights de `allow_origins`/`allow_methods` (credenciais e qualquer header)."""
+
+    def __init__(self, app, allow_origins: Iterable[str], allow_methods: Iterable[str], max_age: int):
+        self.app = app
+        self.allow_origins = frozenset(origin.encode("latin-1") for origin in allow_origins)
+        self.allow_methods = frozenset(method.encode("latin-1") for method in allow_methods)
+        # Mesmos headers do CORSMiddleware com allow_credentials=True e allow_headers=["*"]
+        self.fixed_headers = [
+            (b"vary", b"Origin, Access-Control-Request-Method, Access-Control-Request-Headers, Access-Control-Request-Private-Network"),
+            (b"access-control-allow-methods", ", ".join(allow_methods).encode("latin-1")),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+            (b"access-control-allow-credentials", b"true"),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "OPTIONS":
+            origin = requested_method = requested_headers = None
+            for name, value in scope["headers"]:
+                if name == b"origin":
+                    origin = value
+                elif name == b"access-control-request-method":
+                    requested_method = value
+                elif name == b"access-control-request-headers":
+                    requested_headers = value
+                elif name == b"access-control-request-private-network":
+                    break
+            else:
+                if origin in self.allow_origins and requested_method in self.allow_methods:
+                    headers = [*self.fixed_headers, (b"access-control-allow-origin", origin)]
+                    if requested_headers is not None:
+                        headers.append((b"access-control-allow-headers", requested_headers))
+                    await send({"type": "http.response.start", "status": 204, "headers": headers})
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+        await self.app(scope, receive, send)
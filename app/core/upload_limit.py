@@ -0,0 +1,39 @@
+"""
+Limite de tamanho para uploads de CSV.
+
+O FastAPI lê o corpo multipart inteiro antes de chamar a rota (e suas dependências),
+então a checagem do Content-Length precisa acontecer no nível ASGI, antes da leitura.
+Uploads sem Content-Length (chunked) são limitados durante a gravação em disco
+(ver app.services.upload_service.spool_upload).
+"""
+from typing import Iterable
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+
+
+def upload_too_large_detail(max_bytes: int) -> str:
+    return f"Arquivo excede o tamanho máximo permitido ({max_bytes // (1024 * 1024)} MB)."
+
+
+class UploadSizeLimitMiddleware:
+    """Responde 413 para POST em `paths` cujo Content-Length passe de `max_bytes`."""
+
+    def __init__(self, app, paths: Iterable[str], max_bytes: int):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST" and scope["path"] in self.paths:
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > self.max_bytes:
+                        response = JSONResponse(
+                            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                            content={"detail": upload_too_large_detail(self.max_bytes)},
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
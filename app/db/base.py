@@ -1,3 +1,6 @@
+import random
+
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import declarative_base
 
 # Create declarative base
@@ -6,25 +9,21 @@ Base = declarative_base()
 # Models are imported in app/models/__init__.py to avoid circular imports
 
 
-def _apply_safe_migrations(engine, logger):
-    """Add missing columns to existing tables. Each statement is idempotent."""
-    migrations = [
-        "ALTER TABLE capture_sites ADD COLUMN IF NOT EXISTS facebook_pixel_id VARCHAR",
-        "ALTER TABLE facebook_integrations ADD COLUMN IF NOT EXISTS ad_accounts_json TEXT",
-    ]
-    from sqlalchemy import text
-    try:
-        with engine.begin() as conn:
-            for stmt in migrations:
-                conn.execute(text(stmt))
-        logger.info("Safe migrations applied successfully")
-    except Exception as e:
-        logger.warning(f"Safe migrations skipped: {e}")
+# Espera pelo banco no startup: backoff exponencial com jitter decorrelacionado
+# (delay = min(cap, uniform(base, delay_anterior * 3))), para réplicas subindo juntas não baterem em sincronia
+CONNECT_BACKOFF_BASE = 0.2
+CONNECT_BACKOFF_CAP = 10.0
+CONNECT_MAX_RETRIES = 8
+
+
+def _next_delay(previous: float) -> float:
+    return min(CONNECT_BACKOFF_CAP, random.uniform(CONNECT_BACKOFF_BASE, previous * 3))
 
 
 def init_db():
     """Initialize database tables."""
     # Import engine here to avoid circular import
+    from app.core.config import settings
     from app.db.session import engine
     from sqlalchemy import text
     import time
@@ -40,27 +39,32 @@ def init_db():
     
     logger = logging.getLogger(__name__)
     
-    # Retry logic to wait for database to be ready
-    max_retries = 30
-    retry_delay = 2
-    
-    for attempt in range(max_retries):
+    # Ping com backoff exponencial: espera o banco ficar disponível (só erros do driver são retentados)
+    delay = CONNECT_BACKOFF_BASE
+    for attempt in range(1, CONNECT_MAX_RETRIES + 2):
         try:
-            # Test connection
-            with engine.begin() as conn:
+            with engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
-                logger.info("Database connection successful")
-            # If connection successful, create tables (no-op for existing)
-            Base.metadata.create_all(bind=engine)
-            # Add missing columns to existing tables (create_all doesn't do this)
-            _apply_safe_migrations(engine, logger)
-            logger.info("Database tables created/updated successfully")
-            return
-        except Exception as e:
-            if attempt < max_retries - 1:
-                logger.warning(f"Database not ready, retrying in {retry_delay}s... (attempt {attempt + 1}/{max_retries}): {e}")
-                time.sleep(retry_delay)
-            else:
-                logger.error(f"Failed to connect to database after {max_retries} attempts: {e}")
+            logger.info("Database connection successful", extra={"attempt": attempt})
+            break
+        except DBAPIError as e:
+            if attempt > CONNECT_MAX_RETRIES:
+                logger.error(
+                    f"Failed to connect to database after {attempt} attempts: {e}",
+                    extra={"attempt": attempt, "last_backoff_seconds": round(delay, 2)},
+                )
                 raise
+            delay = _next_delay(delay)
+            logger.warning(
+                f"Database not ready, retrying in {delay:.2f}s... (attempt {attempt}): {e}",
+                extra={"attempt": attempt, "backoff_seconds": round(delay, 2)},
+            )
+            time.sleep(delay)
 
+    # Fora do desenvolvimento o schema é dos scripts em migrations/ (aplicados uma vez no deploy),
+    # não de cada worker: create_all custa consultas de catálogo por tabela a cada boot
+    if settings.ENVIRONMENT.lower() != "development" and not settings.AUTO_CREATE_SCHEMA:
+        return
+    # Cria tabelas ausentes (no-op para as existentes)
+    Base.metadata.create_all(bind=engine)
+    logger.info("Database tables created/updated successfully")
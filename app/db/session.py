@@ -1,21 +1,45 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=5,
-    pool_timeout=30,
-    pool_recycle=1800,
-    connect_args={
-        "connect_timeout": 10,
-    },
+# Cache de SQL compilado por engine (padrão do SQLAlchemy: 500); comporta as consultas do dashboard,
+# listagens e assinaturas sem despejar as do caminho quente
+_CONNECT_ARGS = {
+    "connect_timeout": 10,
+}
+if settings.DB_STATEMENT_TIMEOUT_MS:
+    _CONNECT_ARGS["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+_COMMON_OPTIONS = dict(
+    query_cache_size=1200,
+    connect_args=_CONNECT_ARGS,
 )
 
+if settings.DB_EXTERNAL_POOLER:
+    # PgBouncer local em modo transaction: cada sessão pega uma conexão do pooler e a devolve ao fechar
+    _ENGINE_OPTIONS = dict(_COMMON_OPTIONS, poolclass=NullPool)
+else:
+    _ENGINE_OPTIONS = dict(
+        _COMMON_OPTIONS,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        # LIFO: reutiliza a conexão devolvida por último (quente); as excedentes ficam ociosas e são recicladas
+        pool_use_lifo=True,
+    )
+
+engine = create_engine(settings.DATABASE_URL, **_ENGINE_OPTIONS)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Réplica de leitura (opcional): None quando DATABASE_READ_URL não está configurado
+read_engine = create_engine(settings.DATABASE_READ_URL, **_ENGINE_OPTIONS) if settings.DATABASE_READ_URL else None
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine else None
+
 
 def get_db():
     """Dependency for getting database session."""
@@ -24,4 +48,3 @@ def get_db():
         yield db
     finally:
         db.close()
-
@@ -1,60 +1,116 @@
-from fastapi import FastAPI, status, Depends
+from contextlib import asynccontextmanager
+
+import orjson
+from fastapi import FastAPI, Request, status, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, Response
+from redis.exceptions import AuthenticationError as RedisAuthenticationError
 from sqlalchemy import text
 from sqlalchemy.orm import Session
+from app.core.cache import get_client as get_redis_client, warm_up as warm_up_cache
 from app.core.config import settings
 from app.core.logging import configure_logging
 from app.core.errors import register_exception_handlers
+from app.core.http_cache import cached_response, make_etag
+from app.core.preflight import PreflightMiddleware
+from app.core.upload_limit import UploadSizeLimitMiddleware
 from app.api.v1.routes import router as api_v1_router
 from app.db.base import init_db
-from app.db.session import SessionLocal, get_db
+from app.db.session import engine, get_db, read_engine
 from datetime import datetime, timezone
 import logging
+import time
 
 # Configure logging
 configure_logging()
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup (banco + aquecimento do Redis) e shutdown (devolve as conexões do Postgres)."""
+    logger.info("Initializing database...")
+    try:
+        # Em thread: o backoff (time.sleep) não trava o event loop
+        await run_in_threadpool(init_db)
+        logger.info("Database initialized successfully")
+        # Dimensionamento efetivo do pool (conferir: processos × (size + overflow) <= max_connections)
+        logger.info(f"Database pool: {engine.pool.status()}")
+    except Exception as e:
+        logger.error(f"Failed to initialize database: {e}")
+        raise
+    # Conexões Redis abertas antes do primeiro request (cache do dashboard, blobs de upload)
+    warm_up_cache()
+    yield
+    # Fecha as conexões ociosas dos pools: no deploy o processo antigo não deixa backends presos no Postgres
+    engine.dispose()
+    if read_engine is not None:
+        read_engine.dispose()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Backend SaaS para análise de dados com ingestão de CSV",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 register_exception_handlers(app)
 
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database on startup."""
-    logger.info("Initializing database...")
-    try:
-        init_db()
-        logger.info("Database initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize database: {e}")
-        raise
+# Rejeita uploads de CSV acima de MAX_UPLOAD_BYTES antes de o corpo ser lido.
+# Registrado antes do CORS (camada interna): o 413 sai com os headers Access-Control-* e o
+# frontend consegue ler o detail em vez de um erro de CORS opaco.
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    paths=[f"{settings.API_V1_STR}/datasets/upload", f"{settings.API_V1_STR}/clicks/upload"],
+    max_bytes=settings.MAX_UPLOAD_BYTES,
+)
 
 # CORS middleware (using settings)
-# max_age=3600 cacheia respostas de preflight por 1 hora, reduzindo chamadas duplicadas
+# max_age=86400 cacheia respostas de preflight por 24 horas (Firefox; Chrome limita a 2 horas),
+# reduzindo chamadas duplicadas
 # Usa get_cors_origins() para suportar FORCE_HTTP_FALLBACK em emergências
+# Lista montada uma vez e sem duplicatas: o middleware compara a origem com cada entrada a cada requisição
+CORS_ALLOW_ORIGINS = list(dict.fromkeys(
+    settings.get_cors_origins() + ["http://localhost:8080", "http://localhost:5173", "http://127.0.0.1:8080", "http://127.0.0.1:5173"]
+))
+CORS_ALLOW_METHODS = ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"]
+CORS_MAX_AGE = 86400  # Cache preflight por 24 horas
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.get_cors_origins() + ["http://localhost:8080", "http://localhost:5173", "http://127.0.0.1:8080", "http://127.0.0.1:5173"],
+    allow_origins=CORS_ALLOW_ORIGINS,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
+    allow_methods=CORS_ALLOW_METHODS,
     allow_headers=["*"],
-    expose_headers=["Content-Disposition", "Content-Type", "*"],  # Garantir que Content-Disposition seja exposto
-    max_age=3600,  # Cache preflight por 1 hora
+    expose_headers=["Content-Disposition", "Content-Type", "X-Next-Cursor", "*"],  # Garantir que Content-Disposition seja exposto
+    max_age=CORS_MAX_AGE,
 )
 
-# GZip middleware for faster large responses
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Compressão de respostas: Brotli (qualidade 4: taxa melhor que gzip com CPU parecida) e gzip
+# para clientes sem "br". Abaixo de 2 KB (/health, /, respostas pequenas) não comprime.
+# O BrotliMiddleware comprime no event loop (não tem o thread_minimum_size do GZip do Starlette):
+# com quality=4 o custo é baixo, mas respostas muito grandes ocupam o loop enquanto comprimem.
+COMPRESSION_MIN_BYTES = 2048
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    logger.warning("brotli-asgi not installed; responses compressed with gzip only")
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+else:
+    app.add_middleware(BrotliMiddleware, quality=4, minimum_size=COMPRESSION_MIN_BYTES, gzip_fallback=True)
+
+# Adicionado por último = mais externo: preflights válidos saem daqui, antes dos middlewares acima
+app.add_middleware(
+    PreflightMiddleware,
+    allow_origins=CORS_ALLOW_ORIGINS,
+    allow_methods=CORS_ALLOW_METHODS,
+    max_age=CORS_MAX_AGE,
+)
 
 # Include routers (v1 only)
 app.include_router(api_v1_router, prefix=settings.API_V1_STR)
@@ -65,15 +121,21 @@ from app.api.v1.routes import cakto as cakto_v1
 app.include_router(cakto_v1.router, prefix="/cakto", tags=["cakto"])
 
 
+# Corpo fixo por processo: serializado uma vez; clientes com If-None-Match recebem 304
+_ROOT_BODY = orjson.dumps({
+    "message": "MarketDash Backend API",
+    "version": "1.0.0",
+    "docs": "/docs",
+    "environment": settings.ENVIRONMENT
+})
+_ROOT_ETAG = make_etag(_ROOT_BODY)
+ROOT_CACHE_CONTROL = "public, max-age=60"
+
+
 @app.get("/")
-def root():
+def root(request: Request):
     """Root endpoint."""
-    return {
-        "message": "MarketDash Backend API",
-        "version": "1.0.0",
-        "docs": "/docs",
-        "environment": settings.ENVIRONMENT
-    }
+    return cached_response(request, _ROOT_BODY, _ROOT_ETAG, ROOT_CACHE_CONTROL)
 
 
 @app.get("/c/{slug}/og", response_class=HTMLResponse, include_in_schema=False)
@@ -148,12 +210,42 @@ def custom_link_og(slug: str, db: Session = Depends(get_db)):
     return HTMLResponse(content=html)
 
 
+# Probes (Coolify/Docker healthcheck, balanceador) em rajada: o resultado vale por 1 s
+HEALTH_RESULT_TTL_SECONDS = 1.0
+_health_result = {"expires_at": 0.0, "content": None, "status_code": status.HTTP_200_OK}
+_SELECT_ONE = text("SELECT 1")
+
+
+# Liveness: só confirma que o processo atende requisições (sem banco/Redis).
+# Uma queda momentânea do banco não deve fazer o orquestrador reiniciar o container.
+_LIVE_BODY = b'{"status":"ok"}'
+
+
+@app.get("/health/live")
+def health_live():
+    """Liveness probe: responde imediatamente, sem dependências externas."""
+    return Response(content=_LIVE_BODY, media_type="application/json")
+
+
+@app.get("/health/ready")
 @app.get("/health")
 def health_check():
     """
-    Health check endpoint with database and service status.
+    Readiness probe with database and service status (/health é alias de /health/ready).
     Returns detailed information about the application health.
     """
+    now = time.monotonic()
+    if now >= _health_result["expires_at"]:
+        content = _probe_health()
+        _health_result.update(
+            expires_at=now + HEALTH_RESULT_TTL_SECONDS,
+            content=content,
+            status_code=status.HTTP_200_OK if content["status"] == "healthy" else status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    return JSONResponse(content=_health_result["content"], status_code=_health_result["status_code"])
+
+
+def _probe_health() -> dict:
     health_status = {
         "status": "healthy",
         "environment": settings.ENVIRONMENT,
@@ -162,45 +254,27 @@ def health_check():
         "redis": "not_configured"
     }
     
-    # Check database connection
+    # Check database connection: checkout direto do pool (mesmo caminho das requisições, sem Session do ORM)
     try:
-        db = SessionLocal()
-        try:
-            # Simple query to verify database connection
-            db.execute(text("SELECT 1"))
-            health_status["database"] = "connected"
-        except Exception as e:
-            logger.error(f"Database health check failed: {e}")
-            health_status["database"] = "disconnected"
-            health_status["status"] = "unhealthy"
-        finally:
-            db.close()
+        with engine.connect() as conn:
+            conn.execute(_SELECT_ONE)
+        health_status["database"] = "connected"
     except Exception as e:
-        logger.error(f"Database session creation failed: {e}")
-        health_status["database"] = "error"
+        logger.error(f"Database health check failed: {e}")
+        health_status["database"] = "disconnected"
         health_status["status"] = "unhealthy"
     
-    # Check Redis if configured
-    if settings.REDIS_URL:
+    # Check Redis if configured: PING numa conexão do pool do cache (sem connect/AUTH por probe)
+    redis_client = get_redis_client()
+    if redis_client is not None:
         try:
-            import redis
-            # Detectar se a URL já tem senha ou se precisamos adicionar
-            redis_client = redis.from_url(settings.REDIS_URL, socket_timeout=2)
             redis_client.ping()
             health_status["redis"] = "connected"
-        except ImportError:
-            health_status["redis"] = "library_not_installed"
-        except redis.exceptions.AuthenticationError:
+        except RedisAuthenticationError:
             logger.warning("Redis health check: Autenticação necessária (verifique REDIS_URL)")
             health_status["redis"] = "auth_required"
         except Exception as e:
             logger.warning(f"Redis health check failed: {str(e)}")
             health_status["redis"] = "disconnected"
     
-    # Return appropriate status code
-    status_code = status.HTTP_200_OK if health_status["status"] == "healthy" else status.HTTP_503_SERVICE_UNAVAILABLE
-    return JSONResponse(
-        content=health_status,
-        status_code=status_code
-    )
-
+    return health_status
@@ -5,8 +5,9 @@ from app.db.base import Base
 class AdSpend(Base):
     __tablename__ = "ad_spends"
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    # Sem índice próprio: os compostos começam por user_id (prefixo à esquerda)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     date = Column(Date, nullable=False, index=True)
     sub_id = Column(String, nullable=True, index=True)  # ex: dispenser01
     amount = Column(Float, nullable=False)
@@ -19,7 +20,10 @@ class AdSpend(Base):
     user = relationship("User", back_populates="ad_spends")
 
     __table_args__ = (
-        Index("idx_ad_spend_user_date", "user_id", "date"),
         Index("idx_ad_spend_user_sub_date", "user_id", "sub_id", "date"),
-        Index("idx_ad_spend_user_date_id", "user_id", "date", "id"),
+        # Cobre a listagem (id, date, amount, sub_id, clicks): index-only scan
+        Index(
+            "idx_ad_spend_user_date_id_cov", "user_id", "date", "id",
+            postgresql_include=["amount", "sub_id", "clicks"],
+        ),
     )
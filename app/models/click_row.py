@@ -1,14 +1,15 @@
 from sqlalchemy import Column, Integer, String, Date, Time, ForeignKey, Index, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 from app.db.base import Base
 
 
 class ClickRow(Base):
     __tablename__ = "click_rows_v2"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     dataset_id = Column(Integer, ForeignKey("datasets.id", ondelete="CASCADE"), nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Sem índice próprio: os compostos começam por user_id (prefixo à esquerda)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Campos fundamentais — data e hora separadas quando CSV traz datetime
     date = Column(Date, nullable=False, index=True)
@@ -17,13 +18,16 @@ class ClickRow(Base):
     sub_id = Column(String, nullable=True, index=True)
     clicks = Column(Integer, nullable=False, default=0)
     
+    # UNIQUE obrigatório: é o alvo do ON CONFLICT (row_hash) do upsert em ClickRowRepository.bulk_create
     row_hash = Column(String(32), nullable=True, unique=True, index=True)
 
     # Relationships
-    dataset = relationship("Dataset", backref="click_rows")
+    dataset = relationship("Dataset", backref=backref("click_rows", passive_deletes=True))
     user = relationship("User", back_populates="click_rows")
 
     # Composite indexes for performance
     __table_args__ = (
         Index('idx_click_user_report', 'user_id', 'date', 'channel'),
+        # Listagem paginada: WHERE user_id [+ date] ORDER BY date DESC, id DESC
+        Index('idx_click_user_date_id', 'user_id', 'date', 'id'),
     )
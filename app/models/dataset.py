@@ -18,9 +18,11 @@ class Dataset(Base):
 
     # Relationships
     user = relationship("User", back_populates="datasets")
-    rows = relationship("DatasetRow", back_populates="dataset", cascade="all, delete-orphan")
+    rows = relationship("DatasetRow", back_populates="dataset", cascade="all, delete-orphan", passive_deletes=True)
 
     __table_args__ = (
         Index("idx_dataset_user_uploaded", "user_id", "uploaded_at"),
     )
+    # uploaded_at (server_default) volta no próprio INSERT ... RETURNING do flush, sem SELECT extra.
+    __mapper_args__ = {"eager_defaults": True}
 
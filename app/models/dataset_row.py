@@ -6,9 +6,10 @@ from app.db.base import Base
 class DatasetRow(Base):
     __tablename__ = "dataset_rows_v2"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     dataset_id = Column(Integer, ForeignKey("datasets.id", ondelete="CASCADE"), nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Sem índice próprio: os compostos começam por user_id (prefixo à esquerda)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Dimensões (Campos de agrupamento) — data e hora separadas quando CSV traz datetime
     date = Column(Date, nullable=False, index=True)
@@ -43,4 +44,8 @@ class DatasetRow(Base):
         Index('idx_dataset_rows_user_report', 'user_id', 'date', 'platform', 'product'),
         Index('idx_dataset_rows_user_category', 'user_id', 'category'),
         Index('idx_dataset_rows_user_sub_id', 'user_id', 'sub_id1'),
+        # Listagem paginada (/latest/rows, /all/rows): WHERE user_id [+ date] ORDER BY date DESC, id DESC
+        Index('idx_dataset_rows_user_date_id', 'user_id', 'date', 'id'),
+        # Linhas de um dataset (/latest/rows, /{id}/rows): WHERE user_id AND dataset_id ORDER BY date DESC, id DESC
+        Index('idx_dataset_rows_user_dataset_date_id', 'user_id', 'dataset_id', 'date', 'id'),
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Boolean, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -22,10 +22,17 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Buscas por email sem diferenciar maiúsculas (login, webhooks, check-status): WHERE lower(email) = ?
+    __table_args__ = (
+        Index("idx_users_email_lower", func.lower(email)),
+    )
+
     # Relationships
-    datasets = relationship("Dataset", back_populates="user", cascade="all, delete-orphan")
-    dataset_rows = relationship("DatasetRow", back_populates="user", cascade="all, delete-orphan")
-    click_rows = relationship("ClickRow", back_populates="user", cascade="all, delete-orphan")
+    # passive_deletes: coleções grandes são apagadas pelo ON DELETE CASCADE do banco, sem o ORM
+    # carregar (e deletar uma a uma) todas as linhas ao excluir o usuário.
+    datasets = relationship("Dataset", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    dataset_rows = relationship("DatasetRow", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    click_rows = relationship("ClickRow", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
     ad_spends = relationship("AdSpend", back_populates="user", cascade="all, delete-orphan")
     capture_sites = relationship("CaptureSite", back_populates="user", cascade="all, delete-orphan")
     custom_links = relationship("CustomLink", back_populates="user", cascade="all, delete-orphan")
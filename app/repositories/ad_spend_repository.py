@@ -1,11 +1,12 @@
 from typing import List, Optional
 from datetime import date
 
-from sqlalchemy.orm import Session, load_only
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
 
 from app.models.ad_spend import AdSpend
 
-
 class AdSpendRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -16,12 +17,21 @@ class AdSpendRepository:
         self.db.refresh(ad_spend)
         return ad_spend
 
-    def bulk_create(self, items: List[AdSpend]) -> List[AdSpend]:
-        if not items:
+    def bulk_create(self, mappings: List[dict]) -> List[Row]:
+        """
+        Um único INSERT ... RETURNING (executemany em lotes via insertmanyvalues), na ordem de `mappings`.
+        Retorna linhas (id, date, amount, sub_id, clicks), não objetos ORM: nada expira no commit,
+        então a resposta não dispara um SELECT de refresh por item.
+        """
+        if not mappings:
             return []
-        self.db.add_all(items)
+        stmt = insert(AdSpend).returning(
+            AdSpend.id, AdSpend.date, AdSpend.amount, AdSpend.sub_id, AdSpend.clicks,
+            sort_by_parameter_order=True,
+        )
+        rows = self.db.execute(stmt, mappings).all()
         self.db.commit()
-        return items
+        return rows
 
     def list_by_user(
         self,
@@ -30,22 +40,23 @@ class AdSpendRepository:
         end_date: Optional[date] = None,
         limit: Optional[int] = None,
         offset: int = 0,
-    ) -> List[AdSpend]:
-        """Lista gastos com anúncios do usuário, sempre filtrando por user_id para garantir isolamento de dados."""
-        query = (
-            self.db.query(AdSpend)
-            .options(load_only(AdSpend.id, AdSpend.date, AdSpend.amount, AdSpend.sub_id, AdSpend.clicks))
-            .filter(AdSpend.user_id == user_id)
+    ) -> List[Row]:
+        """
+        Lista gastos com anúncios do usuário, sempre filtrando por user_id para garantir isolamento de dados.
+        Linhas (id, date, amount, sub_id, clicks), sem objetos ORM: um único SELECT de colunas.
+        """
+        stmt = (
+            select(AdSpend.id, AdSpend.date, AdSpend.amount, AdSpend.sub_id, AdSpend.clicks)
+            .where(AdSpend.user_id == user_id)
         )
         if start_date:
-            query = query.filter(AdSpend.date >= start_date)
+            stmt = stmt.where(AdSpend.date >= start_date)
         if end_date:
-            query = query.filter(AdSpend.date <= end_date)
-        query = query.order_by(AdSpend.date.desc(), AdSpend.id.desc())
+            stmt = stmt.where(AdSpend.date <= end_date)
+        stmt = stmt.order_by(AdSpend.date.desc(), AdSpend.id.desc())
         if limit:
-            query = query.limit(limit).offset(offset)
-        
-        return query.all()
+            stmt = stmt.limit(limit).offset(offset)
+        return self.db.execute(stmt).all()
 
     def get_by_id(self, ad_spend_id: int, user_id: int) -> Optional[AdSpend]:
         return (
@@ -60,7 +71,7 @@ class AdSpendRepository:
 
     def delete_all_by_user(self, user_id: int) -> int:
         """Deleta todos os ad_spends de um usuário e retorna a quantidade deletada."""
-        count = self.db.query(AdSpend).filter(AdSpend.user_id == user_id).count()
-        self.db.query(AdSpend).filter(AdSpend.user_id == user_id).delete()
+        # rowcount do próprio DELETE: sem COUNT(*) prévio
+        count = self.db.query(AdSpend).filter(AdSpend.user_id == user_id).delete()
         self.db.commit()
         return count
@@ -41,7 +41,8 @@ class ClickRowRepository:
 
         # Em conflito: mesmo dataset (ex.: chunks do mesmo job) -> soma clicks; outro dataset -> substitui.
         # Assim upload por chunks acumula; re-upload de outro arquivo substitui totais por (date, channel).
-        stmt = insert(ClickRow).values(mappings)
+        # Valores como parâmetros (executemany em lotes via insertmanyvalues), não um VALUES único.
+        stmt = insert(ClickRow)
         stmt = stmt.on_conflict_do_update(
             index_elements=['row_hash'],
             set_={
@@ -56,7 +57,7 @@ class ClickRowRepository:
             }
         )
 
-        self.db.execute(stmt)
+        self.db.execute(stmt, mappings)
         self.db.commit()
 
     def list_by_dataset(
@@ -211,8 +212,7 @@ class ClickRowRepository:
 
     def delete_all_by_user(self, user_id: int) -> int:
         """Deleta todos os cliques do usuário."""
-        query = self.db.query(ClickRow).filter(ClickRow.user_id == user_id)
-        count = query.count()
-        query.delete()
+        # rowcount do próprio DELETE: sem COUNT(*) prévio
+        count = self.db.query(ClickRow).filter(ClickRow.user_id == user_id).delete()
         self.db.commit()
         return count
@@ -10,6 +10,7 @@ class DatasetRepository:
         self.db = db
 
     def create(self, dataset: Dataset) -> Dataset:
+        """Insere via flush (INSERT ... RETURNING): id e uploaded_at já ficam disponíveis sem refresh."""
         self.db.add(dataset)
         self.db.flush()
         return dataset
@@ -47,9 +48,19 @@ class DatasetRepository:
             .first()
         )
 
+    def delete_by_id(self, dataset_id: int, user_id: int) -> int:
+        """Remove um dataset do usuário (ex.: upload cujo enfileiramento falhou)."""
+        count = (
+            self.db.query(Dataset)
+            .filter(Dataset.user_id == user_id, Dataset.id == dataset_id)
+            .delete()
+        )
+        self.db.commit()
+        return count
+
     def delete_all_by_user(self, user_id: int) -> int:
         """Deleta todos os datasets de um usuário e retorna a quantidade deletada."""
-        count = self.db.query(Dataset).filter(Dataset.user_id == user_id).count()
-        self.db.query(Dataset).filter(Dataset.user_id == user_id).delete()
+        # rowcount do próprio DELETE: sem COUNT(*) prévio
+        count = self.db.query(Dataset).filter(Dataset.user_id == user_id).delete()
         self.db.commit()
         return count
@@ -1,7 +1,8 @@
-from typing import Iterable, List, Optional
+from typing import Iterable, Iterator, List, Optional
 from datetime import date
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session, aliased
 
 from app.models.dataset_row import DatasetRow
 
@@ -48,10 +49,12 @@ class DatasetRowRepository:
             }
             mappings.append(mapping)
         
-        # Usar inserção com UPSERT (ON CONFLICT DO UPDATE) via SQLAlchemy Core (PostgreSQL)
+        # Usar inserção com UPSERT (ON CONFLICT DO UPDATE) via SQLAlchemy Core (PostgreSQL).
+        # Os valores vão como parâmetros (executemany): o SQLAlchemy compila o statement uma vez e o
+        # envia em lotes (insertmanyvalues), em vez de montar um único VALUES gigante por arquivo.
         from sqlalchemy.dialects.postgresql import insert
         
-        stmt = insert(DatasetRow).values(mappings)
+        stmt = insert(DatasetRow)
         # Em conflito: atualizar apenas métricas/dimensões; NÃO atualizar dataset_id.
         # Assim, re-enviar um arquivo com dados já existentes não "transfere" linhas para o novo
         # dataset e os totais (ex.: listar por último dataset) não mudam indevidamente.
@@ -75,7 +78,7 @@ class DatasetRowRepository:
             }
         )
         
-        self.db.execute(stmt)
+        self.db.execute(stmt, mappings)
         if commit:
             self.db.commit()
 
@@ -87,6 +90,7 @@ class DatasetRowRepository:
         end_date: Optional[date] = None,
         limit: Optional[int] = None,
         offset: int = 0,
+        after_id: Optional[int] = None,
     ) -> List[DatasetRow]:
         """Lista linhas de um dataset, sempre filtrando por user_id PRIMEIRO para garantir isolamento de dados."""
         # Sempre filtrar por user_id PRIMEIRO para garantir isolamento de dados
@@ -98,10 +102,7 @@ class DatasetRowRepository:
             query = query.filter(DatasetRow.date >= start_date)
         if end_date:
             query = query.filter(DatasetRow.date <= end_date)
-        query = query.order_by(DatasetRow.date.desc(), DatasetRow.id.desc())
-        if limit:
-            query = query.limit(limit).offset(offset)
-        return query.all()
+        return self._page(query, user_id, limit, offset, after_id).all()
 
     def list_by_user(
         self,
@@ -110,6 +111,7 @@ class DatasetRowRepository:
         end_date: Optional[date] = None,
         limit: Optional[int] = None,
         offset: int = 0,
+        after_id: Optional[int] = None,
     ) -> List[DatasetRow]:
         """Lista linhas de datasets do usuário, sempre filtrando por user_id para garantir isolamento de dados."""
         query = self.db.query(DatasetRow).filter(DatasetRow.user_id == user_id)
@@ -117,11 +119,66 @@ class DatasetRowRepository:
             query = query.filter(DatasetRow.date >= start_date)
         if end_date:
             query = query.filter(DatasetRow.date <= end_date)
+        return self._page(query, user_id, limit, offset, after_id).all()
+
+    def iter_by_user(
+        self,
+        user_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[DatasetRow]:
+        """Como list_by_user, mas lê via cursor no servidor em lotes de batch_size (memória O(lote))."""
+        query = self.db.query(DatasetRow).filter(DatasetRow.user_id == user_id)
+        if start_date:
+            query = query.filter(DatasetRow.date >= start_date)
+        if end_date:
+            query = query.filter(DatasetRow.date <= end_date)
+        query = query.order_by(DatasetRow.date.desc(), DatasetRow.id.desc())
+        return iter(query.yield_per(batch_size))
+
+    def iter_by_dataset(
+        self,
+        dataset_id: int,
+        user_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[DatasetRow]:
+        """Como list_by_dataset, mas lê via cursor no servidor em lotes de batch_size (memória O(lote))."""
+        query = self.db.query(DatasetRow).filter(
+            DatasetRow.user_id == user_id,
+            DatasetRow.dataset_id == dataset_id
+        )
+        if start_date:
+            query = query.filter(DatasetRow.date >= start_date)
+        if end_date:
+            query = query.filter(DatasetRow.date <= end_date)
+        query = query.order_by(DatasetRow.date.desc(), DatasetRow.id.desc())
+        return iter(query.yield_per(batch_size))
+
+    def _page(self, query, user_id: int, limit: Optional[int], offset: int, after_id: Optional[int]):
+        """
+        Ordena por (date DESC, id DESC) e pagina.
+
+        after_id (keyset): continua logo após a linha `after_id` (id da última linha da página
+        anterior), via comparação de tupla (date, id) — usa o índice (user_id, date, id) sem
+        descartar linhas como o OFFSET. Sem after_id mantém limit/offset.
+        """
+        if after_id is not None:
+            cursor = aliased(DatasetRow)
+            cursor_key = (
+                select(cursor.date, cursor.id)
+                .where(cursor.id == after_id, cursor.user_id == user_id)
+                .scalar_subquery()
+            )
+            query = query.filter(tuple_(DatasetRow.date, DatasetRow.id) < cursor_key)
+            query = query.order_by(DatasetRow.date.desc(), DatasetRow.id.desc())
+            return query.limit(limit) if limit else query
         query = query.order_by(DatasetRow.date.desc(), DatasetRow.id.desc())
         if limit:
             query = query.limit(limit).offset(offset)
-        
-        return query.all()
+        return query
 
     def get_existing_order_item_keys(
         self, user_id: int, platform: Optional[str] = None
@@ -16,6 +16,11 @@ class JobRepository:
         self.db.flush()
         return job
 
+    def add(self, job: Job) -> Job:
+        """Stage the job without a flush; the INSERT goes out with the caller's commit."""
+        self.db.add(job)
+        return job
+
     def get_by_id(self, job_id: UUID, user_id: Optional[int] = None) -> Optional[Job]:
         q = self.db.query(Job).filter(Job.job_id == job_id)
         if user_id is not None:
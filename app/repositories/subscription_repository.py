@@ -1,8 +1,28 @@
 from typing import Optional
 
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
 from app.models.subscription import Subscription
+from app.models.user import User
+
+# Consultas do caminho quente (acesso/status de assinatura) montadas uma vez no import:
+# a chave de cache da compilação fica memorizada no objeto e cada chamada só troca os parâmetros.
+_SUBSCRIPTION_BY_USER = select(Subscription).where(Subscription.user_id == bindparam("user_id")).limit(1)
+
+_STATUS_BY_EMAIL = (
+    select(
+        User.id.label("user_id"),
+        Subscription.id.label("subscription_id"),
+        Subscription.is_active,
+        Subscription.last_validation_at,
+        Subscription.cakto_due_date,
+    )
+    .outerjoin(Subscription, Subscription.user_id == User.id)
+    .where(func.lower(User.email) == bindparam("email"))
+    .limit(1)
+)
 
 
 class SubscriptionRepository:
@@ -10,7 +30,14 @@ class SubscriptionRepository:
         self.db = db
 
     def get_by_user_id(self, user_id: int) -> Optional[Subscription]:
-        return self.db.query(Subscription).filter(Subscription.user_id == user_id).first()
+        return self.db.execute(_SUBSCRIPTION_BY_USER, {"user_id": user_id}).scalars().first()
+
+    def get_status_by_email(self, email: str) -> Optional[Row]:
+        """
+        Usuário + assinatura numa única consulta (LEFT JOIN, índice lower(email)).
+        None se o usuário não existe; subscription_id None se ele não tem assinatura.
+        """
+        return self.db.execute(_STATUS_BY_EMAIL, {"email": email.strip().lower()}).first()
 
     def upsert(
         self,
@@ -1,10 +1,13 @@
 from typing import Optional
 
-from sqlalchemy import func
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.orm import Session
 
 from app.models.user import User
 
+# Busca por email (a cada requisição autenticada): statement montado uma vez, só o parâmetro muda
+_USER_BY_EMAIL = select(User).where(func.lower(User.email) == bindparam("email")).limit(1)
+
 
 class UserRepository:
     def __init__(self, db: Session):
@@ -14,11 +17,7 @@ class UserRepository:
         if not email:
             return None
         normalized = email.strip().lower()
-        return (
-            self.db.query(User)
-            .filter(func.lower(User.email) == normalized)
-            .first()
-        )
+        return self.db.execute(_USER_BY_EMAIL, {"email": normalized}).scalars().first()
 
     def get_by_cpf(self, cpf_cnpj: str) -> Optional[User]:
         if not cpf_cnpj:
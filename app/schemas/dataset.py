@@ -77,6 +77,11 @@ class DatasetRowResponse(DatasetRowBase):
         from_attributes = True
 
 
+class AdSpendPayload(BaseModel):
+    amount: float = Field(..., gt=0, description="Valor investido em anúncios")
+    sub_id1: Optional[str] = Field(None, description="Sub_id1 opcional para associar o gasto")
+
+
 class AdSpendResponse(BaseModel):
     updated: int = Field(..., description="Número de linhas atualizadas")
     dataset_id: int = Field(..., description="ID do dataset atualizado")
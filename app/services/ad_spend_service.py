@@ -35,18 +35,22 @@ class AdSpendService:
         # Cache removido - frontend gerencia via localStorage
         return created
 
-    def bulk_create(self, user_id: int, items) -> List[AdSpend]:
+    def bulk_create(self, user_id: int, items) -> List[dict]:
         if not items:
             return []
-        ad_spends = []
-        for item in items:
-            sub_id_val = None if item.sub_id in ["", "__all__"] else item.sub_id
-            ad_spends.append(
-                AdSpend(user_id=user_id, date=item.date, sub_id=sub_id_val, amount=item.amount, clicks=getattr(item, 'clicks', 0) or 0)
-            )
-        created = self.repo.bulk_create(ad_spends)
+        mappings = [
+            {
+                "user_id": user_id,
+                "date": item.date,
+                "sub_id": None if item.sub_id in ["", "__all__"] else item.sub_id,
+                "amount": item.amount,
+                "clicks": getattr(item, 'clicks', 0) or 0,
+            }
+            for item in items
+        ]
+        created = self.repo.bulk_create(mappings)
         # Cache removido - frontend gerencia via localStorage
-        return created
+        return [self._serialize(row) for row in created]
 
     def list(
         self,
@@ -55,7 +59,7 @@ class AdSpendService:
         end_date: Optional[date],
         limit: Optional[int],
         offset: int,
-    ) -> List[AdSpend]:
+    ) -> List[dict]:
         # Cache removido - frontend gerencia via localStorage
         data = self.repo.list_by_user(user_id, start_date, end_date, limit, offset)
         payload = [self._serialize(item) for item in data]
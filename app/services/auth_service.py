@@ -1,3 +1,4 @@
+import secrets
 from datetime import timedelta, datetime, timezone
 
 from fastapi import HTTPException, status
@@ -68,7 +69,6 @@ class AuthService:
 
                 # JIT Provisioning (se login no Supabase OK e user local não existe)
                 if not user:
-                    import secrets
                     import string
                     # Gerar senha aleatória segura para conta gerenciada
                     random_pwd = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(32))
@@ -166,10 +166,8 @@ class AuthService:
         if existing:
             return existing  # Usuário já existe, retornar existente
         
-        # Gerar token único para definir senha (32 caracteres)
-        import secrets
-        import string
-        token = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(32))
+        # Gerar token único para definir senha (32 caracteres URL-safe)
+        token = secrets.token_urlsafe(24)
         
         # Definir expiração (24 horas)
         expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
@@ -262,8 +260,6 @@ class AuthService:
     def forgot_password(self, email: str) -> bool:
         """Solicita reset de senha. Gera token e envia email."""
         import logging
-        import secrets
-        import string
         logger = logging.getLogger(__name__)
         
         # Buscar usuário pelo email
@@ -279,8 +275,8 @@ class AuthService:
             logger.warning(f"Tentativa de reset de senha para usuário inativo: {email}")
             return True  # Retornar True mesmo para usuário inativo
         
-        # Gerar token único para reset de senha (32 caracteres)
-        token = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(32))
+        # Gerar token único para reset de senha (32 caracteres URL-safe)
+        token = secrets.token_urlsafe(24)
         
         # Definir expiração (24 horas)
         expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
@@ -1,5 +1,5 @@
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
 import requests
 
@@ -13,11 +13,6 @@ class CaktoError(RuntimeError):
 _token_cache: Dict[str, Any] = {"token": None, "expires_at": 0.0}
 
 
-def _parse_product_ids() -> List[str]:
-    raw = settings.CAKTO_SUBSCRIPTION_PRODUCT_IDS or ""
-    return [item.strip() for item in raw.split(",") if item.strip()]
-
-
 def _get_token() -> str:
     if not settings.CAKTO_CLIENT_ID or not settings.CAKTO_CLIENT_SECRET:
         raise CaktoError("Cakto credentials not configured")
@@ -77,7 +72,7 @@ def _is_active(order: Dict[str, Any]) -> bool:
     return status in {"approved", "paid", "active"} or payment_status in {"approved", "paid"} or subscription_status in {"active", "approved"}
 
 
-def _matches_product(order: Dict[str, Any], allowed_ids: List[str]) -> bool:
+def _matches_product(order: Dict[str, Any], allowed_ids: FrozenSet[str]) -> bool:
     if not allowed_ids:
         return True
     candidates = []
@@ -100,7 +95,7 @@ def check_active_subscription(email: str) -> Tuple[bool, Optional[str]]:
 
     payload = resp.json() if resp.content else {}
     orders = _extract_orders(payload)
-    allowed_ids = _parse_product_ids()
+    allowed_ids = settings.cakto_product_ids
 
     for order in orders:
         if _is_subscription(order) and _is_active(order) and _matches_product(order, allowed_ids):
@@ -152,7 +147,7 @@ def get_subscription_status(customer_id: str) -> Dict[str, Any]:
 
         payload = resp.json() if resp.content else {}
         orders = _extract_orders(payload)
-        allowed_ids = _parse_product_ids()
+        allowed_ids = settings.cakto_product_ids
 
         for order in orders:
             if _is_subscription(order) and _matches_product(order, allowed_ids):
@@ -14,7 +14,8 @@ from app.models.click_row import ClickRow
 from app.repositories.dataset_repository import DatasetRepository
 from app.core.config import settings
 from app.repositories.click_row_repository import ClickRowRepository
-from app.services.csv_service import CSVService
+from app.services.csv_service import CSVService, CSVSource
+from app.services.upload_service import require_csv_filename
 
 logger = logging.getLogger(__name__)
 
@@ -44,8 +45,7 @@ class ClickService:
 
     def upload_click_csv(self, file_content: bytes, filename: str, user_id: int) -> Tuple[Dataset, dict]:
         """Processa upload de CSV de cliques com agrupamento por (date, channel). total_clicks = linhas do CSV; rows.clicks = soma por dia/canal."""
-        if not filename.endswith(".csv"):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Apenas arquivos CSV são permitidos")
+        require_csv_filename(filename)
 
         df, errors = CSVService.validate_click_csv(file_content, filename)
         if df is None:
@@ -132,9 +132,10 @@ class ClickService:
         }
         return dataset, metadata
 
-    def process_click_csv(self, dataset_id: int, user_id: int, file_content: bytes, filename: str) -> None:
+    def process_click_csv(self, dataset_id: int, user_id: int, source: CSVSource, filename: str) -> None:
         """
         Processa CSV de cliques para um dataset já criado (uso pela task Celery).
+        `source`: bytes do arquivo ou caminho em disco (lido direto pelo pandas).
         Regra: dados do arquivo prevalecem (upsert). Atualiza dataset.status e dataset.row_count.
         """
         dataset = self.dataset_repo.get_by_id(dataset_id, user_id)
@@ -142,7 +143,7 @@ class ClickService:
             logger.warning(f"process_click_csv: dataset {dataset_id} not found for user {user_id}")
             return
 
-        df, errors = CSVService.validate_click_csv(file_content, filename)
+        df, errors = CSVService.validate_click_csv(source, filename)
         if df is None:
             dataset.status = "error"
             dataset.error_message = "; ".join(errors[:10]) if errors else "Erro ao validar CSV de cliques"
@@ -1,15 +1,27 @@
+import gzip
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Tuple
+import os
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime, date as date_cls
 from io import BytesIO
 import logging
 import unicodedata
+import zlib
 
+from app.core.config import settings
 from app.utils.shopee_normalize import normalize_order_status, normalize_attribution_type
 
 logger = logging.getLogger(__name__)
 
+# Conteúdo do CSV em memória ou caminho em disco (lido direto pelo pandas, sem cópia em bytes)
+CSVSource = Union[bytes, str, os.PathLike]
+
+# Extensões aceitas no upload (comparação sem diferenciar maiúsculas); .csv.gz é descomprimido na leitura
+CSV_EXTENSIONS = (".csv", ".csv.gz")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
 # Colunas alvo
 TARGET_COLUMNS = ["date", "product", "revenue", "cost", "commission", "quantity"]
 
@@ -90,6 +102,59 @@ class CSVValidationError(Exception):
     pass
 
 
+def is_csv_filename(filename: Optional[str]) -> bool:
+    return bool(filename) and filename.lower().endswith(CSV_EXTENSIONS)
+
+
+def _is_gzip(source: CSVSource) -> bool:
+    """Detecta gzip pelo magic number (independe do nome: o arquivo temporário é sempre .csv)."""
+    if isinstance(source, bytes):
+        return source[:2] == _GZIP_MAGIC
+    with open(source, "rb") as f:
+        return f.read(2) == _GZIP_MAGIC
+
+
+def gunzip_capped(source: CSVSource) -> bytes:
+    """
+    Descomprime um .csv.gz (bytes ou caminho) lendo no máximo MAX_DECOMPRESSED_BYTES + 1 bytes:
+    um arquivo que passe do limite é rejeitado com CSVValidationError sem ser expandido inteiro.
+    """
+    limit = settings.MAX_DECOMPRESSED_BYTES
+    try:
+        with gzip.GzipFile(fileobj=BytesIO(source)) if isinstance(source, bytes) else gzip.open(source, "rb") as f:
+            content = f.read(limit + 1)
+    except (OSError, EOFError, zlib.error) as e:
+        raise CSVValidationError(f"Arquivo .csv.gz inválido: {e}")
+    if len(content) > limit:
+        raise CSVValidationError(
+            f"Arquivo descomprimido excede o tamanho máximo permitido ({limit // (1024 * 1024)} MB)."
+        )
+    return content
+
+
+def gunzip_if_needed(content: bytes) -> bytes:
+    """Conteúdo baixado do storage: descomprime (com limite) se for gzip (.csv.gz), senão devolve como está."""
+    return gunzip_capped(content) if _is_gzip(content) else content
+
+
+def _read_csv_any_encoding(source: CSVSource) -> Optional[pd.DataFrame]:
+    """
+    Lê o CSV (puro ou gzip) tentando utf-8, latin-1 e iso-8859-1; None se nenhuma decodificar.
+    Gzip é descomprimido uma única vez, antes das tentativas (e com limite de tamanho).
+    """
+    if _is_gzip(source):
+        source = gunzip_capped(source)
+    for encoding in ['utf-8', 'latin-1', 'iso-8859-1']:
+        try:
+            return pd.read_csv(
+                BytesIO(source) if isinstance(source, bytes) else source,
+                encoding=encoding,
+            )
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
 class CSVService:
     """Service for processing and validating CSV files."""
 
@@ -137,7 +202,7 @@ class CSVService:
         return series.apply(clean_value)
 
     @staticmethod
-    def validate_csv(file_content: bytes, filename: str) -> Tuple[pd.DataFrame, List[str]]:
+    def validate_csv(source: CSVSource, filename: str) -> Tuple[pd.DataFrame, List[str]]:
         """
         Validate and parse CSV file (flexível). Se colunas estiverem ausentes, cria padrões.
         Retorna dataframe sempre com as colunas TARGET_COLUMNS + profit.
@@ -145,15 +210,8 @@ class CSVService:
         errors = []
 
         try:
-            df = None
-            df_orig = None
-            for encoding in ['utf-8', 'latin-1', 'iso-8859-1']:
-                try:
-                    df = pd.read_csv(BytesIO(file_content), encoding=encoding)
-                    df_orig = df.copy()
-                    break
-                except UnicodeDecodeError:
-                    continue
+            df = _read_csv_any_encoding(source)
+            df_orig = df.copy() if df is not None else None
 
             if df is None:
                 errors.append("Não foi possível decodificar o arquivo CSV. Verifique a codificação.")
@@ -281,6 +339,9 @@ class CSVService:
 
             return out.reset_index(drop=True), errors
 
+        except CSVValidationError as e:
+            errors.append(str(e))
+            return None, errors
         except pd.errors.EmptyDataError:
             errors.append("O arquivo CSV está vazio ou mal formatado.")
             return None, errors
@@ -290,7 +351,7 @@ class CSVService:
             return None, errors
 
     @staticmethod
-    def validate_click_csv(file_content: bytes, filename: str) -> Tuple[pd.DataFrame, List[str]]:
+    def validate_click_csv(source: CSVSource, filename: str) -> Tuple[pd.DataFrame, List[str]]:
         """
         Valida e processa CSV de cliques.
         Retorna dataframe com date, time, channel, clicks, sub_id, raw_data.
@@ -298,15 +359,8 @@ class CSVService:
         errors = []
 
         try:
-            df = None
-            df_orig = None
-            for encoding in ['utf-8', 'latin-1', 'iso-8859-1']:
-                try:
-                    df = pd.read_csv(BytesIO(file_content), encoding=encoding)
-                    df_orig = df.copy()
-                    break
-                except UnicodeDecodeError:
-                    continue
+            df = _read_csv_any_encoding(source)
+            df_orig = df.copy() if df is not None else None
 
             if df is None:
                 errors.append("Não foi possível decodificar o arquivo CSV de cliques.")
@@ -377,6 +431,9 @@ class CSVService:
 
             return out.reset_index(drop=True), errors
 
+        except CSVValidationError as e:
+            errors.append(str(e))
+            return None, errors
         except Exception as e:
             logger.error(f"Erro ao processar CSV de cliques: {str(e)}")
             errors.append(f"Erro ao processar CSV de cliques: {str(e)}")
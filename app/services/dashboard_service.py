@@ -4,6 +4,7 @@ from datetime import date, datetime
 from typing import Optional, List
 from decimal import Decimal
 import hashlib
+import time
 
 from app.models.dataset_row import DatasetRow
 from app.schemas.dashboard import (
@@ -13,7 +14,13 @@ from app.schemas.dashboard import (
     ProductAggregation,
     DashboardResponse
 )
-from app.core.cache import cache_get, cache_set, cache_delete_prefix
+from app.core.cache import cache_delete, cache_delete_prefix, cache_get, cache_lock, cache_set
+
+# TTL da resposta cacheada e do lock anti-stampede (uma requisição recalcula; as demais aguardam o cache)
+DASHBOARD_CACHE_TTL_SECONDS = 300
+DASHBOARD_LOCK_TTL_SECONDS = 10
+DASHBOARD_LOCK_WAIT_SECONDS = 2.0
+DASHBOARD_LOCK_POLL_SECONDS = 0.1
 
 
 class DashboardService:
@@ -172,8 +179,20 @@ class DashboardService:
         cached_data = cache_get(cache_key)
         if cached_data:
             return DashboardResponse(**cached_data)
-        
-        # Cache miss - query database
+
+        # Cache miss: só quem pega o lock recalcula; as demais requisições com os mesmos
+        # filtros aguardam o cache ser preenchido (até DASHBOARD_LOCK_WAIT_SECONDS).
+        lock_key = f"{cache_key}:lock"
+        if not cache_lock(lock_key, DASHBOARD_LOCK_TTL_SECONDS):
+            deadline = time.monotonic() + DASHBOARD_LOCK_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(DASHBOARD_LOCK_POLL_SECONDS)
+                cached_data = cache_get(cache_key)
+                if cached_data:
+                    return DashboardResponse(**cached_data)
+            lock_key = None
+
+        # Query database
         kpis = DashboardService.get_kpis(db, user_id, filters)
         period_aggregations = DashboardService.get_period_aggregations(db, user_id, filters)
         product_aggregations = DashboardService.get_product_aggregations(db, user_id, filters)
@@ -185,12 +204,14 @@ class DashboardService:
         )
         
         # Cache the response (5 minutes TTL)
-        cache_set(cache_key, response.dict(), ttl=300)
-        
+        cache_set(cache_key, response.dict(), ttl=DASHBOARD_CACHE_TTL_SECONDS)
+        if lock_key:
+            cache_delete(lock_key)
+
         return response
     
     @staticmethod
     def invalidate_user_cache(user_id: int) -> None:
-        """Invalidate all cached dashboard data for a user."""
+        """Invalidate all cached dashboard data for a user (chamar após commit que altere dataset_rows)."""
         cache_delete_prefix(f"dashboard:user:{user_id}:")
 
@@ -5,13 +5,16 @@ from typing import List, Optional
 
 import pandas as pd
 import numpy as np
+import orjson
 from fastapi import HTTPException, status
 
 from app.models.dataset import Dataset
 from app.models.dataset_row import DatasetRow
 from app.repositories.dataset_repository import DatasetRepository
 from app.repositories.dataset_row_repository import DatasetRowRepository
-from app.services.csv_service import CSVService
+from app.services.csv_service import CSVService, CSVSource
+from app.services.dashboard_service import DashboardService
+from app.services.upload_service import require_csv_filename
 from app.utils.row_hash import generate_row_hash
 from app.utils.serialization import serialize_value, clean_number
 
@@ -41,18 +44,19 @@ class DatasetService:
             row_data.get("status"),
         )
 
-    def process_commission_csv(self, dataset_id: int, user_id: int, file_content: bytes, filename: str) -> None:
+    def process_commission_csv(self, dataset_id: int, user_id: int, source: CSVSource, filename: str) -> None:
         """
         Processa CSV de comissão para um dataset já criado (uso pela task Celery).
         Regra: em caso de row_hash existente, os dados do arquivo prevalecem (upsert).
         Atualiza dataset.status e dataset.row_count; em erro de validação define status='error'.
+        `source`: bytes do arquivo ou caminho em disco (lido direto pelo pandas).
         """
         dataset = self.dataset_repo.get_by_id(dataset_id, user_id)
         if not dataset:
             logger.warning(f"process_commission_csv: dataset {dataset_id} not found for user {user_id}")
             return
 
-        df, errors = CSVService.validate_csv(file_content, filename)
+        df, errors = CSVService.validate_csv(source, filename)
         if df is None:
             dataset.status = "error"
             dataset.error_message = "; ".join(errors[:10]) if errors else "Erro ao validar CSV"
@@ -161,14 +165,14 @@ class DatasetService:
             dataset.row_count = inserted_count  # só linhas novas ficam com este dataset_id (upsert não altera dataset_id)
             dataset.status = "completed"
             self.dataset_repo.db.commit()
+            DashboardService.invalidate_user_cache(user_id)
             logger.info(f"Processamento concluído: {inserted_count} novas linhas, {updated_count} atualizadas para dataset {dataset_id}.")
 
     def upload_csv(self, file_content: bytes, filename: str, user_id: int) -> tuple[Dataset, dict]:
         """
         Upload de CSV de comissão. Regra: linhas já existentes (mesmo row_hash) são atualizadas com os dados do arquivo.
         """
-        if not filename.endswith(".csv"):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Apenas arquivos CSV são permitidos")
+        require_csv_filename(filename)
 
         df, errors = CSVService.validate_csv(file_content, filename)
         if df is None:
@@ -292,6 +296,7 @@ class DatasetService:
             dataset.row_count = inserted_count  # só linhas novas ficam com este dataset_id (upsert não altera dataset_id)
             dataset.status = "completed"
             self.dataset_repo.db.commit()
+            DashboardService.invalidate_user_cache(user_id)
             logger.info(f"Processamento concluído: {inserted_count} novas linhas, {updated_count} atualizadas.")
 
         self.dataset_repo.db.refresh(dataset)
@@ -312,6 +317,7 @@ class DatasetService:
         end_date: Optional[datetime.date],
         limit: Optional[int],
         offset: int,
+        after_id: Optional[int] = None,
     ):
         # Último dataset de comissão (transaction), não o último de qualquer tipo (ex.: click)
         latest = self.dataset_repo.get_latest_by_user_and_type(user_id, "transaction")
@@ -319,8 +325,8 @@ class DatasetService:
             return []
         if start_date and end_date and start_date > end_date:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Data inicial não pode ser maior que a data final.")
-        rows = self.row_repo.list_by_dataset(latest.id, user_id, start_date, end_date, limit, offset)
-        return [self.serialize_row(r) for r in rows]
+        rows = self.row_repo.list_by_dataset(latest.id, user_id, start_date, end_date, limit, offset, after_id)
+        return [self.serialize_row_for_api(r) for r in rows]
 
     def list_all_rows(
         self,
@@ -329,11 +335,35 @@ class DatasetService:
         end_date: Optional[datetime.date],
         limit: Optional[int],
         offset: int,
+        after_id: Optional[int] = None,
     ):
         if start_date and end_date and start_date > end_date:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Data inicial não pode ser maior que a data final.")
-        rows = self.row_repo.list_by_user(user_id, start_date, end_date, limit, offset)
-        return [self.serialize_row(r) for r in rows]
+        rows = self.row_repo.list_by_user(user_id, start_date, end_date, limit, offset, after_id)
+        return [self.serialize_row_for_api(r) for r in rows]
+
+    def iter_all_rows_ndjson(
+        self,
+        user_id: int,
+        start_date: Optional[datetime.date],
+        end_date: Optional[datetime.date],
+    ):
+        """Todas as linhas do usuário em NDJSON (bytes, uma linha JSON por registro), sem materializar a lista."""
+        for row in self.row_repo.iter_by_user(user_id, start_date, end_date):
+            yield orjson.dumps(self.serialize_row_for_api(row)) + b"\n"
+
+    def iter_latest_rows_ndjson(
+        self,
+        user_id: int,
+        start_date: Optional[datetime.date],
+        end_date: Optional[datetime.date],
+    ):
+        """Linhas do último dataset de comissão em NDJSON, sem materializar a lista."""
+        latest = self.dataset_repo.get_latest_by_user_and_type(user_id, "transaction")
+        if not latest:
+            return
+        for row in self.row_repo.iter_by_dataset(latest.id, user_id, start_date, end_date):
+            yield orjson.dumps(self.serialize_row_for_api(row)) + b"\n"
 
     def list_datasets(self, user_id: int):
         return self.dataset_repo.list_by_user(user_id)
@@ -350,11 +380,13 @@ class DatasetService:
         user_id: int,
         start_date: datetime.date,
         end_date: datetime.date,
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
     ):
         if start_date > end_date:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Data inicial não pode ser maior que a data final.")
-        rows = self.row_repo.list_by_dataset(dataset_id, user_id, start_date, end_date, None, 0)
-        return [self.serialize_row(r) for r in rows]
+        rows = self.row_repo.list_by_dataset(dataset_id, user_id, start_date, end_date, limit, 0, after_id)
+        return [self.serialize_row_for_api(r) for r in rows]
 
     def serialize_row(self, row: DatasetRow) -> dict:
         return {
@@ -379,6 +411,16 @@ class DatasetService:
             "quantity": row.quantity,
         }
 
+    def serialize_row_for_api(self, row: DatasetRow) -> dict:
+        """
+        Mesmo JSON de DatasetRowResponse (data DD-MM-YYYY, hora HH:MM:SS), pronto para orjson.
+        Usado nas listagens grandes, que não passam cada item pela validação do pydantic.
+        """
+        data = self.serialize_row(row)
+        data["date"] = row.date.strftime("%d-%m-%Y") if row.date else ""
+        data["time"] = row.time.strftime("%H:%M:%S") if row.time else None
+        return data
+
     def apply_ad_spend(
         self, user_id: int, amount: float, sub_id1: Optional[str], db_session
     ):
@@ -395,15 +437,14 @@ class DatasetService:
         if sub_id1:
             rows_query = rows_query.filter(DatasetRow.sub_id1 == sub_id1)
 
-        total_rows = rows_query.count()
+        # Como as linhas agora são agrupadas, o número de linhas é muito menor:
+        # carrega de uma vez e usa o próprio tamanho do lote como total (sem COUNT separado).
+        batch = rows_query.all()
+        total_rows = len(batch)
         if total_rows == 0:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nenhuma linha encontrada para aplicar o valor de anúncio")
 
         amount_per_row = Decimal(str(amount)) / Decimal(str(total_rows))
-        
-        # Como as linhas agora são agrupadas, o número de linhas é muito menor
-        # Podemos aplicar o update diretamente
-        batch = rows_query.all()
         mappings = []
         for row in batch:
             new_cost = (row.cost or 0) + amount_per_row
@@ -416,6 +457,7 @@ class DatasetService:
         
         db_session.bulk_update_mappings(DatasetRow, mappings)
         db_session.commit()
+        DashboardService.invalidate_user_cache(user_id)
 
         return {
             "updated": len(batch),
@@ -426,4 +468,5 @@ class DatasetService:
 
     def delete_all(self, user_id: int) -> dict:
         count = self.dataset_repo.delete_all_by_user(user_id)
+        DashboardService.invalidate_user_cache(user_id)
         return {"deleted": count}
@@ -25,6 +25,10 @@ class EmailService:
         self.from_name = settings.SMTP_FROM_NAME
         self.frontend_url = settings.FRONTEND_URL
         
+    def is_configured(self) -> bool:
+        """True se há credenciais SMTP (sem elas _send_email sempre falha)."""
+        return bool(self.smtp_user and self.smtp_password)
+
     def _get_template_path(self, template_name: str) -> Path:
         """Retorna o caminho do template."""
         base_path = Path(__file__).parent.parent
@@ -70,7 +74,7 @@ class EmailService:
         text_content: Optional[str] = None
     ) -> bool:
         """Envia email via SMTP."""
-        if not self.smtp_user or not self.smtp_password:
+        if not self.is_configured():
             logger.error("Credenciais SMTP não configuradas")
             return False
         
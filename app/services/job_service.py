@@ -1,5 +1,5 @@
 """
-Job service: create job + dataset, presigned URL, commit (enqueue split), get status.
+Job service: create job + dataset, presigned URL, commit (enqueue processing), get status.
 """
 import logging
 from uuid import UUID, uuid4
@@ -11,6 +11,7 @@ from app.models.dataset import Dataset
 from app.models.job import Job
 from app.repositories.dataset_repository import DatasetRepository
 from app.repositories.job_repository import JobRepository
+from app.services.csv_service import is_csv_filename
 from app.services.storage import create_presigned_put, object_exists, is_storage_configured
 
 logger = logging.getLogger(__name__)
@@ -20,6 +21,12 @@ def _bucket() -> str:
     return settings.S3_BUCKET or ""
 
 
+def enqueue_job(job_id: UUID) -> None:
+    """Single dispatch point of the jobs pipeline: one process_job_from_storage task per job."""
+    from app.tasks.job_tasks import process_job_from_storage
+    process_job_from_storage.delay(str(job_id))
+
+
 class JobService:
     def __init__(self, job_repo: JobRepository, dataset_repo: DatasetRepository):
         self.job_repo = job_repo
@@ -35,10 +42,10 @@ class JobService:
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Object Storage not configured (S3_*). Jobs pipeline unavailable.",
             )
-        if not filename or not filename.endswith(".csv"):
+        if not is_csv_filename(filename):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="filename must be a non-empty CSV filename.",
+                detail="filename must be a non-empty CSV filename (.csv or .csv.gz).",
             )
         if job_type not in ("transaction", "click"):
             raise HTTPException(
@@ -49,27 +56,7 @@ class JobService:
         job_id = uuid4()
         storage_key = f"uploads/{job_id}/{filename}"
 
-        dataset = Dataset(
-            user_id=user_id,
-            filename=filename,
-            type=job_type,
-            status="pending",
-        )
-        self.dataset_repo.create(dataset)
-        self.job_repo.db.flush()
-
-        job = Job(
-            job_id=job_id,
-            dataset_id=dataset.id,
-            user_id=user_id,
-            type=job_type,
-            storage_key=storage_key,
-            status="queued",
-        )
-        self.job_repo.create(job)
-        self.job_repo.db.commit()
-        self.job_repo.db.refresh(job)
-        self.job_repo.db.refresh(dataset)
+        dataset_id = self.create_dataset_with_job(user_id, filename, job_type, job_id, storage_key, "queued")
 
         upload_url = create_presigned_put(_bucket(), storage_key, expires_in=3600, content_type="text/csv")
         if not upload_url:
@@ -80,20 +67,49 @@ class JobService:
 
         return {
             "job_id": str(job_id),
-            "dataset_id": dataset.id,
+            "dataset_id": dataset_id,
             "upload_url": upload_url,
             "expires_in": 3600,
         }
 
+    def create_dataset_with_job(
+        self,
+        user_id: int,
+        filename: str,
+        job_type: str,
+        job_id: UUID,
+        storage_key: str,
+        job_status: str,
+    ) -> int:
+        """
+        Create Dataset (pending) and Job in one transaction; returns dataset_id.
+        One flush for the dataset id (INSERT ... RETURNING); the job INSERT goes out with the commit.
+        The id is read before commit, so no refresh SELECT is needed afterwards.
+        """
+        dataset = self.dataset_repo.create(
+            Dataset(user_id=user_id, filename=filename, type=job_type, status="pending")
+        )
+        dataset_id = dataset.id
+        self.job_repo.add(
+            Job(
+                job_id=job_id,
+                dataset_id=dataset_id,
+                user_id=user_id,
+                type=job_type,
+                storage_key=storage_key,
+                status=job_status,
+            )
+        )
+        self.job_repo.db.commit()
+        return dataset_id
+
     def commit_job(self, job_id: UUID, user_id: int) -> dict:
         """
         Verify job exists and belongs to user; verify object exists in storage.
         Set job status to processing and enqueue process_job_from_storage (single task, batched in memory).
         Returns 202 payload.
         """
-        job = self.job_repo.get_by_id(job_id, user_id=user_id)
-        if not job:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Processamento não encontrado.")
+        job = self.get_owned_job(job_id, user_id)
 
         if not object_exists(_bucket(), job.storage_key):
             raise HTTPException(
@@ -101,11 +117,7 @@ class JobService:
                 detail="File not found in storage. Upload the file to the presigned URL before committing.",
             )
 
-        job.status = "processing"
-        self.job_repo.db.commit()
-
-        from app.tasks.job_tasks import process_job_from_storage
-        process_job_from_storage.delay(str(job_id))
+        self.start_processing(job)
 
         return {
             "job_id": str(job_id),
@@ -113,11 +125,30 @@ class JobService:
             "message": "File uploaded, processing scheduled.",
         }
 
-    def get_job(self, job_id: UUID, user_id: int) -> dict:
-        """Return job status, total_chunks, chunks_done, created_at, errors from failed chunks."""
+    def get_owned_job(self, job_id: UUID, user_id: int) -> Job:
+        """Job of this user, or 404."""
         job = self.job_repo.get_by_id(job_id, user_id=user_id)
         if not job:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Processamento não encontrado.")
+        return job
+
+    def start_processing(self, job: Job, reset_progress: bool = False) -> None:
+        """Set job to processing, commit and enqueue it (commit, complete-multipart and retry)."""
+        # Read before commit: expire_on_commit would otherwise reload the row just to get the id
+        job_id = job.job_id
+        job.status = "processing"
+        if reset_progress:
+            job.chunks_done = 0
+        self.job_repo.db.commit()
+        enqueue_job(job_id)
+
+    def cancel_job(self, job: Job) -> None:
+        job.status = "cancelled"
+        self.job_repo.db.commit()
+
+    def get_job(self, job_id: UUID, user_id: int) -> dict:
+        """Return job status, total_chunks, chunks_done, created_at, errors from failed chunks."""
+        job = self.get_owned_job(job_id, user_id)
 
         chunks = self.job_repo.get_chunks(job_id)
         errors = [{"chunk_index": c.chunk_index, "error": c.error} for c in chunks if c.status == "failed" and c.error]
@@ -7,7 +7,7 @@ Espelha a interface do cakto_service para ser intercambiável via payment_provid
 import logging
 import time
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 import requests
 
@@ -65,11 +65,6 @@ def _get_headers() -> Dict[str, str]:
     return headers
 
 
-def _parse_product_ids() -> List[str]:
-    raw = settings.KIWIFY_SUBSCRIPTION_PRODUCT_IDS or ""
-    return [item.strip() for item in raw.split(",") if item.strip()]
-
-
 def check_active_subscription(email: str) -> Tuple[bool, Optional[str]]:
     """
     Verifica se existe assinatura ativa para o email na Kiwify.
@@ -78,7 +73,7 @@ def check_active_subscription(email: str) -> Tuple[bool, Optional[str]]:
     (API Kiwify não tem filtro por email).
     """
     headers = _get_headers()
-    allowed_ids = _parse_product_ids()
+    allowed_ids = settings.kiwify_product_ids
     email_lower = email.strip().lower()
 
     now = datetime.now(timezone.utc)
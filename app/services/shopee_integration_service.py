@@ -18,6 +18,7 @@ from app.repositories.dataset_row_repository import DatasetRowRepository
 from app.repositories.shopee_integration_repository import ShopeeIntegrationRepository
 from app.schemas.shopee_integration import ShopeeIntegrationResponse
 from app.services import shopee_graphql_client
+from app.services.dashboard_service import DashboardService
 from app.utils.shopee_normalize import normalize_order_status, normalize_attribution_type
 
 logger = logging.getLogger(__name__)
@@ -542,6 +543,7 @@ class ShopeeIntegrationService:
             commissions = await self.sync_commissions(user_id, db, days_back=days_back)
             self.repo.update_last_sync(user_id)
             db.commit()
+            DashboardService.invalidate_user_cache(user_id)
             logger.info(
                 "Shopee sync concluído user_id=%s: %d conversões (%d dias)",
                 user_id, commissions, days_back,
@@ -3,6 +3,7 @@ S3-compatible Object Storage (Supabase Storage, MinIO, AWS S3).
 Used by the jobs pipeline for presigned uploads and chunk storage.
 """
 import logging
+from functools import lru_cache
 from io import BytesIO
 from typing import BinaryIO, Optional
 
@@ -11,19 +12,45 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 
 
+# Connections per client: covers the API threadpool plus TransferConfig's upload threads.
+S3_MAX_POOL_CONNECTIONS = 50
+
+
 def _get_client():
-    """Lazy boto3 client; returns None if storage is not configured."""
+    """Shared boto3 client; returns None if storage is not configured."""
     if not all([settings.S3_BUCKET, settings.S3_ENDPOINT, settings.S3_ACCESS_KEY, settings.S3_SECRET_KEY]):
         return None
+    return _build_client(
+        settings.S3_ENDPOINT,
+        settings.S3_ACCESS_KEY,
+        settings.S3_SECRET_KEY,
+        settings.S3_REGION or "us-east-1",
+    )
+
+
+@lru_cache(maxsize=4)
+def _build_client(endpoint: str, access_key: str, secret_key: str, region: str):
+    """
+    One client per credential set, built once per process: botocore model loading and
+    endpoint resolution happen once, and the pooled HTTPS connections (keep-alive) are
+    reused across requests instead of a new TLS handshake per call. boto3 clients are
+    thread-safe, so the threadpool shares it.
+    """
     try:
         import boto3
         from botocore.config import Config
-        config = Config(signature_version="s3v4", region_name=settings.S3_REGION or "us-east-1")
+        config = Config(
+            signature_version="s3v4",
+            region_name=region,
+            max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+            tcp_keepalive=True,
+            retries={"mode": "adaptive", "max_attempts": 5},
+        )
         return boto3.client(
             "s3",
-            endpoint_url=settings.S3_ENDPOINT,
-            aws_access_key_id=settings.S3_ACCESS_KEY,
-            aws_secret_access_key=settings.S3_SECRET_KEY,
+            endpoint_url=endpoint,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
             config=config,
         )
     except ImportError:
@@ -31,6 +58,20 @@ def _get_client():
         return None
 
 
+# Multipart above 8 MB, in 8 MB parts read from the file on demand: memory stays O(part), not O(file).
+MULTIPART_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def _transfer_config():
+    """TransferConfig for upload_fileobj (boto3 imported lazily, like the client)."""
+    from boto3.s3.transfer import TransferConfig
+    return TransferConfig(
+        multipart_threshold=MULTIPART_CHUNK_BYTES,
+        multipart_chunksize=MULTIPART_CHUNK_BYTES,
+        use_threads=True,
+    )
+
+
 def is_storage_configured() -> bool:
     """Return True if S3 bucket and credentials are set."""
     return bool(
@@ -75,7 +116,7 @@ def upload_file_obj(
     file_like: BinaryIO,
     content_type: Optional[str] = "text/csv",
 ) -> bool:
-    """Upload from a file-like object (e.g. UploadFile)."""
+    """Upload from a file-like object (e.g. UploadFile.file), streamed in multipart chunks."""
     client = _get_client()
     if not client:
         return False
@@ -85,6 +126,7 @@ def upload_file_obj(
             bucket,
             key,
             ExtraArgs={"ContentType": content_type or "application/octet-stream"},
+            Config=_transfer_config(),
         )
         return True
     except Exception as e:
@@ -176,6 +218,35 @@ def create_presigned_upload_part(
         return None
 
 
+def create_presigned_upload_parts(
+    bucket: str,
+    key: str,
+    upload_id: str,
+    part_numbers: range,
+    expires_in: int = 3600,
+) -> Optional[list[str]]:
+    """
+    Presigned URLs for several parts in one call (same client, bucket/key/upload_id).
+    Signing is local, so the whole batch costs no S3 round-trip.
+    """
+    client = _get_client()
+    if not client:
+        return None
+    params = {"Bucket": bucket, "Key": key, "UploadId": upload_id}
+    try:
+        return [
+            client.generate_presigned_url(
+                "upload_part",
+                Params={**params, "PartNumber": part_number},
+                ExpiresIn=expires_in,
+            )
+            for part_number in part_numbers
+        ]
+    except Exception as e:
+        logger.error(f"Failed to generate presigned URLs for parts {part_numbers}: {e}")
+        return None
+
+
 def complete_multipart_upload(
     bucket: str,
     key: str,
@@ -1,17 +1,67 @@
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 
+from app.core.cache import cache_delete, cache_get, cache_set
+from app.core.plans import normalize_plan
 from app.repositories.subscription_repository import SubscriptionRepository
 from app.services.payment_provider_service import check_active_subscription as provider_check, PaymentProviderError
 import logging
 
 logger = logging.getLogger(__name__)
 
+# TTL curto do resultado positivo de require_active_subscription (polling do dashboard)
+ACCESS_CACHE_TTL_SECONDS = 30
+
+# GET /subscription/status: muda só por webhook/validação/cancelamento, que invalidam o cache
+STATUS_CACHE_TTL_SECONDS = 60
+
+# GET /subscription/check-status (público, polling após o checkout): webhooks de ativação invalidam por email
+CHECK_STATUS_CACHE_TTL_SECONDS = 15
+
+# Janela em que a assinatura conta como "ativada recentemente"
+RECENT_ACTIVATION_SECONDS = 300
+
 
 class SubscriptionService:
     def __init__(self, repo: SubscriptionRepository):
         self.repo = repo
 
+    @staticmethod
+    def _access_cache_key(user_id: int) -> str:
+        return f"subscription:access:user:{user_id}"
+
+    @staticmethod
+    def has_cached_access(user_id: int) -> bool:
+        """True se uma verificação recente (TTL curto) já confirmou assinatura ativa."""
+        return bool(cache_get(SubscriptionService._access_cache_key(user_id)))
+
+    @staticmethod
+    def cache_access(user_id: int) -> None:
+        cache_set(SubscriptionService._access_cache_key(user_id), True, ttl=ACCESS_CACHE_TTL_SECONDS)
+
+    @staticmethod
+    def _status_cache_key(user_id: int) -> str:
+        return f"subscription:status:user:{user_id}"
+
+    @staticmethod
+    def _check_status_cache_key(email: str) -> str:
+        return f"subscription:check:email:{email}"
+
+    @staticmethod
+    def invalidate_access_cache(user_id: int, email: Optional[str] = None) -> None:
+        """
+        Invalida os caches de acesso e de status (chamado em toda alteração de assinatura).
+        Com email, invalida também o check-status (webhooks, para o polling ver a mudança na hora).
+        """
+        keys = [
+            SubscriptionService._access_cache_key(user_id),
+            SubscriptionService._status_cache_key(user_id),
+        ]
+        if email:
+            keys.append(SubscriptionService._check_status_cache_key(email.strip().lower()))
+        cache_delete(*keys)
+
     def set_active(
         self,
         user_id: int,
@@ -41,6 +91,8 @@ class SubscriptionService:
         plano_periodo: Optional[str] = None,
         assinatura_status: Optional[str] = None,
         assinatura_vence_em: Optional[datetime] = None,
+        # Email do usuário: invalida também o check-status (ativação e desativação)
+        email: Optional[str] = None,
     ):
         """Atualiza ou cria subscription com dados do provider (Cakto/Kiwify)."""
         # Guard anti-cancelamento-de-assinatura-antiga: webhooks chegam FORA DE ORDEM
@@ -64,8 +116,6 @@ class SubscriptionService:
             stripped_offer = cakto_offer_name.strip()
             normalized_offer_name = stripped_offer or None
         
-        from app.core.plans import normalize_plan
-
         normalized_plan = None
         if isinstance(plan, str):
             stripped_plan = plan.strip()
@@ -152,6 +202,7 @@ class SubscriptionService:
             assinatura_status=status_assinatura,
             assinatura_vence_em=vence,
         )
+        self.invalidate_access_cache(user_id, email)
         return subscription
 
     def needs_validation(self, user_id: int) -> bool:
@@ -207,6 +258,7 @@ class SubscriptionService:
 
             self.repo.db.commit()
             self.repo.db.refresh(subscription)
+            self.invalidate_access_cache(user_id)
 
             logger.info(f"Subscription validated for user {user_id}: active={has_access}")
             return has_access
@@ -216,11 +268,55 @@ class SubscriptionService:
             return False
 
     def get_subscription_status(self, user_id: int) -> Dict[str, Any]:
-        """Retorna status completo da assinatura do usuário."""
+        """Retorna status completo da assinatura do usuário (cache de STATUS_CACHE_TTL_SECONDS)."""
+        cache_key = self._status_cache_key(user_id)
+        cached = cache_get(cache_key)
+        if cached:
+            return cached
+        status_data = self._build_subscription_status(user_id)
+        cache_set(cache_key, status_data, ttl=STATUS_CACHE_TTL_SECONDS)
+        return status_data
+
+    def check_activation_status(self, email: str) -> Dict[str, Any]:
+        """
+        Resposta do check-status (ativada nos últimos 5 minutos?), cache de CHECK_STATUS_CACHE_TTL_SECONDS
+        por email normalizado. Endpoint público: emails sem usuário não são cacheados (uma chave por usuário real).
+        """
+        normalized = email.strip().lower()
+        cache_key = self._check_status_cache_key(normalized)
+        cached = cache_get(cache_key)
+        if cached:
+            return cached
+        # Usuário e assinatura numa consulta só (igualdade em lower(email), indexada;
+        # ilike trataria _ e % como curingas)
+        subscription = self.repo.get_status_by_email(normalized)
+        if subscription is None:
+            return {"subscription_activated": False, "message": "Usuário não encontrado"}
+        result = self._build_activation_status(subscription)
+        cache_set(cache_key, result, ttl=CHECK_STATUS_CACHE_TTL_SECONDS)
+        return result
+
+    @staticmethod
+    def _build_activation_status(subscription) -> Dict[str, Any]:
+        if subscription.subscription_id is None:
+            return {"subscription_activated": False, "message": "Assinatura não encontrada"}
+
+        recently_activated = False
+        if subscription.is_active and subscription.last_validation_at:
+            # Epoch em float: sem datetime/timedelta intermediários
+            recently_activated = time.time() - subscription.last_validation_at.timestamp() <= RECENT_ACTIVATION_SECONDS
+
+        return {
+            "subscription_activated": recently_activated,
+            "is_active": subscription.is_active,
+            "last_validation_at": subscription.last_validation_at.isoformat() if subscription.last_validation_at else None,
+            "next_payment_date": subscription.cakto_due_date.isoformat() if subscription.cakto_due_date else None,
+            "message": "Assinatura ativada recentemente" if recently_activated else "Assinatura não foi ativada recentemente"
+        }
+
+    def _build_subscription_status(self, user_id: int) -> Dict[str, Any]:
         subscription = self.repo.get_by_user_id(user_id)
         
-        from app.core.plans import normalize_plan
-
         if not subscription:
             return {
                 "has_subscription": False,
@@ -300,9 +396,9 @@ class SubscriptionService:
         subscription.plan = "essencial"
         subscription.assinatura_status = "cancelada"
         
-        # Fazer commit
+        # Fazer commit (sem refresh: o objeto não é usado depois)
         self.repo.db.commit()
-        self.repo.db.refresh(subscription)
+        self.invalidate_access_cache(user_id)
         
         logger.info(f"Assinatura cancelada para usuário {user_id}")
         return True
@@ -0,0 +1,262 @@
+"""
+Recebimento de uploads CSV (comissão e cliques) e despacho para processamento.
+
+O UploadFile é lido em blocos: até UPLOAD_INLINE_MAX_BYTES fica em memória (sem arquivo
+temporário); acima disso é gravado em disco. A task Celery recebe, conforme o tamanho e a
+infraestrutura:
+  - blob_key, para arquivos até UPLOAD_INLINE_MAX_BYTES (bytes gravados uma vez no Redis;
+    a mensagem leva só a chave). Sem Redis disponível, cai para base64 na própria mensagem;
+  - o mesmo caminho inline vale quando não há disco compartilhado nem storage;
+  - storage_key, quando o Object Storage (S3) está configurado;
+  - file_path, quando API e worker compartilham UPLOAD_TEMP_DIR.
+"""
+import base64
+import io
+import itertools
+import os
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Optional
+from uuid import uuid4
+
+import redis.exceptions
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from starlette.formparsers import MultiPartParser
+
+from app.core.cache import blob_set
+from app.core.config import settings
+from app.core.upload_limit import upload_too_large_detail
+from app.services.csv_service import CSVSource, is_csv_filename
+from app.services.storage import is_storage_configured, upload_file_obj
+
+# Blocos de 4 MB: menos leituras/escritas por upload; memória por requisição continua limitada.
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Tempo de vida do blob no Redis: cobre a fila e as 3 retentativas (60s) das tasks de CSV.
+UPLOAD_BLOB_TTL_SECONDS = 3600
+
+# Limite do SpooledTemporaryFile em que o Starlette guarda o upload multipart: acima disso já está em disco.
+UPLOAD_SPOOL_MAX_BYTES = MultiPartParser.spool_max_size
+
+NOT_CSV_DETAIL = "Apenas arquivos CSV são permitidos"
+
+_temp_counter = itertools.count()
+
+
+@lru_cache(maxsize=None)
+def _ensure_dir(directory: str) -> Path:
+    """Cria o diretório uma única vez por processo (e por valor configurado)."""
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _temp_dir() -> Path:
+    """UPLOAD_TEMP_DIR (compartilhado com o worker) ou o tmp local do processo, já existente."""
+    return _ensure_dir(settings.UPLOAD_TEMP_DIR or tempfile.gettempdir())
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=upload_too_large_detail(settings.MAX_UPLOAD_BYTES),
+    )
+
+
+def require_csv_filename(filename: Optional[str]) -> None:
+    """400 se o nome não for .csv/.csv.gz. Única checagem de extensão dos fluxos de upload."""
+    if not is_csv_filename(filename):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=NOT_CSV_DETAIL)
+
+
+def check_csv_upload(file: UploadFile) -> None:
+    """
+    Valida o upload antes de criar o dataset: extensão .csv/.csv.gz (sem diferenciar
+    maiúsculas) e tamanho até MAX_UPLOAD_BYTES (413).
+    """
+    require_csv_filename(file.filename)
+    if file.size is not None and file.size > settings.MAX_UPLOAD_BYTES:
+        raise _too_large()
+
+
+def remove_temp_file(path: Path) -> None:
+    try:
+        path.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def _temp_path(user_id: int) -> Path:
+    # O upload é gravado antes de o dataset existir (sem id ainda): uuid4 garante nome único
+    # entre processos e réplicas que compartilham UPLOAD_TEMP_DIR; user_id ajuda a rastrear.
+    return _temp_dir() / f"{user_id}_{uuid4().hex}.csv"
+
+
+def _source_fd(src: BinaryIO, read_bytes: int) -> Optional[int]:
+    """
+    Descritor do arquivo em disco por trás de `src`, ou None (em memória / sem sendfile).
+    O SpooledTemporaryFile do upload só vai para disco depois de UPLOAD_SPOOL_MAX_BYTES; antes
+    disso fileno() forçaria essa cópia, então só é chamado quando `read_bytes` garante o rollover.
+    """
+    if not hasattr(os, "sendfile"):
+        return None
+    if isinstance(src, tempfile.SpooledTemporaryFile) and read_bytes <= UPLOAD_SPOOL_MAX_BYTES:
+        return None
+    try:
+        return src.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+def _sendfile(in_fd: int, offset: int, out_fd: int, limit: int) -> int:
+    """Copia até `limit` bytes de in_fd (a partir de offset) para out_fd. Retorna quantos copiou."""
+    copied = 0
+    while copied < limit:
+        sent = os.sendfile(out_fd, in_fd, offset + copied, min(limit - copied, UPLOAD_CHUNK_SIZE * 16))
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+def _spool(src: BinaryIO, user_id: int) -> Optional[CSVSource]:
+    """
+    Lê `src` em blocos de UPLOAD_CHUNK_SIZE. Enquanto couber em UPLOAD_INLINE_MAX_BYTES acumula em
+    memória; ao passar disso grava o acumulado num arquivo temporário e segue escrevendo nele.
+    Retorna os bytes (arquivo pequeno), o Path (grande) ou None se exceder MAX_UPLOAD_BYTES
+    (o parcial é removido). Síncrona: roda inteira no threadpool, uma troca de thread por upload.
+    """
+    buf = bytearray()
+    path: Optional[Path] = None
+    f = None
+    written = 0
+    try:
+        while chunk := src.read(UPLOAD_CHUNK_SIZE):
+            written += len(chunk)
+            if written > settings.MAX_UPLOAD_BYTES:
+                break
+            if f is not None:
+                f.write(chunk)
+                continue
+            buf += chunk
+            if len(buf) > settings.UPLOAD_INLINE_MAX_BYTES:
+                path = _temp_path(user_id)
+                f = open(path, "wb")
+                f.write(buf)
+                buf = bytearray()
+                in_fd = _source_fd(src, written)
+                if in_fd is not None:
+                    # Upload já em disco (SpooledTemporaryFile rolado): o restante é copiado
+                    # pelo kernel (sendfile), sem passar pelos buffers do Python.
+                    f.flush()
+                    remaining = settings.MAX_UPLOAD_BYTES - written + 1
+                    written += _sendfile(in_fd, src.tell(), f.fileno(), remaining)
+                    break
+    finally:
+        if f is not None:
+            f.close()
+    if written > settings.MAX_UPLOAD_BYTES:
+        if path is not None:
+            remove_temp_file(path)
+        return None
+    return path if path is not None else bytes(buf)
+
+
+async def spool_upload(file: UploadFile, user_id: int) -> CSVSource:
+    """
+    Recebe o upload fora do event loop: bytes em memória até UPLOAD_INLINE_MAX_BYTES, senão o
+    caminho do arquivo temporário. Sem Content-Length confiável (ex.: chunked), o limite
+    MAX_UPLOAD_BYTES é checado durante a leitura. Chamado antes de criar o dataset: upload
+    rejeitado (413) ou interrompido não deixa registro órfão no banco.
+    """
+    await file.seek(0)
+    source = await run_in_threadpool(_spool, file.file, user_id)
+    if source is None:
+        raise _too_large()
+    return source
+
+
+def discard_upload(source: CSVSource) -> None:
+    """Remove o arquivo temporário, se o upload foi para disco (bytes não deixam resíduo)."""
+    if isinstance(source, Path):
+        remove_temp_file(source)
+
+
+def read_and_remove(path: Path) -> bytes:
+    """Lê o arquivo temporário de volta (envio legado em base64) e o remove."""
+    try:
+        return path.read_bytes()
+    finally:
+        remove_temp_file(path)
+
+
+def enqueue_csv_task(task, dataset_id: int, user_id: int, filename: str, source: CSVSource):
+    """
+    Enfileira `task` (process_csv_task / process_click_csv_task) para o upload recebido por
+    spool_upload: bytes vão pelo Redis (blob_key); um arquivo em disco vai por storage_key ou file_path.
+
+    Sem UPLOAD_TEMP_DIR o worker não enxerga o disco da API: arquivos grandes vão para o
+    storage se configurado; senão (legado) seguem em base64.
+    """
+    shared_disk = bool(settings.UPLOAD_TEMP_DIR)
+    storage = is_storage_configured()
+
+    if isinstance(source, bytes) or (not shared_disk and not storage):
+        content = source if isinstance(source, bytes) else read_and_remove(source)
+        blob_key = f"upload:blob:{dataset_id}:{next(_temp_counter):x}"
+        if blob_set(blob_key, content, UPLOAD_BLOB_TTL_SECONDS):
+            return task.delay(
+                dataset_id, user_id, filename,
+                file_path=None, file_content_b64=None, blob_key=blob_key,
+            )
+        file_content_b64 = base64.b64encode(content).decode("utf-8")
+        return task.delay(
+            dataset_id, user_id, filename,
+            file_path=None, file_content_b64=file_content_b64,
+        )
+
+    path = source
+    if storage:
+        # Arquivo grande: envia ao S3 lendo do disco em streaming (sem cópia em memória)
+        storage_key = f"uploads/temp/{path.name}"
+        try:
+            with open(path, "rb") as fh:
+                uploaded = upload_file_obj(settings.S3_BUCKET, storage_key, fh, content_type="text/csv")
+        finally:
+            remove_temp_file(path)
+        if not uploaded:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="Failed to upload file to storage.",
+            )
+        return task.delay(
+            dataset_id, user_id, filename,
+            file_path=None, file_content_b64=None, storage_key=storage_key,
+        )
+
+    return task.delay(
+        dataset_id, user_id, filename,
+        file_path=str(path), file_content_b64=None,
+    )
+
+
+@contextmanager
+def broker_errors_as_http():
+    """Converte falhas de autenticação/conexão com o Redis (broker) em 503."""
+    try:
+        yield
+    except redis.exceptions.AuthenticationError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Redis: autenticação inválida. Configure REDIS_PASSWORD no ambiente com a senha do Redis, ou use REDIS_URL no formato redis://:SENHA@host:6379/0.",
+        )
+    except RuntimeError as e:
+        if "reconnect" in str(e).lower() and "redis" in str(e).lower():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Redis: falha de conexão/autenticação. Verifique REDIS_URL e REDIS_PASSWORD no ambiente e reinicie a aplicação.",
+            )
+        raise
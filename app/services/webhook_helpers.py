@@ -6,7 +6,6 @@ Funções extraídas do cakto.py para reutilização.
 
 import logging
 import secrets
-import string
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional, Tuple
 
@@ -15,9 +14,13 @@ from sqlalchemy.orm import Session
 from app.models.user import User
 from app.repositories.user_repository import UserRepository
 from app.services.auth_service import AuthService
+from app.services.email_service import EmailService
 
 logger = logging.getLogger(__name__)
 
+# EmailService só guarda configuração SMTP lida de settings; uma instância basta.
+_email_service = EmailService()
+
 
 def find_or_create_user(
     email: str,
@@ -68,9 +71,7 @@ def send_subscription_email(
 ) -> None:
     """Envia email de ativação/reativação. Falhas são logadas sem re-raise."""
     try:
-        from app.services.email_service import EmailService
-
-        email_service = EmailService()
+        email_service = _email_service
         user_name = customer_name or user.name or "Usuário"
 
         if user_created:
@@ -82,7 +83,7 @@ def send_subscription_email(
             logger.info(f"Usuário sem senha: Enviando link de definição para {email}")
             token = user.password_set_token
             if not token:
-                token = "".join(secrets.choice(string.ascii_letters + string.digits) for _ in range(32))
+                token = secrets.token_urlsafe(24)
                 user.password_set_token = token
                 user.password_set_token_expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
                 db.commit()
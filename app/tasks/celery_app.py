@@ -25,8 +25,13 @@ celery_app.conf.update(
     # usa priority=0 (máxima) e fura a fila na frente dos full-refresh pesados da Shopee
     # (cron, priority=9). Sem isso o botão fica minutos atrás do batch da Shopee.
     # priority menor = mais prioritário. Steps padrão do Redis: [0,3,6,9].
-    broker_transport_options={"queue_order_strategy": "priority"},
+    # socket_keepalive: a conexão do producer na API fica viva entre uploads (sem reconexão por envio).
+    broker_transport_options={"queue_order_strategy": "priority", "socket_keepalive": True},
     task_default_priority=5,
+    # Ingestão de CSV em fila própria ("csv"): permite um worker dedicado (CELERY_QUEUES=csv)
+    # para uploads não ficarem atrás dos syncs longos de Shopee/Facebook na fila padrão.
+    # O worker padrão consome "celery,csv" (ver Dockerfile.worker).
+    task_routes={"app.tasks.csv_tasks.*": {"queue": "csv"}},
 )
 
 # Explicitly include task modules so the worker always registers them (avoids "unregistered task" in production).
@@ -11,20 +11,25 @@ from app.repositories.click_row_repository import ClickRowRepository
 from app.db.session import SessionLocal
 from app.services.dataset_service import DatasetService
 from app.services.click_service import ClickService
+from app.services.csv_service import CSVSource
+from app.core.cache import blob_get, cache_delete
 from app.core.config import settings
 from app.services.storage import download_file, delete_object
 
 logger = logging.getLogger(__name__)
 
 
-def _get_file_content(
+def _get_csv_source(
     file_path: Optional[str] = None,
     file_content_b64: Optional[str] = None,
     storage_key: Optional[str] = None,
-) -> bytes:
+    blob_key: Optional[str] = None,
+) -> CSVSource:
     """
-    Obtém bytes do CSV a partir de: storage (S3), caminho em disco ou base64.
-    Preferência: storage_key (worker não precisa de disco compartilhado), file_path, file_content_b64.
+    Obtém o CSV a partir de: storage (S3), caminho em disco, blob no Redis ou base64.
+    Preferência: storage_key (worker não precisa de disco compartilhado), file_path, blob_key, file_content_b64.
+    file_path é devolvido como Path (o pandas lê direto do disco); a task remove o arquivo ao final.
+    O blob só é removido após o sucesso (retentativas relêem a mesma chave; o TTL cobre o resto).
     """
     if storage_key:
         bucket = settings.S3_BUCKET
@@ -41,19 +46,28 @@ def _get_file_content(
     if file_path:
         path = Path(file_path)
         if path.exists():
-            content = path.read_bytes()
-            try:
-                path.unlink()
-            except OSError as e:
-                logger.warning(f"Could not remove temp file {file_path}: {e}")
-            return content
+            return path
         raise FileNotFoundError(f"Upload temp file not found: {file_path}")
+    if blob_key:
+        content = blob_get(blob_key)
+        if content is None:
+            raise FileNotFoundError(f"Upload blob not found in Redis (expired?): {blob_key}")
+        return content
     if file_content_b64:
         return base64.b64decode(file_content_b64)
-    raise ValueError("One of file_path, file_content_b64 or storage_key must be provided")
+    raise ValueError("One of file_path, file_content_b64, storage_key or blob_key must be provided")
+
+
+def _remove_temp_file(file_path: Optional[str]) -> None:
+    if file_path and os.path.exists(file_path):
+        try:
+            os.remove(file_path)
+        except OSError as e:
+            logger.warning(f"Could not remove temp file {file_path}: {e}")
 
 
-@celery_app.task(bind=True, max_retries=3, soft_time_limit=3600, time_limit=3700)
+# ignore_result: o status fica em Dataset/Job; sem gravar/assinar o resultado no Redis a cada upload
+@celery_app.task(bind=True, ignore_result=True, max_retries=3, soft_time_limit=3600, time_limit=3700)
 def process_csv_task(
     self,
     dataset_id: int,
@@ -62,19 +76,25 @@ def process_csv_task(
     file_path: Optional[str] = None,
     file_content_b64: Optional[str] = None,
     storage_key: Optional[str] = None,
+    blob_key: Optional[str] = None,
 ):
     """
     Processa CSV de comissão/vendas (groupby, dedup, bulk_create).
-    Suporta: storage_key (download S3), file_path (disco compartilhado) ou file_content_b64.
+    Suporta: storage_key (download S3), file_path (disco compartilhado), blob_key (Redis) ou file_content_b64.
     """
     db = SessionLocal()
     try:
-        file_content = _get_file_content(file_path=file_path, file_content_b64=file_content_b64, storage_key=storage_key)
+        source = _get_csv_source(
+            file_path=file_path, file_content_b64=file_content_b64, storage_key=storage_key, blob_key=blob_key
+        )
         logger.info(f"Starting commission processing for dataset {dataset_id} (user {user_id})")
         dataset_repo = DatasetRepository(db)
         row_repo = DatasetRowRepository(db)
         service = DatasetService(dataset_repo, row_repo)
-        service.process_commission_csv(dataset_id, user_id, file_content, filename)
+        service.process_commission_csv(dataset_id, user_id, source, filename)
+        _remove_temp_file(file_path)
+        if blob_key:
+            cache_delete(blob_key)
         logger.info(f"Commission processing completed for dataset {dataset_id}")
         return {"status": "completed"}
     except Exception as exc:
@@ -88,17 +108,13 @@ def process_csv_task(
                 db.commit()
         except Exception:
             pass
-        if file_path and os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except OSError:
-                pass
+        _remove_temp_file(file_path)
         raise self.retry(exc=exc, countdown=60)
     finally:
         db.close()
 
 
-@celery_app.task(bind=True, max_retries=3, soft_time_limit=3600, time_limit=3700)
+@celery_app.task(bind=True, ignore_result=True, max_retries=3, soft_time_limit=3600, time_limit=3700)
 def process_click_csv_task(
     self,
     dataset_id: int,
@@ -107,19 +123,25 @@ def process_click_csv_task(
     file_path: Optional[str] = None,
     file_content_b64: Optional[str] = None,
     storage_key: Optional[str] = None,
+    blob_key: Optional[str] = None,
 ):
     """
     Processa CSV de cliques (groupby, dedup, bulk_create).
-    Suporta: storage_key (download S3), file_path (disco compartilhado) ou file_content_b64.
+    Suporta: storage_key (download S3), file_path (disco compartilhado), blob_key (Redis) ou file_content_b64.
     """
     db = SessionLocal()
     try:
-        file_content = _get_file_content(file_path=file_path, file_content_b64=file_content_b64, storage_key=storage_key)
+        source = _get_csv_source(
+            file_path=file_path, file_content_b64=file_content_b64, storage_key=storage_key, blob_key=blob_key
+        )
         logger.info(f"Starting click processing for dataset {dataset_id} (user {user_id})")
         dataset_repo = DatasetRepository(db)
         click_repo = ClickRowRepository(db)
         service = ClickService(dataset_repo, click_repo)
-        service.process_click_csv(dataset_id, user_id, file_content, filename)
+        service.process_click_csv(dataset_id, user_id, source, filename)
+        _remove_temp_file(file_path)
+        if blob_key:
+            cache_delete(blob_key)
         logger.info(f"Click processing completed for dataset {dataset_id}")
         return {"status": "completed"}
     except Exception as exc:
@@ -133,11 +155,7 @@ def process_click_csv_task(
                 db.commit()
         except Exception:
             pass
-        if file_path and os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except OSError:
-                pass
+        _remove_temp_file(file_path)
         raise self.retry(exc=exc, countdown=60)
     finally:
         db.close()
@@ -53,12 +53,14 @@ def sync_all_facebook_users_task():
         repo = FacebookIntegrationRepository(db)
         integrations = repo.get_all_active()
         dispatched = 0
-        for integ in integrations:
-            user = db.query(User).filter(User.id == integ.user_id).first()
-            if user and getattr(user, "is_demo", False):
-                continue
-            sync_facebook_user_task.apply_async(args=[integ.user_id], priority=6)
-            dispatched += 1
+        # Um único producer (conexão do pool do broker) para todo o fan-out
+        with celery_app.producer_or_acquire() as producer:
+            for integ in integrations:
+                user = db.query(User).filter(User.id == integ.user_id).first()
+                if user and getattr(user, "is_demo", False):
+                    continue
+                sync_facebook_user_task.apply_async(args=[integ.user_id], priority=6, producer=producer)
+                dispatched += 1
         logger.info("sync_all_facebook_users_task: %d tarefas agendadas", dispatched)
         return {"dispatched": dispatched}
     finally:
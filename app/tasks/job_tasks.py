@@ -16,7 +16,8 @@ logger = logging.getLogger(__name__)
 CHUNK_LINES = 20_000
 
 
-@celery_app.task(bind=True, max_retries=2, soft_time_limit=3600, time_limit=3700)
+# ignore_result: o status fica em Dataset/Job; sem gravar/assinar o resultado no Redis a cada upload
+@celery_app.task(bind=True, ignore_result=True, max_retries=2, soft_time_limit=3600, time_limit=3700)
 def process_job_from_storage(self, job_id: str):
     """
     Download CSV from storage once, process in batches in memory (Polars or pandas),
@@ -25,8 +26,10 @@ def process_job_from_storage(self, job_id: str):
     from app.db.session import SessionLocal
     from app.repositories.job_repository import JobRepository
     from app.repositories.dataset_repository import DatasetRepository
+    from app.services.dashboard_service import DashboardService
     from app.models.dataset_row import DatasetRow
     from app.models.click_row import ClickRow
+    from app.services.csv_service import CSVValidationError, gunzip_if_needed
     from app.services.storage import download_file, is_storage_configured
     from app.core.config import settings
     from sqlalchemy import func
@@ -50,6 +53,14 @@ def process_job_from_storage(self, job_id: str):
             job.status = "error"
             db.commit()
             return
+        # Upload .csv.gz: o leitor em lotes (Polars/pandas) recebe o CSV já descomprimido (com limite de tamanho)
+        try:
+            content = gunzip_if_needed(content)
+        except CSVValidationError as e:
+            logger.error(f"process_job_from_storage: rejected {job.storage_key}: {e}")
+            job.status = "error"
+            db.commit()
+            return
 
         use_polars = False
         try:
@@ -122,6 +133,8 @@ def process_job_from_storage(self, job_id: str):
         
         job.status = "completed"
         db.commit()
+        if job.type == "transaction":
+            DashboardService.invalidate_user_cache(job.user_id)
 
         duration_s = round(time.monotonic() - t0, 2)
         logger.info(
@@ -143,7 +156,7 @@ def process_job_from_storage(self, job_id: str):
         db.close()
 
 
-@celery_app.task(bind=True, max_retries=2, soft_time_limit=600, time_limit=660)
+@celery_app.task(bind=True, ignore_result=True, max_retries=2, soft_time_limit=600, time_limit=660)
 def split_and_enqueue_chunks(self, job_id: str):
     """
     Legacy: split file into chunks, upload each to S3, enqueue process_chunk per chunk.
@@ -152,6 +165,7 @@ def split_and_enqueue_chunks(self, job_id: str):
     from app.db.session import SessionLocal
     from app.repositories.job_repository import JobRepository
     from app.models.job import JobChunk
+    from app.services.csv_service import CSVValidationError, gunzip_if_needed
     from app.services.storage import download_file, upload_file_obj, is_storage_configured
     from app.core.config import settings
 
@@ -175,6 +189,13 @@ def split_and_enqueue_chunks(self, job_id: str):
             job.status = "error"
             db.commit()
             return
+        try:
+            content = gunzip_if_needed(content)
+        except CSVValidationError as e:
+            logger.error(f"split_and_enqueue_chunks: rejected {job.storage_key}: {e}")
+            job.status = "error"
+            db.commit()
+            return
 
         use_polars = False
         try:
@@ -183,43 +204,45 @@ def split_and_enqueue_chunks(self, job_id: str):
         except ImportError:
             pass
 
-        chunk_index = 0
-        if use_polars:
-            try:
-                reader = pl.read_csv_batched(BytesIO(content), batch_size=CHUNK_LINES)
-                while True:
-                    batches = reader.next_batches(1)
-                    if not batches:
-                        break
-                    for batch_df in batches:
-                        if batch_df.height == 0:
-                            continue
-                        chunk_bytes = batch_df.write_csv().encode("utf-8")
-                        chunk_key = f"jobs/{job_id}/chunks/{chunk_index}.csv"
-                        if not upload_file_obj(bucket, chunk_key, BytesIO(chunk_bytes), content_type="text/csv"):
-                            logger.error(f"Failed to upload chunk {chunk_index}")
+        # Um único producer (conexão do pool do broker) para todos os chunks
+        with celery_app.producer_or_acquire() as producer:
+            chunk_index = 0
+            if use_polars:
+                try:
+                    reader = pl.read_csv_batched(BytesIO(content), batch_size=CHUNK_LINES)
+                    while True:
+                        batches = reader.next_batches(1)
+                        if not batches:
                             break
-                        jc = JobChunk(job_id=uid, chunk_index=chunk_index, storage_key=chunk_key, status="queued")
-                        job_repo.add_chunk(jc)
-                        process_chunk.delay(job_id, chunk_index, chunk_key)
-                        chunk_index += 1
-            except Exception as e:
-                logger.warning(f"Polars batched read failed: {e}, using pandas")
-                use_polars = False
-
-        if not use_polars:
-            import pandas as pd
-            for chunk_df in pd.read_csv(BytesIO(content), chunksize=CHUNK_LINES, encoding="utf-8", on_bad_lines="skip"):
-                if chunk_df.empty:
-                    continue
-                chunk_bytes = chunk_df.to_csv(index=False).encode("utf-8")
-                chunk_key = f"jobs/{job_id}/chunks/{chunk_index}.csv"
-                if not upload_file_obj(bucket, chunk_key, BytesIO(chunk_bytes), content_type="text/csv"):
-                    break
-                jc = JobChunk(job_id=uid, chunk_index=chunk_index, storage_key=chunk_key, status="queued")
-                job_repo.add_chunk(jc)
-                process_chunk.delay(job_id, chunk_index, chunk_key)
-                chunk_index += 1
+                        for batch_df in batches:
+                            if batch_df.height == 0:
+                                continue
+                            chunk_bytes = batch_df.write_csv().encode("utf-8")
+                            chunk_key = f"jobs/{job_id}/chunks/{chunk_index}.csv"
+                            if not upload_file_obj(bucket, chunk_key, BytesIO(chunk_bytes), content_type="text/csv"):
+                                logger.error(f"Failed to upload chunk {chunk_index}")
+                                break
+                            jc = JobChunk(job_id=uid, chunk_index=chunk_index, storage_key=chunk_key, status="queued")
+                            job_repo.add_chunk(jc)
+                            process_chunk.apply_async((job_id, chunk_index, chunk_key), producer=producer)
+                            chunk_index += 1
+                except Exception as e:
+                    logger.warning(f"Polars batched read failed: {e}, using pandas")
+                    use_polars = False
+
+            if not use_polars:
+                import pandas as pd
+                for chunk_df in pd.read_csv(BytesIO(content), chunksize=CHUNK_LINES, encoding="utf-8", on_bad_lines="skip"):
+                    if chunk_df.empty:
+                        continue
+                    chunk_bytes = chunk_df.to_csv(index=False).encode("utf-8")
+                    chunk_key = f"jobs/{job_id}/chunks/{chunk_index}.csv"
+                    if not upload_file_obj(bucket, chunk_key, BytesIO(chunk_bytes), content_type="text/csv"):
+                        break
+                    jc = JobChunk(job_id=uid, chunk_index=chunk_index, storage_key=chunk_key, status="queued")
+                    job_repo.add_chunk(jc)
+                    process_chunk.apply_async((job_id, chunk_index, chunk_key), producer=producer)
+                    chunk_index += 1
 
         job.total_chunks = chunk_index
         job.status = "processing"
@@ -250,7 +273,7 @@ def split_and_enqueue_chunks(self, job_id: str):
         db.close()
 
 
-@celery_app.task(bind=True, acks_late=True, max_retries=3, soft_time_limit=1100, time_limit=1200)
+@celery_app.task(bind=True, ignore_result=True, acks_late=True, max_retries=3, soft_time_limit=1100, time_limit=1200)
 def process_chunk(self, job_id: str, chunk_index: int, storage_key: str):
     """
     Download chunk from storage, validate and aggregate (Polars first, pandas fallback),
@@ -259,6 +282,7 @@ def process_chunk(self, job_id: str, chunk_index: int, storage_key: str):
     from app.db.session import SessionLocal
     from app.repositories.job_repository import JobRepository
     from app.repositories.dataset_repository import DatasetRepository
+    from app.services.dashboard_service import DashboardService
     from app.models.dataset_row import DatasetRow
     from app.models.click_row import ClickRow
     from app.services.storage import download_file
@@ -346,6 +370,8 @@ def process_chunk(self, job_id: str, chunk_index: int, storage_key: str):
                 job.status = "completed"
                 
                 db.commit()
+                if job.type == "transaction":
+                    DashboardService.invalidate_user_cache(job.user_id)
     except Exception as exc:
         from sqlalchemy.exc import IntegrityError
 
@@ -104,22 +104,25 @@ def sync_all_shopee_users_task(days_back: int = 7):
         cutoff = datetime.now(timezone.utc) - timedelta(minutes=SKIP_RECENT_SYNC_MINUTES)
         dispatched = 0
         skipped_recent = 0
-        for integ in integrations:
-            user = db.query(User).filter(User.id == integ.user_id).first()
-            if user and getattr(user, "is_demo", False):
-                continue
-            last = integ.last_sync_at
-            if last is not None:
-                if last.tzinfo is None:
-                    last = last.replace(tzinfo=timezone.utc)
-                if last >= cutoff:
-                    skipped_recent += 1
+        # Um único producer (conexão do pool do broker) para todo o fan-out
+        with celery_app.producer_or_acquire() as producer:
+            for integ in integrations:
+                user = db.query(User).filter(User.id == integ.user_id).first()
+                if user and getattr(user, "is_demo", False):
                     continue
-            sync_shopee_user_task.apply_async(
-                kwargs={"user_id": integ.user_id, "days_back": days_back, "empty_attempt": 0},
-                priority=9,
-            )
-            dispatched += 1
+                last = integ.last_sync_at
+                if last is not None:
+                    if last.tzinfo is None:
+                        last = last.replace(tzinfo=timezone.utc)
+                    if last >= cutoff:
+                        skipped_recent += 1
+                        continue
+                sync_shopee_user_task.apply_async(
+                    kwargs={"user_id": integ.user_id, "days_back": days_back, "empty_attempt": 0},
+                    priority=9,
+                    producer=producer,
+                )
+                dispatched += 1
         logger.info(
             "sync_all_shopee_users_task: %d tarefas agendadas (days_back=%d skipped_recent=%d)",
             dispatched, days_back, skipped_recent,
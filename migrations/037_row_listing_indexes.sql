@@ -0,0 +1,17 @@
+-- 037_row_listing_indexes.sql
+-- Índices compostos para a listagem paginada de linhas e cliques
+-- (/datasets/latest/rows, /datasets/all/rows, /clicks/latest/rows, /clicks/all/rows):
+--   WHERE user_id = ? [AND date >= ? AND date <= ?] ORDER BY date DESC, id DESC LIMIT ? OFFSET ?
+-- Com (user_id, date, id) o Postgres percorre o índice já na ordem pedida e para no LIMIT,
+-- sem ordenar todas as linhas do usuário.
+--
+-- CONCURRENTLY: não bloqueia escrita (rodar fora de transação).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dataset_rows_user_date_id
+    ON dataset_rows_v2 (user_id, date, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_click_user_date_id
+    ON click_rows_v2 (user_id, date, id);
+
+ANALYZE dataset_rows_v2;
+ANALYZE click_rows_v2;
@@ -0,0 +1,17 @@
+-- 038_dataset_rows_by_dataset_index.sql
+-- Índice composto para as listagens de um dataset específico
+-- (/datasets/latest/rows, /datasets/{id}/rows e /datasets/latest/rows.ndjson):
+--   WHERE user_id = ? AND dataset_id = ? [AND date BETWEEN ? AND ?] ORDER BY date DESC, id DESC
+-- idx_dataset_rows_user_date_id (037) não tem dataset_id: com vários uploads o Postgres lê as
+-- linhas de todos os datasets do usuário e descarta as dos outros. Com (user_id, dataset_id,
+-- date, id) a leitura já sai ordenada e restrita ao dataset, parando no LIMIT.
+--
+-- jobs (idx_jobs_user_created) e datasets (idx_dataset_user_uploaded) já têm (user_id, data),
+-- percorridos de trás para frente para o ORDER BY ... DESC: nada a acrescentar.
+--
+-- CONCURRENTLY: não bloqueia escrita (rodar fora de transação).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dataset_rows_user_dataset_date_id
+    ON dataset_rows_v2 (user_id, dataset_id, date, id);
+
+ANALYZE dataset_rows_v2;
@@ -0,0 +1,13 @@
+-- 039_users_email_lower_index.sql
+-- Índice funcional para buscas de email sem diferenciar maiúsculas:
+--   UserRepository.get_by_email / get_id_by_email (login, cadastro, webhooks, /subscription/check-status)
+--   WHERE lower(email) = ?
+-- O índice único em users.email não serve para lower(email): sem este índice cada busca
+-- percorre a tabela inteira.
+--
+-- CONCURRENTLY: não bloqueia escrita (rodar fora de transação).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_email_lower
+    ON users (lower(email));
+
+ANALYZE users;
@@ -0,0 +1,17 @@
+-- 040_ad_spend_covering_index.sql
+-- Índice de cobertura para a listagem de gastos com anúncios (GET /ad_spends):
+--   SELECT id, date, amount, sub_id, clicks FROM ad_spends
+--   WHERE user_id = ? [AND date >= ? AND date <= ?] ORDER BY date DESC, id DESC
+-- Com INCLUDE (amount, sub_id, clicks) a consulta é respondida por index-only scan,
+-- sem ler a tabela (heap) para cada linha. Substitui idx_ad_spend_user_date_id
+-- (mesmas colunas-chave), que é removido para não manter dois índices a cada escrita.
+--
+-- CONCURRENTLY: não bloqueia escrita (rodar fora de transação).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ad_spend_user_date_id_cov
+    ON ad_spends (user_id, date, id) INCLUDE (amount, sub_id, clicks);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_ad_spend_user_date_id;
+
+-- VACUUM atualiza o visibility map, necessário para o index-only scan evitar o heap
+VACUUM (ANALYZE) ad_spends;
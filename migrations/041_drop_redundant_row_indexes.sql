@@ -0,0 +1,32 @@
+-- 041_drop_redundant_row_indexes.sql
+-- Remove índices redundantes das tabelas de ingestão (cada índice é mantido a cada INSERT do CSV):
+--   * índice simples em id: a PRIMARY KEY já é um índice;
+--   * índice simples em user_id e (user_id, date): servidos pelo prefixo à esquerda de
+--     (user_id, date, id) — idx_dataset_rows_user_date_id / idx_click_user_date_id (037)
+--     e idx_ad_spend_user_date_id_cov (040);
+--   * *_v2_report: mesmas colunas de idx_dataset_rows_user_report / idx_click_user_report.
+-- Os nomes variam entre ambientes (create_all, scripts antigos): todos com IF EXISTS.
+-- Mantidos: índices em dataset_id (DELETE em cascata de datasets) e em date (consultas sem user_id).
+--
+-- Rodar depois de 037 e 040. CONCURRENTLY: não bloqueia escrita (rodar fora de transação).
+
+-- ad_spends
+DROP INDEX CONCURRENTLY IF EXISTS ix_ad_spends_id;
+DROP INDEX CONCURRENTLY IF EXISTS ix_ad_spends_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_ad_spends_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_ad_spend_user_date;
+DROP INDEX CONCURRENTLY IF EXISTS idx_ad_spends_user_date;
+
+-- dataset_rows_v2
+DROP INDEX CONCURRENTLY IF EXISTS ix_dataset_rows_v2_id;
+DROP INDEX CONCURRENTLY IF EXISTS ix_dataset_rows_v2_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_dataset_rows_v2_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_dataset_rows_v2_user_date;
+DROP INDEX CONCURRENTLY IF EXISTS idx_dataset_rows_v2_report;
+
+-- click_rows_v2
+DROP INDEX CONCURRENTLY IF EXISTS ix_click_rows_v2_id;
+DROP INDEX CONCURRENTLY IF EXISTS ix_click_rows_v2_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_click_rows_v2_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_click_rows_v2_user_date;
+DROP INDEX CONCURRENTLY IF EXISTS idx_click_rows_v2_report;
@@ -0,0 +1,12 @@
+-- 042_drop_duplicate_row_hash_indexes.sql
+-- row_hash é UNIQUE em click_rows_v2 e dataset_rows_v2: a constraint já cria o B-tree
+-- (*_row_hash_key) usado pelo upsert ON CONFLICT (row_hash) do bulk_create.
+-- Os scripts de schema (consolidated_hml_schema / ensure_hml_schema) criavam além disso um
+-- índice comum nas mesmas colunas, mantido a cada linha inserida na ingestão de CSV sem
+-- servir nenhuma consulta. Removido aqui; a constraint UNIQUE permanece.
+--
+-- Em bancos criados pelo create_all existe só ix_*_row_hash (UNIQUE): não é afetado.
+-- CONCURRENTLY: não bloqueia escrita (rodar fora de transação).
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_click_rows_v2_row_hash;
+DROP INDEX CONCURRENTLY IF EXISTS idx_dataset_rows_v2_row_hash;
@@ -63,13 +63,12 @@ CREATE TABLE IF NOT EXISTS dataset_rows_v2 (
 );
 
 CREATE INDEX IF NOT EXISTS idx_dataset_rows_v2_dataset_id ON dataset_rows_v2(dataset_id);
-CREATE INDEX IF NOT EXISTS idx_dataset_rows_v2_user_id ON dataset_rows_v2(user_id);
 CREATE INDEX IF NOT EXISTS idx_dataset_rows_v2_date ON dataset_rows_v2(date);
 CREATE INDEX IF NOT EXISTS idx_dataset_rows_v2_platform ON dataset_rows_v2(platform);
-CREATE INDEX IF NOT EXISTS idx_dataset_rows_v2_row_hash ON dataset_rows_v2(row_hash);
 CREATE INDEX IF NOT EXISTS idx_dataset_rows_user_report ON dataset_rows_v2(user_id, date, platform, product);
 CREATE INDEX IF NOT EXISTS idx_dataset_rows_user_category ON dataset_rows_v2(user_id, category);
 CREATE INDEX IF NOT EXISTS idx_dataset_rows_user_sub_id ON dataset_rows_v2(user_id, sub_id1);
+CREATE INDEX IF NOT EXISTS idx_dataset_rows_user_date_id ON dataset_rows_v2(user_id, date, id);
 
 -- 5. Tabela: click_rows_v2
 CREATE TABLE IF NOT EXISTS click_rows_v2 (
@@ -85,11 +84,10 @@ CREATE TABLE IF NOT EXISTS click_rows_v2 (
 );
 
 CREATE INDEX IF NOT EXISTS idx_click_rows_v2_dataset_id ON click_rows_v2(dataset_id);
-CREATE INDEX IF NOT EXISTS idx_click_rows_v2_user_id ON click_rows_v2(user_id);
 CREATE INDEX IF NOT EXISTS idx_click_rows_v2_date ON click_rows_v2(date);
 CREATE INDEX IF NOT EXISTS idx_click_rows_v2_channel ON click_rows_v2(channel);
-CREATE INDEX IF NOT EXISTS idx_click_rows_v2_row_hash ON click_rows_v2(row_hash);
 CREATE INDEX IF NOT EXISTS idx_click_user_report ON click_rows_v2(user_id, date, channel);
+CREATE INDEX IF NOT EXISTS idx_click_user_date_id ON click_rows_v2(user_id, date, id);
 
 -- 6. Tabela: subscriptions
 CREATE TABLE IF NOT EXISTS subscriptions (
@@ -125,12 +123,10 @@ CREATE TABLE IF NOT EXISTS ad_spends (
     clicks INTEGER DEFAULT 0
 );
 
-CREATE INDEX IF NOT EXISTS idx_ad_spends_user_id ON ad_spends(user_id);
 CREATE INDEX IF NOT EXISTS idx_ad_spends_date ON ad_spends(date);
 CREATE INDEX IF NOT EXISTS idx_ad_spends_sub_id ON ad_spends(sub_id);
-CREATE INDEX IF NOT EXISTS idx_ad_spend_user_date ON ad_spends(user_id, date);
 CREATE INDEX IF NOT EXISTS idx_ad_spend_user_sub_date ON ad_spends(user_id, sub_id, date);
-CREATE INDEX IF NOT EXISTS idx_ad_spend_user_date_id ON ad_spends(user_id, date, id);
+CREATE INDEX IF NOT EXISTS idx_ad_spend_user_date_id_cov ON ad_spends(user_id, date, id) INCLUDE (amount, sub_id, clicks);
 
 -- 8. Tabela: jobs e job_chunks
 CREATE TABLE IF NOT EXISTS jobs (
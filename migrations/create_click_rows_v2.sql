@@ -15,5 +15,5 @@ CREATE TABLE click_rows_v2 (
 );
 
 -- Índices para performance
-CREATE INDEX idx_click_rows_v2_user_date ON click_rows_v2(user_id, date);
-CREATE INDEX idx_click_rows_v2_report ON click_rows_v2(user_id, date, channel);
+CREATE INDEX idx_click_user_report ON click_rows_v2(user_id, date, channel);
+CREATE INDEX idx_click_user_date_id ON click_rows_v2(user_id, date, id);
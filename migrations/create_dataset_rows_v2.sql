@@ -29,5 +29,5 @@ CREATE TABLE dataset_rows_v2 (
 );
 
 -- Índices para performance
-CREATE INDEX idx_dataset_rows_v2_user_date ON dataset_rows_v2(user_id, date);
-CREATE INDEX idx_dataset_rows_v2_report ON dataset_rows_v2(user_id, date, platform, product);
+CREATE INDEX idx_dataset_rows_user_report ON dataset_rows_v2(user_id, date, platform, product);
+CREATE INDEX idx_dataset_rows_user_date_id ON dataset_rows_v2(user_id, date, id);
@@ -73,7 +73,6 @@ CREATE TABLE IF NOT EXISTS click_rows_v2 (
 );
 
 CREATE INDEX IF NOT EXISTS idx_click_rows_v2_dataset_id ON click_rows_v2(dataset_id);
-CREATE INDEX IF NOT EXISTS idx_click_rows_v2_user_id ON click_rows_v2(user_id);
 CREATE INDEX IF NOT EXISTS idx_click_rows_v2_date ON click_rows_v2(date);
-CREATE INDEX IF NOT EXISTS idx_click_rows_v2_row_hash ON click_rows_v2(row_hash);
 CREATE INDEX IF NOT EXISTS idx_click_user_report ON click_rows_v2(user_id, date, channel);
+CREATE INDEX IF NOT EXISTS idx_click_user_date_id ON click_rows_v2(user_id, date, id);
@@ -60,23 +60,15 @@ class TestDebugQueriesRemoved:
         """
         # Mock database session
         mock_db = Mock(spec=Session)
-        mock_query = MagicMock()
-        mock_db.query.return_value = mock_query
+        mock_db.execute.return_value.all.return_value = []
         
-        # Setup query chain
-        mock_query.options.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-        mock_query.order_by.return_value = mock_query
-        mock_query.limit.return_value = mock_query
-        mock_query.offset.return_value = mock_query
-        mock_query.all.return_value = []
-        
-        # Create repository and call method
+        # Create repository and call method (select() de colunas via db.execute)
         repo = AdSpendRepository(mock_db)
         result = repo.list_by_user(user_id=1, limit=10)
         
         # Verify only 1 query was made
-        assert mock_db.query.call_count == 1, f"Expected 1 query, got {mock_db.query.call_count}"
+        assert mock_db.execute.call_count == 1, f"Expected 1 query, got {mock_db.execute.call_count}"
+        mock_db.query.assert_not_called()
         
         print("✅ PASS: ad_spend_repository makes only 1 query (debug queries removed)")
 
@@ -0,0 +1,100 @@
+"""
+Unit tests for batched upserts in row repositories.
+Run: pytest tests/unit/test_bulk_upsert.py -v
+"""
+import datetime
+from unittest.mock import Mock
+
+from sqlalchemy.dialects import postgresql
+
+from app.models.click_row import ClickRow
+from app.models.dataset_row import DatasetRow
+from app.repositories.ad_spend_repository import AdSpendRepository
+from app.repositories.click_row_repository import ClickRowRepository
+from app.repositories.dataset_row_repository import DatasetRowRepository
+
+
+def _dataset_row(row_hash):
+    return DatasetRow(
+        dataset_id=1, user_id=7, date=datetime.date(2026, 1, 2), product="P", revenue=1.0,
+        commission=0.1, cost=0.0, profit=0.9, quantity=1, row_hash=row_hash,
+    )
+
+
+def test_dataset_rows_upsert_is_executemany():
+    db = Mock()
+    DatasetRowRepository(db).bulk_create([_dataset_row("a"), _dataset_row("b")], commit=False)
+
+    stmt, params = db.execute.call_args.args
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (row_hash) DO UPDATE" in sql
+    assert [p["row_hash"] for p in params] == ["a", "b"]
+    db.commit.assert_not_called()
+
+
+def test_click_rows_upsert_is_executemany():
+    db = Mock()
+    rows = [
+        ClickRow(dataset_id=1, user_id=7, date=datetime.date(2026, 1, 2), channel="ig", clicks=3, row_hash=h)
+        for h in ("a", "b", "c")
+    ]
+    ClickRowRepository(db).bulk_create(rows)
+
+    stmt, params = db.execute.call_args.args
+    assert "ON CONFLICT (row_hash) DO UPDATE" in str(stmt.compile(dialect=postgresql.dialect()))
+    assert len(params) == 3
+    db.commit.assert_called_once()
+
+
+def test_ad_spend_bulk_create_is_one_insert_returning():
+    from types import SimpleNamespace
+
+    from app.services.ad_spend_service import AdSpendService
+
+    db = Mock()
+    db.execute.return_value.all.return_value = [
+        SimpleNamespace(id=1, date=datetime.date(2026, 1, 2), amount=float("nan"), sub_id=None, clicks=None),
+    ]
+    items = [SimpleNamespace(date=datetime.date(2026, 1, 2), sub_id="__all__", amount=10.0, clicks=None)]
+    created = AdSpendService(AdSpendRepository(db)).bulk_create(7, items)
+
+    stmt, params = db.execute.call_args.args
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("INSERT INTO ad_spends") and "RETURNING ad_spends.id" in sql
+    assert params == [{"user_id": 7, "date": datetime.date(2026, 1, 2), "sub_id": None, "amount": 10.0, "clicks": 0}]
+    assert created == [{"id": 1, "date": datetime.date(2026, 1, 2), "amount": 0.0, "sub_id": None, "clicks": 0}]
+    db.refresh.assert_not_called()
+
+
+def test_legacy_ad_spend_bulk_route_inserts_once_without_refresh():
+    from types import SimpleNamespace
+    from unittest.mock import patch
+
+    from app.api.routes import ad_spends
+
+    db = Mock()
+    payload = ad_spends.BulkAdSpendPayload(items=[
+        {"date": "2026-01-02", "amount": 5.0, "sub_id": ""},
+        {"date": "2026-01-03", "amount": 6.0, "sub_id": "abc"},
+    ])
+    with patch.object(ad_spends, "get_user", return_value=SimpleNamespace(id=7)):
+        ad_spends.bulk_create_ad_spend(payload, user_id=None, db=db)
+    assert db.execute.call_count == 1
+    assert [p["sub_id"] for p in db.execute.call_args.args[1]] == [None, "abc"]
+    db.flush.assert_not_called()
+    db.refresh.assert_not_called()
+
+
+def test_ad_spend_listing_is_one_column_select():
+    db = Mock()
+    repo = AdSpendRepository(db)
+
+    repo.list_by_user(7, limit=50)
+    assert db.execute.call_args.args[0]._limit_clause is not None
+
+    repo.list_by_user(7)
+    stmt = db.execute.call_args.args[0]
+    assert stmt._limit_clause is None
+    assert db.execute.return_value.all.call_count == 2
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ORDER BY ad_spends.date DESC, ad_spends.id DESC" in sql
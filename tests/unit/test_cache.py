@@ -0,0 +1,106 @@
+"""
+Unit tests for the Redis cache helpers.
+Run: pytest tests/unit/test_cache.py -v
+"""
+from unittest.mock import MagicMock, patch
+
+from app.core import cache
+
+
+def _client(keys):
+    client = MagicMock()
+    client.scan_iter.return_value = iter(keys)
+    pipe = client.pipeline.return_value.__enter__.return_value
+    return client, pipe
+
+
+def test_delete_prefix_unlinks_through_batched_pipeline():
+    keys = [f"dashboard:user:7:{i}" for i in range(5)]
+    client, pipe = _client(keys)
+    with patch.object(cache, "get_client", return_value=client), \
+            patch.object(cache, "DELETE_PREFIX_BATCH", 2):
+        cache.cache_delete_prefix("dashboard:user:7:")
+
+    client.scan_iter.assert_called_once_with(match="dashboard:user:7:*", count=500)
+    client.pipeline.assert_called_once_with(transaction=False)
+    assert [c.args[0] for c in pipe.unlink.call_args_list] == keys
+    assert pipe.execute.call_count == 3
+    client.delete.assert_not_called()
+
+
+def test_delete_prefix_without_matches_sends_nothing():
+    client, pipe = _client([])
+    with patch.object(cache, "get_client", return_value=client):
+        cache.cache_delete_prefix("dashboard:user:7:")
+    pipe.execute.assert_not_called()
+
+
+def test_client_uses_bounded_blocking_pool_with_health_checks():
+    with patch.object(cache.settings, "REDIS_URL", "redis://localhost:6379/0"), \
+            patch.object(cache, "_client", None):
+        client = cache.get_client()
+        pool = client.connection_pool
+        assert isinstance(pool, cache.redis.BlockingConnectionPool)
+        assert pool.max_connections == cache.settings.REDIS_MAX_CONNECTIONS
+        assert pool.connection_kwargs["health_check_interval"] == cache.HEALTH_CHECK_INTERVAL_SECONDS
+        assert pool.connection_kwargs.get("decode_responses", False) is False
+
+
+def test_warm_up_pings_and_releases_connections():
+    client = MagicMock()
+    pool = client.connection_pool
+    with patch.object(cache, "get_client", return_value=client):
+        cache.warm_up(connections=3)
+    assert pool.get_connection.call_count == 3
+    pool.get_connection.assert_called_with()
+    assert pool.release.call_count == 3
+
+
+def test_warm_up_logs_and_releases_when_redis_is_down():
+    import redis
+
+    client = MagicMock()
+    pool = client.connection_pool
+    pool.get_connection.return_value.send_command.side_effect = redis.exceptions.ConnectionError("down")
+    with patch.object(cache, "get_client", return_value=client):
+        cache.warm_up(connections=3)
+    assert pool.get_connection.call_count == 1
+    assert pool.release.call_count == 1
+
+
+def test_set_get_roundtrip_keeps_types_the_models_revalidate():
+    import datetime
+    from decimal import Decimal
+
+    store = {}
+    client = MagicMock()
+    client.setex.side_effect = lambda key, ttl, payload: store.__setitem__(key, payload)
+    client.get.side_effect = store.get
+    value = {"revenue": Decimal("10.50"), "day": datetime.date(2026, 1, 2), 7: "ação"}
+    with patch.object(cache, "get_client", return_value=client):
+        cache.cache_set("k", value, ttl=30)
+        assert cache.cache_get("k") == {"revenue": "10.50", "day": "2026-01-02", "7": "ação"}
+
+
+def test_large_values_are_compressed_and_read_back():
+    store = {}
+    client = MagicMock()
+    client.setex.side_effect = lambda key, ttl, payload: store.__setitem__(key, payload)
+    client.get.side_effect = store.get
+    value = {"rows": [{"channel": "instagram", "clicks": i} for i in range(200)]}
+    with patch.object(cache, "get_client", return_value=client):
+        cache.cache_set("big", value, ttl=30)
+        cache.cache_set("small", {"a": 1}, ttl=30)
+        assert store["big"].startswith(b"z:")
+        assert len(store["big"]) < len(cache.orjson.dumps(value)) / 3
+        assert store["small"] == b'{"a":1}'
+        assert cache.cache_get("big") == value
+        assert cache.cache_get("small") == {"a": 1}
+
+
+def test_corrupt_compressed_value_is_a_miss():
+    client = MagicMock()
+    client.get.return_value = b"z:not-zlib"
+    with patch.object(cache, "get_client", return_value=client):
+        assert cache.cache_get("k") is None
+
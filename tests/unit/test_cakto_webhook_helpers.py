@@ -0,0 +1,72 @@
+"""
+Unit tests for Cakto webhook payload helpers.
+Run: pytest tests/unit/test_cakto_webhook_helpers.py -v
+"""
+from datetime import datetime, timezone
+
+from app.api.v1.routes.cakto import (
+    _EMPTY_TRANSACTION_DATA,
+    _extract_transaction_data,
+    _product_allowed,
+    _secret_matches,
+)
+from app.core.config import _parse_id_list
+
+
+def test_extract_transaction_data_reads_nested_subscription_fields():
+    payload = {
+        "data": {
+            "id": "tx_1",
+            "amount": 97.0,
+            "status": "paid",
+            "paymentMethod": "pix",
+            "offer": {"name": "Oferta Principal"},
+            "subscription": {
+                "status": "active",
+                "payment_status": "approved",
+                "recurrence_period": "30",
+                "next_payment_date": "2026-11-16T10:00:00Z",
+            },
+        }
+    }
+    tx = _extract_transaction_data(payload)
+    assert tx["transaction_id"] == "tx_1"
+    assert tx["subscription_status"] == "active"
+    assert tx["payment_status"] == "approved"
+    assert tx["recurrence_period"] == 30
+    assert tx["offer_name"] == "Oferta Principal"
+    assert tx["due_date"] == datetime(2026, 11, 16, 10, 0, tzinfo=timezone.utc)
+
+
+def test_extract_transaction_data_prefers_top_level_payment_status_and_product_name():
+    payload = {"data": {"payment_status": "paid", "product": {"name": "MarketDash"}, "subscription": "x"}}
+    tx = _extract_transaction_data(payload)
+    assert tx["payment_status"] == "paid"
+    assert tx["subscription_status"] is None
+    assert tx["offer_name"] == "MarketDash"
+
+
+def test_extract_transaction_data_returns_shared_sentinel_on_error():
+    assert _extract_transaction_data(None) is _EMPTY_TRANSACTION_DATA
+    assert _EMPTY_TRANSACTION_DATA.get("amount") == 0
+
+
+def test_secret_matches_rejects_missing_or_non_string_values():
+    assert _secret_matches("s3cret", "s3cret") is True
+    assert _secret_matches("wrong", "s3cret") is False
+    assert _secret_matches(None, "s3cret") is False
+    assert _secret_matches(123, "s3cret") is False
+    assert _secret_matches("", "s3cret") is False
+
+
+def test_parse_id_list_accepts_csv_and_list_formats():
+    assert _parse_id_list(" a, b ,,") == frozenset({"a", "b"})
+    assert _parse_id_list('["a", \'b\']') == frozenset({"a", "b"})
+    assert _parse_id_list(None) == frozenset()
+
+
+def test_product_allowed_exact_and_prefix_match():
+    assert _product_allowed("hi5cerw") is True
+    assert _product_allowed("8e9qxyg_742442_extra") is True
+    assert _product_allowed("unknown") is False
+    assert _product_allowed(None) is False
@@ -0,0 +1,30 @@
+"""
+Unit tests for response compression (Brotli with gzip fallback) on the app.
+Run: pytest tests/unit/test_compression.py -v
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+
+
+def _large_response(accept_encoding):
+    # /openapi.json passa de 2 KB e não toca banco nem Redis
+    response = TestClient(main.app).get("/openapi.json", headers={"accept-encoding": accept_encoding})
+    assert response.status_code == 200
+    assert len(response.content) > main.COMPRESSION_MIN_BYTES
+    return response
+
+
+def test_large_responses_are_gzipped():
+    assert _large_response("gzip").headers["content-encoding"] == "gzip"
+
+
+def test_large_responses_are_brotli_compressed_when_accepted():
+    pytest.importorskip("brotli_asgi")
+    assert _large_response("br").headers["content-encoding"] == "br"
+
+
+def test_small_responses_are_not_compressed():
+    response = TestClient(main.app).get("/health/live", headers={"accept-encoding": "br, gzip"})
+    assert "content-encoding" not in response.headers
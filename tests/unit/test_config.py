@@ -0,0 +1,26 @@
+"""
+Unit tests for Settings derived values.
+Run: pytest tests/unit/test_config.py -v
+"""
+from unittest.mock import patch
+
+from app.core.config import Settings
+
+
+def test_redis_password_is_injected_into_url_once():
+    def url(raw):
+        return Settings(REDIS_URL=raw, REDIS_PASSWORD="p@ss/w").REDIS_URL
+
+    assert url("rediss://host:6380/2") == "rediss://:p%40ss%2Fw@host:6380/2"
+    assert url("redis://:other@host:6379/0") == "redis://:other@host:6379/0"
+
+
+def test_cors_origins_are_computed_once_and_returned_as_copies():
+    current = Settings(FORCE_HTTP_FALLBACK=True)
+    with patch("logging.Logger.warning") as warning:
+        first = current.get_cors_origins()
+        first.append("https://evil.example")
+        second = current.get_cors_origins()
+    warning.assert_called_once()
+    assert "https://evil.example" not in second
+    assert len(second) == len(set(second))
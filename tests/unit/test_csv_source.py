@@ -0,0 +1,71 @@
+"""
+Unit tests for CSV validation from bytes or from a path on disk.
+Run: pytest tests/unit/test_csv_source.py -v
+"""
+import gzip
+from unittest.mock import patch
+
+from app.services.csv_service import CSVService, gunzip_if_needed, is_csv_filename
+
+CLICKS_CSV = "Tempo dos Cliques,Referenciador,Sub_id\n2026-01-07 23:59:22,Instagram,abc\n2026-01-07 10:00:00,Instagram,abc\n"
+
+
+def test_validate_click_csv_reads_path_like_bytes(tmp_path):
+    path = tmp_path / "clicks.csv"
+    path.write_text(CLICKS_CSV, encoding="latin-1")
+
+    from_bytes, errors_bytes = CSVService.validate_click_csv(CLICKS_CSV.encode("latin-1"), "clicks.csv")
+    from_path, errors_path = CSVService.validate_click_csv(path, "clicks.csv")
+
+    assert errors_bytes == errors_path
+    assert from_path[["date", "channel", "clicks"]].equals(from_bytes[["date", "channel", "clicks"]])
+
+
+def test_validate_csv_falls_back_to_latin1_from_path(tmp_path):
+    path = tmp_path / "vendas.csv"
+    path.write_bytes("Data do Pedido,Nome do Item\n07/01/2026,Camiseta Algodão\n".encode("latin-1"))
+
+    df, _ = CSVService.validate_csv(path, "vendas.csv")
+
+    assert df is not None
+    assert df["product"].tolist() == ["Camiseta Algodão"]
+
+
+def test_gzipped_csv_is_detected_from_content(tmp_path):
+    compressed = gzip.compress(CLICKS_CSV.encode("utf-8"))
+    path = tmp_path / "upload.csv"
+    path.write_bytes(compressed)
+
+    from_gz_bytes, _ = CSVService.validate_click_csv(compressed, "clicks.csv.gz")
+    from_gz_path, _ = CSVService.validate_click_csv(path, "clicks.csv.gz")
+
+    assert from_gz_bytes["clicks"].sum() == 2
+    assert from_gz_path["clicks"].sum() == 2
+
+
+def test_is_csv_filename_is_case_insensitive():
+    assert is_csv_filename("Vendas.CSV")
+    assert is_csv_filename("cliques.Csv.GZ")
+    assert not is_csv_filename("planilha.xlsx")
+    assert not is_csv_filename(None)
+
+
+def test_gunzip_if_needed_only_touches_gzip_content():
+    raw = CLICKS_CSV.encode("utf-8")
+    assert gunzip_if_needed(gzip.compress(raw)) == raw
+    assert gunzip_if_needed(raw) is raw
+
+
+def test_gzip_bomb_is_rejected_with_a_validation_error(tmp_path):
+    bomb = gzip.compress(b"Tempo dos Cliques,Referenciador,Sub_id\n" + b"0" * 4096)
+    path = tmp_path / "clicks.csv.gz"
+    path.write_bytes(bomb)
+
+    with patch("app.services.csv_service.settings.MAX_DECOMPRESSED_BYTES", 1024):
+        from_bytes, errors_bytes = CSVService.validate_click_csv(bomb, "clicks.csv.gz")
+        from_path, errors_path = CSVService.validate_csv(path, "vendas.csv.gz")
+
+    assert len(bomb) < 1024
+    assert from_bytes is None and from_path is None
+    assert "excede o tamanho máximo" in errors_bytes[0]
+    assert "excede o tamanho máximo" in errors_path[0]
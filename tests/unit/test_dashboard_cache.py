@@ -0,0 +1,48 @@
+"""
+Unit tests for dashboard cache stampede protection.
+Run: pytest tests/unit/test_dashboard_cache.py -v
+"""
+from datetime import date
+from unittest.mock import patch
+
+from app.schemas.dashboard import DashboardFilters, KPIs
+from app.services import dashboard_service
+from app.services.dashboard_service import DashboardService
+
+
+def _kpis():
+    return KPIs(total_revenue=1, total_cost=0, total_commission=0, total_profit=1, total_rows=1)
+
+
+def _patch_queries():
+    return patch.multiple(
+        DashboardService,
+        get_kpis=staticmethod(lambda db, user_id, filters: _kpis()),
+        get_period_aggregations=staticmethod(lambda db, user_id, filters: []),
+        get_product_aggregations=staticmethod(lambda db, user_id, filters: []),
+    )
+
+
+def test_lock_holder_computes_caches_and_releases_lock():
+    filters = DashboardFilters(start_date=date(2026, 1, 1))
+    with _patch_queries(), \
+            patch.object(dashboard_service, "cache_get", return_value=None), \
+            patch.object(dashboard_service, "cache_lock", return_value=True), \
+            patch.object(dashboard_service, "cache_set") as cache_set, \
+            patch.object(dashboard_service, "cache_delete") as cache_delete:
+        response = DashboardService.get_dashboard(db=None, user_id=7, filters=filters)
+    assert response.kpis.total_revenue == 1
+    cache_key = cache_set.call_args.args[0]
+    assert cache_key.startswith("dashboard:user:7:")
+    cache_delete.assert_called_once_with(f"{cache_key}:lock")
+
+
+def test_waiter_returns_value_filled_by_lock_holder():
+    cached = {"kpis": _kpis().dict(), "period_aggregations": [], "product_aggregations": []}
+    with patch.object(DashboardService, "get_kpis") as get_kpis, \
+            patch.object(dashboard_service, "cache_get", side_effect=[None, cached]), \
+            patch.object(dashboard_service, "cache_lock", return_value=False), \
+            patch.object(dashboard_service, "DASHBOARD_LOCK_POLL_SECONDS", 0):
+        response = DashboardService.get_dashboard(db=None, user_id=7, filters=DashboardFilters())
+    assert response.kpis.total_revenue == 1
+    get_kpis.assert_not_called()
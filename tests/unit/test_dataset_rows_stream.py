@@ -0,0 +1,76 @@
+"""
+Unit tests for NDJSON streaming of dataset rows.
+Run: pytest tests/unit/test_dataset_rows_stream.py -v
+"""
+import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import orjson
+
+from app.schemas.dataset import DatasetRowResponse
+from app.services.dataset_service import DatasetService
+
+
+def _row(row_id):
+    return SimpleNamespace(
+        id=row_id, dataset_id=1, user_id=7, date=datetime.date(2026, 1, 2), time=None,
+        product="P", platform="shopee", category=None, status="Concluído", channel=None,
+        attribution_type=None, sub_id1="abc", order_id="o1", product_id="p1",
+        revenue=Decimal("10.50"), commission=Decimal("1.05"), cost=None, profit=Decimal("1.05"),
+        quantity=1,
+    )
+
+
+def test_iter_all_rows_ndjson_emits_one_json_object_per_line():
+    row_repo = Mock()
+    row_repo.iter_by_user.return_value = iter([_row(2), _row(1)])
+    service = DatasetService(Mock(), row_repo)
+
+    chunks = list(service.iter_all_rows_ndjson(7, None, None))
+
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    records = [orjson.loads(chunk) for chunk in chunks]
+    assert [r["id"] for r in records] == [2, 1]
+    assert records[0]["date"] == "02-01-2026"
+    assert records[0]["revenue"] == 10.5
+    row_repo.iter_by_user.assert_called_once_with(7, None, None)
+
+
+def test_serialize_row_for_api_matches_response_schema():
+    row = _row(3)
+    service = DatasetService(Mock(), Mock())
+
+    expected = DatasetRowResponse.model_validate(service.serialize_row(row)).model_dump(mode="json")
+
+    assert service.serialize_row_for_api(row) == expected
+
+
+def test_serialize_row_for_api_formats_time():
+    row = _row(3)
+    row.time = datetime.time(14, 5, 9)
+
+    assert DatasetService(Mock(), Mock()).serialize_row_for_api(row)["time"] == "14:05:09"
+
+
+def test_iter_latest_rows_ndjson_streams_latest_transaction_dataset():
+    dataset_repo = Mock()
+    dataset_repo.get_latest_by_user_and_type.return_value = SimpleNamespace(id=4)
+    row_repo = Mock()
+    row_repo.iter_by_dataset.return_value = iter([_row(5)])
+    service = DatasetService(dataset_repo, row_repo)
+
+    records = [orjson.loads(chunk) for chunk in service.iter_latest_rows_ndjson(7, None, None)]
+
+    assert [r["id"] for r in records] == [5]
+    dataset_repo.get_latest_by_user_and_type.assert_called_once_with(7, "transaction")
+    row_repo.iter_by_dataset.assert_called_once_with(4, 7, None, None)
+
+
+def test_iter_latest_rows_ndjson_is_empty_without_dataset():
+    dataset_repo = Mock()
+    dataset_repo.get_latest_by_user_and_type.return_value = None
+    service = DatasetService(dataset_repo, Mock())
+
+    assert list(service.iter_latest_rows_ndjson(7, None, None)) == []
@@ -0,0 +1,34 @@
+"""
+Unit tests for the feedback endpoint.
+Run: pytest tests/unit/test_feedback.py -v
+"""
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.dependencies import get_current_user_optional
+from app.api.v1.routes import feedback
+
+
+def _client():
+    app = FastAPI()
+    app.include_router(feedback.router, prefix="/feedback")
+    app.dependency_overrides[get_current_user_optional] = lambda: None
+    return TestClient(app)
+
+
+def test_feedback_email_is_sent_after_response():
+    with patch.object(feedback.EmailService, "is_configured", return_value=True), \
+            patch.object(feedback.EmailService, "send_feedback_email", return_value=True) as send:
+        response = _client().post("/feedback/", json={"data": {"message": "oi"}, "email": "a@b.c"})
+    assert response.json()["success"] is True
+    send.assert_called_once_with(data={"message": "oi"}, user_name=None, user_email="a@b.c", user_id=None)
+
+
+def test_feedback_without_smtp_reports_failure():
+    with patch.object(feedback.EmailService, "is_configured", return_value=False), \
+            patch.object(feedback.EmailService, "send_feedback_email") as send:
+        response = _client().post("/feedback/", json={"data": {"message": "oi"}})
+    assert response.json()["success"] is False
+    send.assert_not_called()
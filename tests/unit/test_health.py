@@ -0,0 +1,93 @@
+"""
+Unit tests for the /health probes, the root endpoint and the app lifespan.
+Run: pytest tests/unit/test_health.py -v
+"""
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app import main
+
+
+@pytest.fixture(autouse=True)
+def _fresh_result():
+    main._health_result["expires_at"] = 0.0
+    yield
+    main._health_result["expires_at"] = 0.0
+
+
+def test_health_pings_the_shared_cache_client():
+    client = MagicMock()
+    with patch.object(main, "engine") as engine, \
+            patch.object(main, "get_redis_client", return_value=client):
+        response = main.health_check()
+    assert response.status_code == 200
+    assert json.loads(response.body)["redis"] == "connected"
+    client.ping.assert_called_once_with()
+    engine.connect.return_value.__enter__.return_value.execute.assert_called_once_with(main._SELECT_ONE)
+
+
+def test_health_probe_storm_is_answered_from_the_last_result():
+    with patch.object(main, "engine") as engine, \
+            patch.object(main, "get_redis_client", return_value=None):
+        first = main.health_check()
+        second = main.health_check()
+    assert engine.connect.call_count == 1
+    assert first.body == second.body
+
+
+def test_health_reports_database_failure_as_503():
+    engine = MagicMock()
+    engine.connect.return_value.__enter__.return_value.execute.side_effect = RuntimeError("down")
+    with patch.object(main, "engine", engine), \
+            patch.object(main, "get_redis_client", return_value=None):
+        response = main.health_check()
+    assert response.status_code == 503
+    assert json.loads(response.body)["database"] == "disconnected"
+
+
+def test_liveness_does_not_touch_dependencies():
+    with patch.object(main, "engine") as engine, \
+            patch.object(main, "get_redis_client") as get_client:
+        response = main.health_live()
+    assert response.status_code == 200
+    assert json.loads(response.body) == {"status": "ok"}
+    engine.connect.assert_not_called()
+    get_client.assert_not_called()
+
+
+def test_health_is_an_alias_of_ready():
+    endpoints = {getattr(route, "path", None): getattr(route, "endpoint", None) for route in main.app.routes}
+    assert endpoints["/health"] is endpoints["/health/ready"] is main.health_check
+    assert endpoints["/health/live"] is main.health_live
+
+
+def test_lifespan_initializes_then_disposes_pools():
+    import asyncio
+
+    async def _run():
+        async with main.lifespan(main.app):
+            init_db.assert_called_once_with()
+            engine.dispose.assert_not_called()
+
+    with patch.object(main, "init_db") as init_db, \
+            patch.object(main, "warm_up_cache"), \
+            patch.object(main, "engine") as engine, \
+            patch.object(main, "read_engine", None):
+        asyncio.run(_run())
+    engine.dispose.assert_called_once_with()
+
+
+def test_root_is_served_with_etag_and_revalidated_with_304():
+    from starlette.requests import Request
+
+    def _request(headers):
+        raw = [(k.encode(), v.encode()) for k, v in headers.items()]
+        return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+    first = main.root(_request({}))
+    assert first.status_code == 200 and first.headers["cache-control"] == main.ROOT_CACHE_CONTROL
+    assert json.loads(first.body)["message"] == "MarketDash Backend API"
+    second = main.root(_request({"if-none-match": first.headers["etag"]}))
+    assert second.status_code == 304 and second.body == b""
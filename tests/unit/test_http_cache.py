@@ -0,0 +1,50 @@
+"""
+Unit tests for HTTP cache helpers (ETag / 304).
+Run: pytest tests/unit/test_http_cache.py -v
+"""
+from starlette.requests import Request
+
+from app.core.http_cache import cached_response, etag_matches, make_etag
+
+
+def _request(if_none_match=None) -> Request:
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_make_etag_is_quoted_and_stable():
+    etag = make_etag(b'{"plans": []}')
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag(b'{"plans": []}')
+    assert etag != make_etag(b'{"plans": [1]}')
+
+
+def test_etag_matches_exact_weak_list_and_wildcard():
+    etag = make_etag(b"body")
+    assert etag_matches(_request(etag), etag) is True
+    assert etag_matches(_request(f"W/{etag}"), etag) is True
+    assert etag_matches(_request(f'"other", {etag}'), etag) is True
+    assert etag_matches(_request("*"), etag) is True
+    assert etag_matches(_request('"other"'), etag) is False
+    assert etag_matches(_request(), etag) is False
+
+
+def test_cached_response_returns_body_without_if_none_match():
+    body = b'{"ok": true}'
+    etag = make_etag(body)
+    response = cached_response(_request(), body, etag, "public, max-age=60")
+    assert response.status_code == 200
+    assert response.body == body
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "public, max-age=60"
+
+
+def test_cached_response_returns_304_when_etag_matches():
+    body = b'{"ok": true}'
+    etag = make_etag(body)
+    response = cached_response(_request(etag), body, etag, "public, max-age=60")
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == etag
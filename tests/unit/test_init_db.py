@@ -0,0 +1,75 @@
+"""
+Unit tests for init_db: ping with jittered backoff, no create_all in production.
+Run: pytest tests/unit/test_init_db.py -v
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.db import base
+
+
+def _down():
+    return OperationalError("SELECT 1", {}, Exception("down"))
+
+
+def _engine(failures=0):
+    engine = MagicMock()
+    engine.connect.side_effect = [_down() for _ in range(failures)] + [MagicMock()]
+    return engine
+
+
+def test_retries_with_jittered_backoff_then_creates_tables():
+    engine = _engine(failures=3)
+    with patch("app.db.session.engine", engine), \
+            patch.object(settings, "ENVIRONMENT", "development"), \
+            patch("time.sleep") as sleep, \
+            patch.object(base.Base.metadata, "create_all") as create_all:
+        base.init_db()
+    delays = [c.args[0] for c in sleep.call_args_list]
+    assert len(delays) == 3
+    assert all(base.CONNECT_BACKOFF_BASE <= d <= base.CONNECT_BACKOFF_CAP for d in delays)
+    create_all.assert_called_once_with(bind=engine)
+
+
+def test_next_delay_is_capped():
+    with patch.object(base.random, "uniform", side_effect=lambda low, high: high):
+        assert base._next_delay(100) == base.CONNECT_BACKOFF_CAP
+
+
+def test_production_leaves_schema_to_migrations():
+    with patch("app.db.session.engine", _engine()), \
+            patch.object(settings, "ENVIRONMENT", "production"), \
+            patch.object(base.Base.metadata, "create_all") as create_all:
+        base.init_db()
+    create_all.assert_not_called()
+
+
+def test_gives_up_after_max_retries():
+    engine = MagicMock()
+    engine.connect.side_effect = _down()
+    with patch("app.db.session.engine", engine), patch("time.sleep") as sleep:
+        with pytest.raises(OperationalError):
+            base.init_db()
+    assert sleep.call_count == base.CONNECT_MAX_RETRIES
+
+
+def test_non_driver_errors_are_not_retried():
+    engine = MagicMock()
+    engine.connect.side_effect = RuntimeError("bug")
+    with patch("app.db.session.engine", engine), patch("time.sleep") as sleep:
+        with pytest.raises(RuntimeError):
+            base.init_db()
+    sleep.assert_not_called()
+
+
+def test_homologation_creates_schema_only_when_enabled():
+    for auto_create, expected_calls in ((False, 0), (True, 1)):
+        with patch("app.db.session.engine", _engine()), \
+                patch.object(settings, "ENVIRONMENT", "homologation"), \
+                patch.object(settings, "AUTO_CREATE_SCHEMA", auto_create), \
+                patch.object(base.Base.metadata, "create_all") as create_all:
+            base.init_db()
+        assert create_all.call_count == expected_calls
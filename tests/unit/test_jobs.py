@@ -49,6 +49,31 @@ def test_create_job_returns_presigned_and_ids(mock_job_repo, mock_dataset_repo,
                     assert result["expires_in"] == 3600
 
 
+def test_create_dataset_with_job_single_transaction(mock_job_repo, mock_dataset_repo, mock_db):
+    """Dataset + Job: one flush (dataset id), one commit, no refresh SELECTs."""
+    job_id = uuid4()
+    # The dataset flush is what assigns its id (INSERT ... RETURNING)
+    mock_db.flush.side_effect = lambda: setattr(mock_db.add.call_args.args[0], "id", 42)
+    service = JobService(mock_job_repo, mock_dataset_repo)
+    dataset_id = service.create_dataset_with_job(1, "data.csv", "transaction", job_id, f"uploads/{job_id}/data.csv", "queued")
+    assert dataset_id == 42
+    dataset, job = (c.args[0] for c in mock_db.add.call_args_list)
+    assert isinstance(dataset, Dataset) and dataset.id == 42
+    assert isinstance(job, Job) and job.job_id == job_id and job.dataset_id == 42 and job.status == "queued"
+    assert mock_db.flush.call_count == 1
+    mock_db.commit.assert_called_once()
+    mock_db.refresh.assert_not_called()
+
+
+def test_create_job_accepts_gzipped_csv(mock_job_repo, mock_dataset_repo):
+    """data.csv.gz goes through the jobs pipeline; the worker decompresses after download."""
+    with patch("app.services.job_service.is_storage_configured", return_value=True), \
+            patch("app.services.job_service.create_presigned_put", return_value="https://storage.example/presigned"), \
+            patch.object(mock_dataset_repo, "create", side_effect=lambda d: setattr(d, "id", 42) or d):
+        result = JobService(mock_job_repo, mock_dataset_repo).create_job(user_id=1, filename="Data.CSV.GZ")
+    assert result["dataset_id"] == 42
+
+
 def test_create_job_rejects_non_csv(mock_job_repo, mock_dataset_repo):
     """Create job raises 400 for non-CSV filename."""
     with patch("app.services.job_service.is_storage_configured", return_value=True):
@@ -67,3 +92,59 @@ def test_create_job_rejects_invalid_type(mock_job_repo, mock_dataset_repo):
         with pytest.raises(HTTPException) as exc:
             service.create_job(user_id=1, filename="data.csv", job_type="invalid")
         assert exc.value.status_code == 400
+
+
+def test_multipart_part_urls_batch():
+    """POST /multipart/{job_id}/parts signs a consecutive batch in one call."""
+    from app.api.v1.routes import jobs
+
+    service = Mock()
+    service.get_owned_job.return_value = Mock(storage_key="uploads/x/data.csv")
+    body = jobs.MultipartUploadPartsRequest(first_part=2, count=3)
+    with patch("app.services.storage.create_presigned_upload_parts", return_value=["u2", "u3", "u4"]) as sign:
+        result = jobs.get_multipart_part_urls(uuid4(), body, "up-1", current_user=Mock(id=1), service=service)
+    assert [p["part_number"] for p in result] == [2, 3, 4]
+    assert [p["upload_url"] for p in result] == ["u2", "u3", "u4"]
+    assert sign.call_args.args[3] == range(2, 5)
+
+
+def test_multipart_part_urls_rejects_range_past_limit():
+    from fastapi import HTTPException
+    from app.api.v1.routes import jobs
+
+    body = jobs.MultipartUploadPartsRequest(first_part=9999, count=5)
+    with pytest.raises(HTTPException) as exc:
+        jobs.get_multipart_part_urls(uuid4(), body, "up-1", current_user=Mock(id=1), service=Mock())
+    assert exc.value.status_code == 400
+
+
+def test_start_processing_commits_then_enqueues(mock_job_repo, mock_dataset_repo, mock_db):
+    """commit / complete-multipart / retry share one dispatch: status, commit, then the task."""
+    job_id = uuid4()
+    job = Job(job_id=job_id, status="error", chunks_done=3)
+    # Simulates expire_on_commit: the id must have been read before the commit
+    mock_db.commit.side_effect = lambda: setattr(job, "job_id", None)
+    with patch("app.services.job_service.enqueue_job") as enqueue:
+        JobService(mock_job_repo, mock_dataset_repo).start_processing(job, reset_progress=True)
+    assert job.status == "processing" and job.chunks_done == 0
+    mock_db.commit.assert_called_once()
+    enqueue.assert_called_once_with(job_id)
+
+
+def test_process_job_marks_error_when_gzip_exceeds_cap():
+    """A .csv.gz that inflates past MAX_DECOMPRESSED_BYTES fails the job instead of filling the worker's memory."""
+    import gzip
+    from app.tasks.job_tasks import process_job_from_storage
+
+    db = MagicMock()
+    job = Job(job_id=uuid4(), status="processing", storage_key="uploads/1/data.csv.gz")
+    bomb = gzip.compress(b"0" * 4096)
+    with patch("app.db.session.SessionLocal", return_value=db), \
+            patch("app.repositories.job_repository.JobRepository.get_by_id", return_value=job), \
+            patch("app.services.storage.is_storage_configured", return_value=True), \
+            patch("app.services.storage.download_file", return_value=bomb), \
+            patch("app.core.config.settings.MAX_DECOMPRESSED_BYTES", 1024):
+        process_job_from_storage(str(job.job_id))
+    assert job.status == "error"
+    db.commit.assert_called_once()
+    db.close.assert_called_once()
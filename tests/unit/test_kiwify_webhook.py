@@ -0,0 +1,35 @@
+"""
+Unit tests for the Kiwify webhook subscription updates.
+Run: pytest tests/unit/test_kiwify_webhook.py -v
+"""
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.api.v1.routes import kiwify
+
+
+def _request(payload):
+    request = Mock()
+    request.body = AsyncMock(return_value=json.dumps(payload).encode())
+    request.json = AsyncMock(return_value=payload)
+    return request
+
+
+def test_late_payment_invalidates_cached_subscription_status():
+    user = Mock(id=7, email="user@example.com")
+    current = Mock(assinatura_status="ativa")
+    payload = {"order": {"webhook_event_type": "subscription_late", "Customer": {"email": "user@example.com"}}}
+    with patch("app.services.subscription_event_recorder.record_subscription_event"), \
+            patch.object(kiwify, "_extract_email", return_value="user@example.com"), \
+            patch.object(kiwify, "_product_allowed", return_value=True), \
+            patch.object(kiwify, "_lookup_plan_product", return_value=None), \
+            patch.object(kiwify, "find_or_create_user", return_value=(user, False, True)), \
+            patch.object(kiwify, "SubscriptionRepository") as repo_cls, \
+            patch.object(kiwify.SubscriptionService, "invalidate_access_cache") as invalidate:
+        repo_cls.return_value.get_by_user_id.return_value = current
+        db = Mock()
+        result = asyncio.run(kiwify.kiwify_webhook(_request(payload), Mock(), db=db))
+    assert result["action"] == "late"
+    assert current.assinatura_status == "inadimplente"
+    invalidate.assert_called_once_with(7, "user@example.com")
@@ -0,0 +1,40 @@
+"""
+Unit tests for queued logging (formatting happens on the listener thread).
+Run: pytest tests/unit/test_logging.py -v
+"""
+import logging
+import threading
+
+from app.core import logging as app_logging
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+        self.threads = []
+        self.done = threading.Event()
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+        self.threads.append(threading.current_thread())
+        self.done.set()
+
+
+def test_error_with_traceback_is_formatted_off_the_calling_thread():
+    root = logging.getLogger()
+    saved = list(root.handlers)
+    capture = _Capture()
+    root.handlers = [capture]
+    try:
+        app_logging._start_queue_listener()
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("test").error("falhou", exc_info=True)
+        assert capture.done.wait(2)
+    finally:
+        app_logging._stop_queue_listener()
+        root.handlers = saved
+    assert "ValueError: boom" in capture.lines[0]
+    assert capture.threads[0] is not threading.current_thread()
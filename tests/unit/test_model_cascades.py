@@ -0,0 +1,18 @@
+"""
+Unit tests for ORM cascade configuration on large collections.
+Run: pytest tests/unit/test_model_cascades.py -v
+"""
+import pytest
+from sqlalchemy import inspect
+
+import app.models  # noqa: F401  (registra todos os mappers)
+from app.models.dataset import Dataset
+from app.models.user import User
+
+
+@pytest.mark.parametrize(
+    "model, name",
+    [(User, "datasets"), (User, "dataset_rows"), (User, "click_rows"), (Dataset, "rows"), (Dataset, "click_rows")],
+)
+def test_large_collections_rely_on_database_cascade(model, name):
+    assert inspect(model).relationships[name].passive_deletes is True
@@ -0,0 +1,55 @@
+"""
+Unit tests for the CORS preflight short-circuit.
+Run: pytest tests/unit/test_preflight.py -v
+"""
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+
+from app.core.preflight import PreflightMiddleware
+
+ORIGINS = ["https://marketdash.com.br"]
+METHODS = ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"]
+PREFLIGHT = {
+    "origin": "https://marketdash.com.br",
+    "access-control-request-method": "POST",
+    "access-control-request-headers": "authorization, content-type",
+}
+
+
+def _client(short_circuit: bool):
+    app = FastAPI()
+    app.add_middleware(
+        CORSMiddleware, allow_origins=ORIGINS, allow_credentials=True,
+        allow_methods=METHODS, allow_headers=["*"], max_age=86400,
+    )
+    if short_circuit:
+        app.add_middleware(PreflightMiddleware, allow_origins=ORIGINS, allow_methods=METHODS, max_age=86400)
+
+    @app.post("/items")
+    def create_item():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def _cors_headers(response):
+    return {k: v for k, v in response.headers.items() if k.startswith("access-control-") or k == "vary"}
+
+
+def test_preflight_answers_with_the_same_cors_headers():
+    fast = _client(True).options("/items", headers=PREFLIGHT)
+    reference = _client(False).options("/items", headers=PREFLIGHT)
+    assert fast.status_code == 204 and fast.content == b""
+    assert _cors_headers(fast) == _cors_headers(reference)
+
+
+def test_disallowed_preflight_falls_through_to_cors_middleware():
+    response = _client(True).options("/items", headers={**PREFLIGHT, "origin": "https://evil.example"})
+    assert response.status_code == 400
+
+
+def test_non_preflight_requests_pass_through():
+    response = _client(True).post("/items", headers={"origin": "https://marketdash.com.br"})
+    assert response.json() == {"ok": True}
+    assert response.headers["access-control-allow-origin"] == "https://marketdash.com.br"
@@ -0,0 +1,31 @@
+"""
+Unit tests for the read-only session dependency (optional read replica).
+Run: pytest tests/unit/test_read_db.py -v
+"""
+from unittest.mock import Mock, patch
+
+from app.api.v1 import dependencies
+
+
+def _user(user_id=7):
+    user = Mock()
+    user.id = user_id
+    return user
+
+
+def test_without_replica_reuses_request_session():
+    db = Mock()
+    with patch.object(dependencies, "ReadSessionLocal", None):
+        gen = dependencies.get_read_db(current_user=_user(), db=db)
+        assert next(gen) is db
+
+
+def test_with_replica_sets_rls_context_and_closes():
+    read_db = Mock()
+    with patch.object(dependencies, "ReadSessionLocal", return_value=read_db):
+        gen = dependencies.get_read_db(current_user=_user(), db=Mock())
+        assert next(gen) is read_db
+        sql = str(read_db.execute.call_args.args[0])
+        assert "SET LOCAL app.current_user_id = '7'" in sql
+        gen.close()
+    read_db.close.assert_called_once()
@@ -0,0 +1,66 @@
+"""
+Unit tests for keyset (after_id) pagination of dataset rows.
+Run: pytest tests/unit/test_row_keyset_pagination.py -v
+"""
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from starlette.responses import Response
+
+from app.api.v1.routes.datasets import _set_next_cursor
+from app.repositories.dataset_row_repository import DatasetRowRepository
+
+
+def _sql(query) -> str:
+    return str(query.statement.compile(dialect=postgresql.dialect()))
+
+
+def _base_query(session):
+    from app.models.dataset_row import DatasetRow
+    return session.query(DatasetRow).filter(DatasetRow.user_id == 1)
+
+
+def test_after_id_uses_tuple_seek_without_offset():
+    session = Session()
+    repo = DatasetRowRepository(session)
+    sql = _sql(repo._page(_base_query(session), 1, 50, 100, after_id=42))
+    assert "(dataset_rows_v2.date, dataset_rows_v2.id) <" in sql
+    assert "LIMIT" in sql
+    assert "OFFSET" not in sql
+    assert "ORDER BY dataset_rows_v2.date DESC, dataset_rows_v2.id DESC" in sql
+
+
+def test_without_after_id_keeps_limit_offset():
+    session = Session()
+    repo = DatasetRowRepository(session)
+    sql = _sql(repo._page(_base_query(session), 1, 50, 100, after_id=None))
+    assert "LIMIT" in sql and "OFFSET" in sql
+    assert "(dataset_rows_v2.date, dataset_rows_v2.id) <" not in sql
+
+
+def test_next_cursor_only_on_full_page():
+    response = Response()
+    _set_next_cursor(response, [{"id": 9}, {"id": 4}], limit=2)
+    assert response.headers["X-Next-Cursor"] == "4"
+
+    response = Response()
+    _set_next_cursor(response, [{"id": 9}], limit=2)
+    assert "X-Next-Cursor" not in response.headers
+
+    response = Response()
+    _set_next_cursor(response, [{"id": 9}], limit=None)
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_list_dataset_rows_forwards_cursor_to_repository():
+    import datetime
+    from unittest.mock import Mock
+
+    from app.services.dataset_service import DatasetService
+
+    row_repo = Mock()
+    row_repo.list_by_dataset.return_value = []
+    service = DatasetService(Mock(), row_repo)
+    start, end = datetime.date(2026, 1, 1), datetime.date(2026, 1, 31)
+
+    assert service.list_dataset_rows(3, 7, start, end, limit=50, after_id=42) == []
+    row_repo.list_by_dataset.assert_called_once_with(3, 7, start, end, 50, 0, 42)
@@ -0,0 +1,39 @@
+"""
+Unit tests: totals come from the main query (no separate COUNT round-trip).
+Run: pytest tests/unit/test_single_pass_counts.py -v
+"""
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from app.repositories.click_row_repository import ClickRowRepository
+from app.repositories.dataset_repository import DatasetRepository
+from app.services.dataset_service import DatasetService
+
+
+def test_apply_ad_spend_uses_batch_size_as_total():
+    dataset_repo = Mock()
+    dataset_repo.get_latest_by_user.return_value = SimpleNamespace(id=3)
+    rows = [
+        SimpleNamespace(id=1, cost=Decimal("0"), revenue=Decimal("10"), commission=Decimal("1")),
+        SimpleNamespace(id=2, cost=None, revenue=Decimal("5"), commission=None),
+    ]
+    db = Mock()
+    db.query.return_value.filter.return_value.all.return_value = rows
+
+    with patch("app.services.dataset_service.DashboardService"):
+        result = DatasetService(dataset_repo, Mock()).apply_ad_spend(7, 10.0, None, db)
+
+    assert result["updated"] == 2
+    db.query.return_value.filter.return_value.count.assert_not_called()
+    mappings = db.bulk_update_mappings.call_args.args[1]
+    assert [m["cost"] for m in mappings] == [Decimal("5"), Decimal("5")]
+
+
+def test_delete_all_returns_delete_rowcount():
+    for repo_cls in (DatasetRepository, ClickRowRepository):
+        db = Mock()
+        db.query.return_value.filter.return_value.delete.return_value = 4
+        assert repo_cls(db).delete_all_by_user(7) == 4
+        db.query.return_value.filter.return_value.count.assert_not_called()
+        db.commit.assert_called_once()
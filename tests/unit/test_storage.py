@@ -0,0 +1,54 @@
+"""
+Unit tests for S3 storage helpers.
+Run: pytest tests/unit/test_storage.py -v
+"""
+import io
+from unittest.mock import Mock, patch
+
+from app.services import storage
+
+
+def test_upload_file_obj_streams_with_multipart_config():
+    client = Mock()
+    body = io.BytesIO(b"a,b\n1,2\n")
+    with patch.object(storage, "_get_client", return_value=client):
+        assert storage.upload_file_obj("bucket", "uploads/x.csv", body) is True
+
+    args, kwargs = client.upload_fileobj.call_args
+    assert args == (body, "bucket", "uploads/x.csv")
+    assert kwargs["ExtraArgs"] == {"ContentType": "text/csv"}
+    assert kwargs["Config"].multipart_chunksize == storage.MULTIPART_CHUNK_BYTES
+
+
+def test_upload_file_obj_reports_failure():
+    client = Mock()
+    client.upload_fileobj.side_effect = RuntimeError("boom")
+    with patch.object(storage, "_get_client", return_value=client):
+        assert storage.upload_file_obj("bucket", "k", io.BytesIO(b"")) is False
+
+
+def test_client_is_built_once_per_configuration():
+    storage._build_client.cache_clear()
+    with patch.object(storage.settings, "S3_BUCKET", "bucket"), \
+            patch.object(storage.settings, "S3_ENDPOINT", "https://s3.example"), \
+            patch.object(storage.settings, "S3_ACCESS_KEY", "key"), \
+            patch.object(storage.settings, "S3_SECRET_KEY", "secret"):
+        first = storage._get_client()
+        assert storage._get_client() is first
+        assert first.meta.config.max_pool_connections == storage.S3_MAX_POOL_CONNECTIONS
+        with patch.object(storage.settings, "S3_ACCESS_KEY", "other"):
+            assert storage._get_client() is not first
+    storage._build_client.cache_clear()
+
+
+def test_presigned_upload_parts_signs_each_part_with_one_client():
+    client = Mock()
+    client.generate_presigned_url.side_effect = lambda op, Params, ExpiresIn: f"https://s/{Params['PartNumber']}"
+    with patch.object(storage, "_get_client", return_value=client) as get_client:
+        urls = storage.create_presigned_upload_parts("bucket", "k", "up-1", range(3, 6))
+
+    assert urls == ["https://s/3", "https://s/4", "https://s/5"]
+    get_client.assert_called_once()
+    assert client.generate_presigned_url.call_args.kwargs["Params"] == {
+        "Bucket": "bucket", "Key": "k", "UploadId": "up-1", "PartNumber": 5,
+    }
@@ -0,0 +1,208 @@
+"""
+Unit tests for the short-TTL subscription access and status caches.
+Run: pytest tests/unit/test_subscription_access_cache.py -v
+"""
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1 import dependencies
+from app.services.subscription_service import (
+    ACCESS_CACHE_TTL_SECONDS,
+    CHECK_STATUS_CACHE_TTL_SECONDS,
+    STATUS_CACHE_TTL_SECONDS,
+    SubscriptionService,
+)
+
+
+@pytest.fixture
+def enforced_settings():
+    with patch.object(dependencies.settings, "ENFORCE_SUBSCRIPTION", True), \
+            patch.object(dependencies.settings, "ENVIRONMENT", "production"):
+        yield
+
+
+def _user(user_id=7):
+    user = Mock()
+    user.id = user_id
+    user.email = "user@example.com"
+    return user
+
+
+def test_cached_access_skips_subscription_queries(enforced_settings):
+    user = _user()
+    with patch("app.services.subscription_service.cache_get", return_value=True), \
+            patch.object(dependencies, "SubscriptionRepository") as repo_cls:
+        assert dependencies.require_active_subscription(current_user=user, db=Mock()) is user
+    repo_cls.assert_not_called()
+
+
+def test_active_subscription_is_cached_with_short_ttl(enforced_settings):
+    user = _user()
+    repo = Mock()
+    repo.get_by_user_id.return_value = Mock(is_active=True)
+    with patch("app.services.subscription_service.cache_get", return_value=None), \
+            patch("app.services.subscription_service.cache_set") as cache_set, \
+            patch.object(dependencies, "SubscriptionRepository", return_value=repo), \
+            patch.object(SubscriptionService, "needs_validation", return_value=False):
+        assert dependencies.require_active_subscription(current_user=user, db=Mock()) is user
+    cache_set.assert_called_once_with("subscription:access:user:7", True, ttl=ACCESS_CACHE_TTL_SECONDS)
+
+
+def test_inactive_subscription_is_not_cached(enforced_settings):
+    repo = Mock()
+    repo.get_by_user_id.return_value = Mock(is_active=False)
+    with patch("app.services.subscription_service.cache_get", return_value=None), \
+            patch("app.services.subscription_service.cache_set") as cache_set, \
+            patch.object(dependencies, "SubscriptionRepository", return_value=repo), \
+            patch.object(SubscriptionService, "needs_validation", return_value=False):
+        with pytest.raises(HTTPException) as exc:
+            dependencies.require_active_subscription(current_user=_user(), db=Mock())
+    assert exc.value.status_code == 403
+    cache_set.assert_not_called()
+
+
+def test_cancel_subscription_invalidates_access_cache():
+    repo = Mock()
+    repo.get_by_user_id.return_value = Mock(is_active=True)
+    with patch("app.services.subscription_service.cache_delete") as cache_delete:
+        assert SubscriptionService(repo).cancel_subscription(7) is True
+    cache_delete.assert_called_once_with("subscription:access:user:7", "subscription:status:user:7")
+
+
+def test_subscription_status_is_served_from_cache():
+    repo = Mock()
+    with patch("app.services.subscription_service.cache_get", return_value={"is_active": True}):
+        assert SubscriptionService(repo).get_subscription_status(7) == {"is_active": True}
+    repo.get_by_user_id.assert_not_called()
+
+
+def test_subscription_status_miss_is_cached_with_ttl():
+    repo = Mock()
+    repo.get_by_user_id.return_value = None
+    with patch("app.services.subscription_service.cache_get", return_value=None), \
+            patch("app.services.subscription_service.cache_set") as cache_set:
+        status_data = SubscriptionService(repo).get_subscription_status(7)
+    assert status_data["has_subscription"] is False
+    cache_set.assert_called_once_with("subscription:status:user:7", status_data, ttl=STATUS_CACHE_TTL_SECONDS)
+
+
+def test_check_status_reads_user_and_subscription_in_one_query():
+    from sqlalchemy.dialects import postgresql
+
+    from app.repositories.subscription_repository import SubscriptionRepository
+
+    db = Mock()
+    SubscriptionRepository(db).get_status_by_email(" User@Example.com ")
+    assert db.execute.call_count == 1
+    stmt, params = db.execute.call_args.args
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "LEFT OUTER JOIN subscriptions" in sql
+    assert "lower(users.email)" in sql
+    assert params == {"email": "user@example.com"}
+
+
+def test_hot_lookups_reuse_module_level_statements():
+    from app.repositories.subscription_repository import SubscriptionRepository
+    from app.repositories.user_repository import UserRepository
+
+    db = Mock()
+    for user_id in (1, 2):
+        SubscriptionRepository(db).get_by_user_id(user_id)
+    first, second = db.execute.call_args_list
+    assert first.args[0] is second.args[0]
+    assert second.args[1] == {"user_id": 2}
+
+    db = Mock()
+    UserRepository(db).get_by_email(" A@B.com ")
+    assert db.execute.call_args.args[1] == {"email": "a@b.com"}
+
+
+def test_cancel_route_does_not_requery_when_nothing_to_cancel():
+    from app.api.v1.routes import subscription
+
+    with patch.object(subscription, "SubscriptionRepository") as repo_cls, \
+            patch.object(subscription.SubscriptionService, "cancel_subscription", return_value=False):
+        response = subscription.cancel_subscription(current_user=_user(), db=Mock())
+    assert json.loads(response.body)["subscription_cancelled"] is False
+    repo_cls.return_value.get_by_user_id.assert_not_called()
+
+
+def test_check_status_is_served_from_cache_by_email():
+    repo = Mock()
+    with patch("app.services.subscription_service.cache_get", return_value={"subscription_activated": True}) as cache_get:
+        assert SubscriptionService(repo).check_activation_status(" User@Example.com ") == {"subscription_activated": True}
+    cache_get.assert_called_once_with("subscription:check:email:user@example.com")
+    repo.get_status_by_email.assert_not_called()
+
+
+def test_check_status_miss_is_cached_with_short_ttl():
+    repo = Mock()
+    repo.get_status_by_email.return_value = Mock(subscription_id=None)
+    with patch("app.services.subscription_service.cache_get", return_value=None), \
+            patch("app.services.subscription_service.cache_set") as cache_set:
+        result = SubscriptionService(repo).check_activation_status(" X@Y.com ")
+    assert result == {"subscription_activated": False, "message": "Assinatura não encontrada"}
+    repo.get_status_by_email.assert_called_once_with("x@y.com")
+    cache_set.assert_called_once_with("subscription:check:email:x@y.com", result, ttl=CHECK_STATUS_CACHE_TTL_SECONDS)
+
+
+def test_check_status_for_unknown_email_is_not_cached():
+    repo = Mock()
+    repo.get_status_by_email.return_value = None
+    with patch("app.services.subscription_service.cache_get", return_value=None), \
+            patch("app.services.subscription_service.cache_set") as cache_set:
+        result = SubscriptionService(repo).check_activation_status("nobody@example.com")
+    assert result == {"subscription_activated": False, "message": "Usuário não encontrado"}
+    cache_set.assert_not_called()
+
+
+def test_activation_invalidation_includes_check_status_key():
+    with patch("app.services.subscription_service.cache_delete") as cache_delete:
+        SubscriptionService.invalidate_access_cache(7, "User@Example.com")
+    assert "subscription:check:email:user@example.com" in cache_delete.call_args.args
+
+
+def test_deactivation_invalidates_check_status_key():
+    repo = Mock()
+    repo.get_by_user_id.return_value = Mock(is_active=False)
+    with patch("app.services.subscription_service.cache_delete") as cache_delete:
+        SubscriptionService(repo).set_active(
+            user_id=7, plan="essencial", is_active=False, provider="kiwify", email="user@example.com",
+        )
+    cache_delete.assert_called_once_with(
+        "subscription:access:user:7", "subscription:status:user:7", "subscription:check:email:user@example.com",
+    )
+
+
+def test_check_status_recent_activation_window():
+    from datetime import datetime, timedelta, timezone
+
+    now = datetime.now(timezone.utc)
+    repo = Mock()
+    for age, expected in ((timedelta(seconds=30), True), (timedelta(minutes=10), False)):
+        repo.get_status_by_email.return_value = Mock(
+            subscription_id=1, is_active=True, last_validation_at=now - age, cakto_due_date=None
+        )
+        with patch("app.services.subscription_service.cache_get", return_value=None), \
+                patch("app.services.subscription_service.cache_set"):
+            result = SubscriptionService(repo).check_activation_status("x@y.com")
+        assert result["subscription_activated"] is expected
+
+
+def test_status_route_returns_304_when_etag_matches():
+    from app.api.v1.routes import subscription
+
+    def _request(headers):
+        request = Mock()
+        request.headers = headers
+        return request
+
+    with patch.object(subscription.SubscriptionService, "get_subscription_status", return_value={"is_active": True}):
+        first = subscription.get_subscription_status(_request({}), current_user=_user(), db=Mock())
+        etag = first.headers["etag"]
+        second = subscription.get_subscription_status(_request({"if-none-match": etag}), current_user=_user(), db=Mock())
+    assert first.status_code == 200 and json.loads(first.body) == {"is_active": True}
+    assert second.status_code == 304 and second.body == b""
@@ -0,0 +1,242 @@
+"""
+Unit tests for CSV upload spooling and task dispatch.
+Run: pytest tests/unit/test_upload_service.py -v
+"""
+import asyncio
+import io
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.services import upload_service
+
+
+def _save(tmp_path, data: bytes, inline_max: int = 1):
+    upload = UploadFile(file=io.BytesIO(data), filename="x.csv")
+    with patch.object(upload_service.settings, "UPLOAD_TEMP_DIR", str(tmp_path)), \
+            patch.object(upload_service.settings, "UPLOAD_INLINE_MAX_BYTES", inline_max):
+        return asyncio.run(upload_service.spool_upload(upload, 5))
+
+
+def test_large_upload_streams_to_temp_dir(tmp_path):
+    data = b"a,b\n" * (upload_service.UPLOAD_CHUNK_SIZE // 2)
+    path = _save(tmp_path, data, inline_max=upload_service.UPLOAD_CHUNK_SIZE)
+    assert path.parent == tmp_path
+    assert path.name.startswith("5_")
+    assert path.read_bytes() == data
+
+
+def test_small_upload_stays_in_memory(tmp_path):
+    source = _save(tmp_path, b"a,b\n1,2\n", inline_max=1024)
+    assert source == b"a,b\n1,2\n"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spilled_upload_on_disk_is_copied_with_sendfile(tmp_path):
+    data = b"a,b\n" * (upload_service.UPLOAD_CHUNK_SIZE // 2)
+    src = tempfile.SpooledTemporaryFile(max_size=1)
+    src.write(data)
+    src.seek(0)
+    with patch.object(upload_service.settings, "UPLOAD_TEMP_DIR", str(tmp_path)), \
+            patch.object(upload_service.settings, "UPLOAD_INLINE_MAX_BYTES", 10), \
+            patch.object(upload_service.os, "sendfile", wraps=os.sendfile) as sendfile:
+        path = upload_service._spool(src, 5)
+    assert sendfile.called
+    assert path.read_bytes() == data
+
+
+def test_upload_still_in_memory_spool_is_not_forced_to_disk(tmp_path):
+    data = b"a,b\n" * 1024
+    src = tempfile.SpooledTemporaryFile(max_size=len(data) * 2)
+    src.write(data)
+    src.seek(0)
+    with patch.object(upload_service.settings, "UPLOAD_TEMP_DIR", str(tmp_path)), \
+            patch.object(upload_service.settings, "UPLOAD_INLINE_MAX_BYTES", 10), \
+            patch.object(src, "fileno") as fileno:
+        path = upload_service._spool(src, 5)
+    fileno.assert_not_called()
+    assert path.read_bytes() == data
+
+
+def test_sendfile_copy_still_enforces_max_size(tmp_path):
+    src = tempfile.SpooledTemporaryFile(max_size=1)
+    src.write(b"x" * (upload_service.UPLOAD_CHUNK_SIZE * 3))
+    src.seek(0)
+    with patch.object(upload_service.settings, "UPLOAD_TEMP_DIR", str(tmp_path)), \
+            patch.object(upload_service.settings, "UPLOAD_INLINE_MAX_BYTES", 10), \
+            patch.object(upload_service.settings, "MAX_UPLOAD_BYTES", upload_service.UPLOAD_CHUNK_SIZE * 2):
+        assert upload_service._spool(src, 5) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_repeated_saves_of_same_dataset_get_distinct_paths(tmp_path):
+    first = _save(tmp_path, b"a\n")
+    second = _save(tmp_path, b"b\n")
+    assert first != second
+    assert first.read_bytes() == b"a\n" and second.read_bytes() == b"b\n"
+
+
+def test_small_file_is_stashed_in_redis(tmp_path):
+    task = Mock()
+    with patch.object(upload_service.settings, "UPLOAD_TEMP_DIR", str(tmp_path)), \
+            patch.object(upload_service, "blob_set", return_value=True) as blob_set:
+        upload_service.enqueue_csv_task(task, 5, 7, "x.csv", b"a,b\n1,2\n")
+    key, data, ttl = blob_set.call_args.args
+    assert key.startswith("upload:blob:5:")
+    assert data == b"a,b\n1,2\n"
+    assert task.delay.call_args.kwargs == {"file_path": None, "file_content_b64": None, "blob_key": key}
+
+
+def test_small_file_falls_back_to_base64_without_redis(tmp_path):
+    task = Mock()
+    with patch.object(upload_service.settings, "UPLOAD_TEMP_DIR", str(tmp_path)), \
+            patch.object(upload_service, "blob_set", return_value=False):
+        upload_service.enqueue_csv_task(task, 5, 7, "x.csv", b"a,b\n1,2\n")
+    kwargs = task.delay.call_args.kwargs
+    assert kwargs["file_path"] is None
+    assert kwargs["file_content_b64"] == "YSxiCjEsMgo="
+
+
+def test_large_file_uses_shared_path(tmp_path):
+    path = _save(tmp_path, b"a,b\n1,2\n")
+    task = Mock()
+    with patch.object(upload_service.settings, "UPLOAD_TEMP_DIR", str(tmp_path)), \
+            patch.object(upload_service, "is_storage_configured", return_value=False):
+        upload_service.enqueue_csv_task(task, 5, 7, "x.csv", path)
+    assert task.delay.call_args.kwargs == {"file_path": str(path), "file_content_b64": None}
+    assert path.exists()
+
+
+def test_large_file_without_shared_disk_or_storage_falls_back_to_inline(tmp_path):
+    path = _save(tmp_path, b"a,b\n1,2\n")
+    task = Mock()
+    with patch.object(upload_service.settings, "UPLOAD_TEMP_DIR", None), \
+            patch.object(upload_service, "is_storage_configured", return_value=False), \
+            patch.object(upload_service, "blob_set", return_value=False):
+        upload_service.enqueue_csv_task(task, 5, 7, "x.csv", path)
+    assert task.delay.call_args.kwargs["file_content_b64"] == "YSxiCjEsMgo="
+    assert not path.exists()
+
+
+def test_large_file_is_streamed_to_storage(tmp_path):
+    path = _save(tmp_path, b"a,b\n1,2\n")
+    task = Mock()
+    with patch.object(upload_service.settings, "UPLOAD_TEMP_DIR", None), \
+            patch.object(upload_service, "is_storage_configured", return_value=True), \
+            patch.object(upload_service, "upload_file_obj", return_value=True) as upload:
+        upload_service.enqueue_csv_task(task, 5, 7, "x.csv", path)
+    assert not isinstance(upload.call_args.args[2], io.BytesIO)
+    assert task.delay.call_args.kwargs["storage_key"] == f"uploads/temp/{path.name}"
+    assert not path.exists()
+
+
+def test_spool_rejects_payload_over_limit(tmp_path):
+    upload = UploadFile(file=io.BytesIO(b"x" * 10), filename="x.csv")
+    with patch.object(upload_service.settings, "UPLOAD_TEMP_DIR", str(tmp_path)), \
+            patch.object(upload_service.settings, "UPLOAD_INLINE_MAX_BYTES", 1), \
+            patch.object(upload_service.settings, "MAX_UPLOAD_BYTES", 5):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(upload_service.spool_upload(upload, 5))
+    assert exc.value.status_code == 413
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_discard_upload_removes_only_temp_files(tmp_path):
+    path = _save(tmp_path, b"a\n")
+    upload_service.discard_upload(path)
+    assert not path.exists()
+    upload_service.discard_upload(b"a\n")
+
+
+def test_size_limit_middleware_rejects_by_content_length():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.core.upload_limit import UploadSizeLimitMiddleware
+
+    app = FastAPI()
+
+    @app.post("/upload")
+    def upload():
+        return {"ok": True}
+
+    app.add_middleware(UploadSizeLimitMiddleware, paths=["/upload"], max_bytes=5)
+    client = TestClient(app)
+    assert client.post("/upload", content=b"x" * 10).status_code == 413
+    assert client.post("/upload", content=b"x" * 3).status_code == 200
+
+
+def test_size_limit_rejection_carries_cors_headers():
+    from fastapi.testclient import TestClient
+
+    from app import main
+
+    response = TestClient(main.app).post(
+        f"{main.settings.API_V1_STR}/datasets/upload",
+        headers={"origin": "https://marketdash.com.br", "content-length": str(main.settings.MAX_UPLOAD_BYTES + 1)},
+        content=b"",
+    )
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == "https://marketdash.com.br"
+    assert "Arquivo excede" in response.json()["detail"]
+
+
+def test_temp_dir_is_created_once(tmp_path):
+    target = tmp_path / "nested" / "uploads"
+    with patch.object(upload_service.settings, "UPLOAD_TEMP_DIR", str(target)):
+        assert upload_service._temp_dir() == target
+        assert target.is_dir()
+        with patch.object(Path, "mkdir") as mkdir:
+            assert upload_service._temp_dir() == target
+        mkdir.assert_not_called()
+
+
+def test_worker_reads_blob_without_deleting_it():
+    from app.tasks import csv_tasks
+
+    with patch.object(csv_tasks, "blob_get", return_value=b"a,b\n") as blob_get:
+        assert csv_tasks._get_csv_source(blob_key="upload:blob:5:0") == b"a,b\n"
+    blob_get.assert_called_once_with("upload:blob:5:0")
+
+    with patch.object(csv_tasks, "blob_get", return_value=None), pytest.raises(FileNotFoundError):
+        csv_tasks._get_csv_source(blob_key="upload:blob:5:0")
+
+
+def _upload_client(service):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api.v1.dependencies import get_dataset_service, require_active_subscription
+    from app.api.v1.routes import datasets
+    from app.db.session import get_db
+
+    app = FastAPI()
+    app.include_router(datasets.router, prefix="/datasets")
+    app.dependency_overrides[require_active_subscription] = lambda: Mock(id=7)
+    app.dependency_overrides[get_db] = lambda: Mock()
+    app.dependency_overrides[get_dataset_service] = lambda: service
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_upload_over_limit_creates_no_dataset():
+    service = Mock()
+    with patch.object(upload_service.settings, "MAX_UPLOAD_BYTES", 5):
+        response = _upload_client(service).post("/datasets/upload", files={"file": ("x.csv", b"x" * 10)})
+    assert response.status_code == 413
+    service.create_dataset.assert_not_called()
+
+
+def test_upload_removes_dataset_when_enqueue_fails():
+    from app.api.v1.routes import datasets
+
+    service = Mock()
+    service.create_dataset.return_value = Mock(id=11)
+    with patch.object(datasets.settings, "PROCESS_CSV_SYNC", False), \
+            patch.object(datasets, "enqueue_csv_task", side_effect=HTTPException(status_code=502)):
+        response = _upload_client(service).post("/datasets/upload", files={"file": ("x.csv", b"a,b\n")})
+    assert response.status_code == 502
+    service.dataset_repo.delete_by_id.assert_called_once_with(11, 7)